@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Export format benchmark
+
+Writes the subscriptions table of a throwaway database in every export format and
+reports write time and file size. Usage: python benchmarks/export_formats.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_dir)
+
+from benchmarks.export_memory import build_database
+
+DEFAULT_ROW_COUNT = 1000000
+
+
+def main(row_count):
+    from utils.excel_exporter import ExcelExporter
+    from utils.export_writers import EXPORT_WRITERS, get_export_writer
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        print(f"Building a database with {row_count} subscriptions...")
+        build_database(os.path.join(temp_dir, 'library.db'), row_count)
+        exporter = ExcelExporter()
+
+        print(f"{'format':>10} {'seconds':>10} {'rows/s':>10} {'MB':>10}")
+        for export_format in EXPORT_WRITERS:
+            writer = get_export_writer(export_format)
+            started = time.perf_counter()
+            try:
+                filepath = writer.write(os.path.join(temp_dir, 'subscriptions'),
+                                        [('Subscriptions', exporter._get_subscriptions_data())])
+            except RuntimeError as e:
+                print(f"{export_format:>10} skipped: {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            size_mb = os.path.getsize(filepath) / (1024 * 1024)
+            print(f"{export_format:>10} {elapsed:>10.1f} {row_count / elapsed:>10.0f} {size_mb:>10.1f}")
+            os.remove(filepath)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROW_COUNT)
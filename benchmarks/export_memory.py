@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Export memory benchmark
+
+Builds throwaway databases with a growing number of subscriptions and reports the
+peak Python memory of the streaming Excel export next to that of loading the same
+rows into a list first. Usage: python benchmarks/export_memory.py [rows ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_dir)
+
+DEFAULT_ROW_COUNTS = (10000, 50000, 100000)
+
+
+def build_database(path, subscription_count):
+    """Create a database at path holding subscription_count subscriptions"""
+    import config.database as database
+    database.DATABASE_PATH = path
+    db_manager = database.DatabaseManager()
+    db_manager.initialize_database()
+
+    conn = db_manager.get_connection()
+    conn.executemany(
+        "INSERT INTO timeslots (name, start_time, end_time, price) VALUES (?, ?, ?, ?)",
+        [('Morning', '06:00', '12:00', 500), ('Evening', '12:00', '18:00', 500)]
+    )
+    seat_ids = [row[0] for row in conn.execute("SELECT id FROM seats")]
+    timeslot_ids = [row[0] for row in conn.execute("SELECT id FROM timeslots")]
+    student_count = max(subscription_count // 10, 1)
+    conn.executemany(
+        "INSERT INTO students (name, father_name, gender, mobile_number, registration_date) VALUES (?, ?, ?, ?, ?)",
+        ((f"Student {i}", f"Father {i}", 'Male' if i % 2 else 'Female', f"9{i:09d}", '2024-01-01')
+         for i in range(student_count))
+    )
+    start = date(2024, 1, 1)
+    conn.executemany(
+        '''INSERT INTO student_subscriptions
+           (student_id, seat_id, timeslot_id, start_date, end_date, amount_paid, receipt_number)
+           VALUES (?, ?, ?, ?, ?, ?, ?)''',
+        ((i % student_count + 1, seat_ids[i % len(seat_ids)], timeslot_ids[i % len(timeslot_ids)],
+          (start + timedelta(days=i % 365)).isoformat(), (start + timedelta(days=i % 365 + 30)).isoformat(),
+          500 + i % 7 * 100, f"R{i:08d}")
+         for i in range(subscription_count))
+    )
+    conn.commit()
+    conn.close()
+
+
+def measure(fn):
+    """Return (seconds, peak MB) for a call of fn"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main(row_counts):
+    from utils.excel_exporter import ExcelExporter, write_workbook
+
+    print(f"{'rows':>10} {'stream s':>10} {'stream MB':>10} {'list MB':>10} {'file MB':>10}")
+    for count in row_counts:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            build_database(os.path.join(temp_dir, 'library.db'), count)
+            exporter = ExcelExporter()
+            output = os.path.join(temp_dir, 'export.xlsx')
+
+            seconds, stream_mb = measure(
+                lambda: write_workbook(output, [('Subscriptions', exporter._get_subscriptions_data())])
+            )
+            _, list_mb = measure(lambda: exporter._get_subscriptions_data().to_dicts())
+            file_mb = os.path.getsize(output) / (1024 * 1024)
+            print(f"{count:>10} {seconds:>10.1f} {stream_mb:>10.1f} {list_mb:>10.1f} {file_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_ROW_COUNTS)
@@ -4,12 +4,62 @@ Database configuration and management
 
 import sqlite3
 import os
+import re
+import threading
 from config.settings import DATABASE_PATH
 
+# Tables whose updated_at is maintained by triggers, with columns that do not count as a change
+CHANGE_TRACKED_TABLES = {
+    'halls': (),
+    'students': (),
+    'seats': (),
+    'timeslots': (),
+    'student_subscriptions': ('receipt_path',),
+    'books': (),
+    'book_borrowings': (),
+}
+
+# Parent id recorded alongside hard deletes so dependent views can refresh
+DELETION_REF_COLUMNS = {
+    'student_subscriptions': 'student_id',
+    'book_borrowings': 'book_id',
+}
+
+# Millisecond timestamps keep updated_at watermarks from colliding within a second
+CHANGE_TIMESTAMP_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+SEAT_INSERT_QUERY = '''
+    INSERT INTO seats (id, hall_id, row_number, gender_restriction, pos_x, pos_y)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+def expand_seat_layout(hall_id, layout, first_pos_y=0):
+    """Expand (row number, first seat id, last seat id, gender) rows into SEAT_INSERT_QUERY parameters"""
+    seats = []
+    for pos_y, (row_number, first_id, last_id, gender) in enumerate(layout, start=first_pos_y):
+        for pos_x, seat_id in enumerate(range(first_id, last_id + 1)):
+            seats.append((seat_id, hall_id, row_number, gender, pos_x, pos_y))
+    return seats
+
+
+# Matches the target table of a write statement (INSERT/UPDATE/DELETE/REPLACE)
+_WRITE_TABLE_RE = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(\w+)',
+    re.IGNORECASE
+)
+
 
 class DatabaseManager:
     """Manages SQLite database operations"""
     
+    # Per-table write counters shared by every instance in this process
+    _table_versions = {}
+    _global_version = 0
+    # Rows written per table by this process, to tell our own writes from other processes'
+    _local_row_changes = {}
+    _versions_lock = threading.Lock()
+    
     def __init__(self):
         self.db_path = DATABASE_PATH
         self._ensure_data_directory()
@@ -51,14 +101,30 @@ class DatabaseManager:
                 )
             ''')
             
-            # Seats table
+            # Halls table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS halls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE,
+                    display_order INTEGER DEFAULT 0,
+                    is_active BOOLEAN DEFAULT 1,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Seats table; pos_x/pos_y place the seat on its hall's grid
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS seats (
                     id INTEGER PRIMARY KEY,
+                    hall_id INTEGER REFERENCES halls (id),
                     row_number INTEGER NOT NULL,
                     gender_restriction TEXT CHECK (gender_restriction IN ('Male', 'Female', 'Any')),
+                    pos_x REAL,
+                    pos_y REAL,
                     is_active BOOLEAN DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
             
@@ -133,10 +199,50 @@ class DatabaseManager:
                 )
             ''')
             
-            # Initialize seats if empty
+            # Outgoing WhatsApp messages; idempotency_key is '<campaign>:<student id or phone>',
+            # claimed_by the process sending it
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS message_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    campaign TEXT NOT NULL,
+                    student_id INTEGER,
+                    recipient_name TEXT,
+                    phone TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    claimed_by TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    sent_at TIMESTAMP,
+                    FOREIGN KEY (student_id) REFERENCES students (id)
+                )
+            ''')
+            self._ensure_column(cursor, 'message_outbox', 'claimed_by', 'TEXT')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_outbox_status ON message_outbox (status, id)')
+
+            # Indexes backing the keyset-paginated list views
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_name ON students (name, id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_title ON books (title, id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_borrowings_borrow_date ON book_borrowings (borrow_date, id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_subscriptions_student ON student_subscriptions (student_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_borrowings_student ON book_borrowings (student_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_borrowings_book ON book_borrowings (book_id)')
+            
+            # Initialize seats if empty, otherwise place seats of older databases
+            self._ensure_column(cursor, 'seats', 'hall_id', 'INTEGER REFERENCES halls (id)')
+            self._ensure_column(cursor, 'seats', 'pos_x', 'REAL')
+            self._ensure_column(cursor, 'seats', 'pos_y', 'REAL')
             cursor.execute('SELECT COUNT(*) FROM seats')
             if cursor.fetchone()[0] == 0:
                 self._initialize_seats(cursor)
+            else:
+                self._migrate_seat_layout(cursor)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_seats_hall ON seats (hall_id, pos_y, pos_x)')
+            
+            self._setup_change_tracking(cursor)
             
             conn.commit()
             print("Database initialized successfully!")
@@ -148,52 +254,238 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def _ensure_column(self, cursor, table, column, definition):
+        """Add a column to an existing table if it is missing"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in [row['name'] for row in cursor.fetchall()]:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+            return True
+        return False
+    
+    def _setup_change_tracking(self, cursor):
+        """Maintain updated_at, change_seq and change counters with triggers and log hard deletes"""
+        # Older databases created seats without updated_at
+        if self._ensure_column(cursor, 'seats', 'updated_at', 'TIMESTAMP'):
+            cursor.execute('UPDATE seats SET updated_at = created_at')
+        
+        # Rows changed per table, polled by ChangeWatcher to spot writes from other processes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS table_changes (
+                table_name TEXT PRIMARY KEY,
+                change_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.executemany('INSERT OR IGNORE INTO table_changes (table_name) VALUES (?)',
+                           [(table,) for table in CHANGE_TRACKED_TABLES])
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS row_deletions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                ref_id INTEGER,
+                deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # High-water marks of the last incremental export: the newest updated_at exported per
+        # table, and under 'row_deletions' the id of the last deletion exported
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS export_watermarks (
+                table_name TEXT PRIMARY KEY,
+                watermark,
+                exported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        for table, ignored_columns in CHANGE_TRACKED_TABLES.items():
+            # change_seq is the table's change counter when the row last changed; unlike
+            # updated_at it follows commit order whichever PC's clock wrote the row
+            if self._ensure_column(cursor, table, 'change_seq', 'INTEGER'):
+                cursor.execute(f'UPDATE {table} SET change_seq = 0')
+            cursor.execute(f'PRAGMA table_info({table})')
+            columns = [row['name'] for row in cursor.fetchall()
+                       if row['name'] not in ('id', 'created_at', 'updated_at', 'change_seq') + ignored_columns]
+            ref_column = DELETION_REF_COLUMNS.get(table)
+            ref_value = f"OLD.{ref_column}" if ref_column else "NULL"
+            count_change = f"UPDATE table_changes SET change_count = change_count + 1 WHERE table_name = '{table}';"
+            touch = f'''UPDATE {table} SET updated_at = {CHANGE_TIMESTAMP_SQL},
+                        change_seq = (SELECT change_count FROM table_changes WHERE table_name = '{table}')
+                    WHERE id = NEW.id;'''
+            
+            # Recreated on every start so the column list follows schema changes
+            cursor.execute(f'DROP TRIGGER IF EXISTS trg_{table}_touch_insert')
+            cursor.execute(f'DROP TRIGGER IF EXISTS trg_{table}_touch_update')
+            cursor.execute(f'DROP TRIGGER IF EXISTS trg_{table}_log_delete')
+            cursor.execute(f'''
+                CREATE TRIGGER trg_{table}_touch_insert AFTER INSERT ON {table}
+                BEGIN
+                    {count_change}
+                    {touch}
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER trg_{table}_touch_update AFTER UPDATE OF {', '.join(columns)} ON {table}
+                BEGIN
+                    {count_change}
+                    {touch}
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER trg_{table}_log_delete AFTER DELETE ON {table}
+                BEGIN
+                    INSERT INTO row_deletions (table_name, row_id, ref_id)
+                    VALUES ('{table}', OLD.id, {ref_value});
+                    {count_change}
+                END
+            ''')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_updated_at ON {table} (updated_at)')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table} (change_seq)')
+    
+    def _default_hall_id(self, cursor):
+        """Return the first hall, creating the default one if there are no halls yet"""
+        from config.settings import DEFAULT_HALL_NAME
+        
+        cursor.execute('SELECT id FROM halls ORDER BY display_order, id LIMIT 1')
+        row = cursor.fetchone()
+        if row:
+            return row['id']
+        cursor.execute('INSERT INTO halls (name) VALUES (?)', (DEFAULT_HALL_NAME,))
+        return cursor.lastrowid
+    
     def _initialize_seats(self, cursor):
-        """Initialize seats with gender restrictions"""
-        from config.settings import GIRLS_SEATS, BOYS_SEATS
+        """Create the default hall and its seats from DEFAULT_SEAT_LAYOUT"""
+        from config.settings import DEFAULT_SEAT_LAYOUT
         
-        # Girls seats - Row 1 (1-9) and Row 10 (72-82)
-        for seat_id in GIRLS_SEATS["row_1"]:
-            cursor.execute('''
-                INSERT INTO seats (id, row_number, gender_restriction)
-                VALUES (?, 1, 'Female')
-            ''', (seat_id,))
+        hall_id = self._default_hall_id(cursor)
+        cursor.executemany(SEAT_INSERT_QUERY, expand_seat_layout(hall_id, DEFAULT_SEAT_LAYOUT))
+    
+    def _migrate_seat_layout(self, cursor):
+        """Give seats from older databases a hall and grid coordinates"""
+        cursor.execute('SELECT id, row_number FROM seats WHERE hall_id IS NULL OR pos_x IS NULL ORDER BY row_number, id')
+        unplaced = cursor.fetchall()
+        if not unplaced:
+            return
         
-        for seat_id in GIRLS_SEATS["row_10"]:
-            cursor.execute('''
-                INSERT INTO seats (id, row_number, gender_restriction)
-                VALUES (?, 10, 'Female')
-            ''', (seat_id,))
+        # Lay unplaced seats out row by row, the way the seat map used to draw them
+        hall_id = self._default_hall_id(cursor)
+        rows = {}  # row number -> [pos_y, next pos_x]
+        updates = []
+        for seat in unplaced:
+            position = rows.setdefault(seat['row_number'], [len(rows), 0])
+            updates.append((hall_id, position[1], position[0], seat['id']))
+            position[1] += 1
+        cursor.executemany(
+            'UPDATE seats SET hall_id = COALESCE(hall_id, ?), pos_x = ?, pos_y = ? WHERE id = ?', updates
+        )
+    
+    @classmethod
+    def mark_tables_changed(cls, *tables):
+        """Bump the version counter of the given tables"""
+        with cls._versions_lock:
+            for table in tables:
+                cls._table_versions[table] = cls._table_versions.get(table, 0) + 1
+    
+    @classmethod
+    def mark_all_tables_changed(cls):
+        """Invalidate every table version (e.g. after a restore)"""
+        with cls._versions_lock:
+            cls._global_version += 1
+    
+    @classmethod
+    def get_table_versions(cls, tables):
+        """Return a tuple of version counters for the given tables"""
+        with cls._versions_lock:
+            return (cls._global_version,) + tuple(cls._table_versions.get(table, 0) for table in tables)
+    
+    @classmethod
+    def get_local_row_changes(cls):
+        """Return the table_changes counts this process's own writes added, per table"""
+        with cls._versions_lock:
+            return dict(cls._local_row_changes)
+    
+    @staticmethod
+    def _write_table(query):
+        """Return the table a write statement targets, or None for reads"""
+        match = _WRITE_TABLE_RE.match(query)
+        return match.group(1).lower() if match else None
+    
+    @staticmethod
+    def _read_change_counts(cursor):
+        cursor.execute('SELECT table_name, change_count FROM table_changes')
+        return {row['table_name']: row['change_count'] for row in cursor.fetchall()}
+    
+    def _begin_write(self, conn, cursor, table):
+        """Take the write lock and return the change counters before a write to a tracked table
         
-        # Boys seats - Rows 2-9 (10-71)
-        for seat_id in BOYS_SEATS:
-            row_number = ((seat_id - 10) // 8) + 2  # Calculate row number
-            cursor.execute('''
-                INSERT INTO seats (id, row_number, gender_restriction)
-                VALUES (?, ?, 'Male')
-            ''', (seat_id, row_number))
+        The triggers skip updates that only touch ignored columns, so the change watcher
+        needs the counts a write really added rather than its rowcount. Reading them
+        inside the write transaction keeps other processes' commits out of the delta.
+        """
+        if table not in CHANGE_TRACKED_TABLES:
+            return None
+        if not conn.in_transaction:
+            cursor.execute('BEGIN IMMEDIATE')
+        return self._read_change_counts(cursor)
     
-    def execute_query(self, query, params=None):
-        """Execute a query and return results"""
-        conn = self.get_connection()
+    def _end_write(self, cursor, counts_before):
+        """Return {table: change count added} by the write since _begin_write(), before committing"""
+        if counts_before is None:
+            return {}
+        counts_after = self._read_change_counts(cursor)
+        return {table: count - counts_before.get(table, 0) for table, count in counts_after.items()
+                if count > counts_before.get(table, 0)}
+    
+    def _note_write(self, table, deltas):
+        """Record, once committed, which tables a write touched and the change counts it added"""
+        with self._versions_lock:
+            for name, delta in deltas.items():
+                self._local_row_changes[name] = self._local_row_changes.get(name, 0) + delta
+        changed = set(deltas)
+        if table:
+            changed.add(table)
+        if changed:
+            self.mark_tables_changed(*changed)
+    
+    def execute_query(self, query, params=None, connection=None):
+        """Execute a query and return results
+        
+        When a connection is passed the caller owns it: it is neither committed nor closed.
+        """
+        owns_connection = connection is None
+        conn = self.get_connection() if owns_connection else connection
         cursor = conn.cursor()
         
         try:
+            is_select = query.strip().upper().startswith('SELECT')
+            table = None if is_select else self._write_table(query)
+            counts_before = self._begin_write(conn, cursor, table) if table else None
+            
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
             
-            if query.strip().upper().startswith('SELECT'):
+            if is_select:
                 return cursor.fetchall()
             else:
-                conn.commit()
-                return cursor.lastrowid
+                lastrowid = cursor.lastrowid
+                deltas = self._end_write(cursor, counts_before)
+                if owns_connection:
+                    conn.commit()
+                self._note_write(table, deltas)
+                return lastrowid
         except Exception as e:
-            conn.rollback()
+            if owns_connection:
+                conn.rollback()
             raise e
         finally:
-            conn.close()
+            if owns_connection:
+                conn.close()
+    
+    def execute_update(self, query, params=()):
+        """Execute a write and return the number of rows it changed"""
+        return self.execute_many(query, [params])
     
     def execute_many(self, query, params_list):
         """Execute a query with multiple parameter sets"""
@@ -201,11 +493,124 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
+            table = self._write_table(query)
+            counts_before = self._begin_write(conn, cursor, table) if table else None
             cursor.executemany(query, params_list)
+            rowcount = cursor.rowcount
+            deltas = self._end_write(cursor, counts_before)
             conn.commit()
-            return cursor.rowcount
+            self._note_write(table, deltas)
+            return rowcount
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             conn.close()
+
+
+class KeysetPager:
+    """Pages through a SELECT with keyset (seek) pagination, keeping the sort in SQLite
+    
+    The sort columns must be non-NULL output columns of the base query and together
+    identify a row uniquely (end them with the primary key).
+    """
+    
+    def __init__(self, base_query, params=(), order_by=('id',), descending=False, change_sources=()):
+        self.db_manager = DatabaseManager()
+        self.base_query = base_query
+        self.params = tuple(params)
+        self.order_by = tuple(order_by)
+        self.descending = descending
+        # (table, watermark column, query returning list ids changed after a watermark)
+        self.change_sources = tuple(change_sources)
+        # Optional connection owned by the caller (e.g. a search worker that may interrupt it)
+        self.connection = None
+        
+        direction = 'DESC' if descending else 'ASC'
+        self._order_sql = ', '.join(f"{column} {direction}" for column in self.order_by)
+        self._key_sql = f"({', '.join(self.order_by)})"
+        self._key_placeholders = f"({', '.join('?' for _ in self.order_by)})"
+    
+    def _execute(self, query, params=None):
+        return self.db_manager.execute_query(query, params, connection=self.connection)
+    
+    def snapshot(self, limit=100):
+        """Return watermarks, row count and first page in one go (for background prefetch)"""
+        return {
+            'watermarks': self.watermarks(),
+            'total': self.count(),
+            'first_page': list(self.page(None, limit)),
+        }
+    
+    def key_of(self, row):
+        """Return the sort key of a row"""
+        return tuple(row[column] for column in self.order_by)
+    
+    def count(self):
+        """Return the total number of rows"""
+        query = f"SELECT COUNT(*) FROM ({self.base_query})"
+        return self._execute(query, self.params)[0][0]
+    
+    def page(self, after=None, limit=100):
+        """Return up to limit rows that sort after the given key"""
+        query = f"SELECT * FROM ({self.base_query})"
+        params = self.params
+        if after is not None:
+            operator = '<' if self.descending else '>'
+            query += f" WHERE {self._key_sql} {operator} {self._key_placeholders}"
+            params = params + tuple(after)
+        query += f" ORDER BY {self._order_sql} LIMIT ?"
+        return self._execute(query, params + (limit,))
+    
+    def seek(self, offset):
+        """Return the key to pass as 'after' to start a page at offset"""
+        if offset <= 0:
+            return None
+        query = (f"SELECT {', '.join(self.order_by)} FROM ({self.base_query}) "
+                 f"ORDER BY {self._order_sql} LIMIT 1 OFFSET ?")
+        result = self._execute(query, self.params + (offset - 1,))
+        return tuple(result[0]) if result else None
+    
+    def position_of(self, key):
+        """Return how many rows sort before the given key"""
+        operator = '>' if self.descending else '<'
+        query = (f"SELECT COUNT(*) FROM ({self.base_query}) "
+                 f"WHERE {self._key_sql} {operator} {self._key_placeholders}")
+        return self._execute(query, self.params + tuple(key))[0][0]
+    
+    def find(self, column, value):
+        """Return the first row of the base query where column equals value"""
+        query = f"SELECT * FROM ({self.base_query}) WHERE {column} = ? LIMIT 1"
+        result = self._execute(query, self.params + (value,))
+        return result[0] if result else None
+    
+    def rows_for_ids(self, ids, column='id'):
+        """Return {id: row} for the given ids that are part of the result"""
+        rows = {}
+        ids = list(ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            query = f"SELECT * FROM ({self.base_query}) WHERE {column} IN ({placeholders})"
+            for row in self._execute(query, self.params + tuple(chunk)):
+                rows[row[column]] = row
+        return rows
+    
+    def watermarks(self):
+        """Return the current high-water mark of every change source table"""
+        marks = {}
+        for table, column, _ in self.change_sources:
+            marks[table] = self._execute(f"SELECT MAX({column}) FROM {table}")[0][0]
+        return marks
+    
+    def changed_ids(self, watermarks):
+        """Return ids of list rows touched after the given watermarks"""
+        ids = set()
+        for table, _, query in self.change_sources:
+            mark = watermarks.get(table)
+            if mark is None:
+                # Empty table at the last load: SQLite sorts every integer and text above this
+                mark = -(2 ** 63)
+            ids.update(row[0] for row in self._execute(query, (mark,))
+                       if row[0] is not None)
+        return ids
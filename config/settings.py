@@ -20,16 +20,27 @@ LIBRARY_ADDRESS = "Rajgir Road, Opp. of Kohinoor Furniture, Malahbigha, Islampur
 DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "library.db")
 
 # Seat Configuration
-TOTAL_SEATS = 82
-GIRLS_SEATS = {
-    "row_1": list(range(1, 10)),      # Seats 1-9
-    "row_10": list(range(72, 83))     # Seats 72-82
-}
-BOYS_SEATS = list(range(10, 72))      # Seats 10-71
+# Layout of the hall created on first run; further halls and seats live in the database.
+# Each row is (row number, first seat id, last seat id, gender restriction), seated left to right.
+DEFAULT_HALL_NAME = "Main Hall"
+DEFAULT_SEAT_LAYOUT = [
+    (1, 1, 9, "Female"),
+    (2, 10, 17, "Male"),
+    (3, 18, 25, "Male"),
+    (4, 26, 33, "Male"),
+    (5, 34, 41, "Male"),
+    (6, 42, 49, "Male"),
+    (7, 50, 57, "Male"),
+    (8, 58, 65, "Male"),
+    (9, 66, 71, "Male"),
+    (10, 72, 82, "Female"),
+]
 
 # File Paths
 RECEIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "receipts")
 EXPORTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "exports")
+UI_STATE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "ui_state.json")
+LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "logs")
 
 # Timeslot Configuration
 MIN_DURATION_MONTHS = 1
@@ -42,10 +53,18 @@ CURRENCY_FORMAT = "{symbol} {amount:,.2f}"  # Format: Rs. 1,234.56
 # WhatsApp Configuration
 WHATSAPP_WEB_URL = "https://web.whatsapp.com"
 WHATSAPP_DELAY = 3  # seconds
+WHATSAPP_CHAT_TIMEOUT = 10  # Seconds to wait for a chat's message box (or an invalid number notice)
+WHATSAPP_SENT_TIMEOUT = 10  # Seconds to wait for the sent tick after pressing Enter
+WHATSAPP_MESSAGE_INTERVAL = 2  # Minimum seconds between the starts of consecutive bulk messages
+LOG_PANEL_MAX_LINES = 1000  # Lines kept in the WhatsApp activity log; the full log is written to LOGS_DIR
+LOG_PANEL_FLUSH_MS = 100  # How often new log lines are drawn
+OUTBOX_MAX_ATTEMPTS = 3  # Failed sends of an outbox message before it is marked failed
+OUTBOX_CLAIM_TIMEOUT = 300  # Seconds after which another PC's message still in 'sending' counts as interrupted
 
 # PDF Configuration
 PDF_FONT_SIZE = 12
 PDF_MARGIN = 20
+RECEIPT_BATCH_WORKERS = None  # Processes rendering batch receipts (None = one per CPU core)
 
 # GUI Configuration
 WINDOW_WIDTH = 1200
@@ -54,3 +73,30 @@ THEME_COLOR = "#2E86AB"
 ACCENT_COLOR = "#A23B72"
 BACKGROUND_COLOR = "#F18F01"
 TEXT_COLOR = "#C73E1D"
+
+# Performance Configuration
+STARTUP_BUDGET_SECONDS = 2.0  # Target time until the main window is visible
+TAB_PREFETCH_DELAY_MS = 300  # Idle delay before building the most-used tab in the background
+UI_STATE_SAVE_DELAY_MS = 5000  # Tab switches within this delay share one write of UI_STATE_PATH
+CHANGE_POLL_INTERVAL_MS = 1000  # How often to check the database for writes made by other instances
+TASK_WORKERS = 4  # Worker threads shared by all background GUI tasks
+TASK_PUMP_INTERVAL_MS = 30  # How often finished background tasks are applied to the GUI while work is pending
+SLOW_TASK_MS = 3000  # Background tasks running longer than this are logged as warnings
+STALL_WATCHDOG_ENABLED = True  # Record event handlers that freeze the UI (Help > UI Stall Report)
+STALL_THRESHOLD_MS = 200  # Main loop delays longer than this are reported as stalls
+STALL_HEARTBEAT_MS = 50  # Interval of the main loop heartbeat checked by the watchdog
+EXPORT_CHUNK_SIZE = 1000  # Rows fetched from SQLite per batch while writing exports
+PARQUET_ROW_GROUP_SIZE = 100000  # Rows buffered per Parquet row group (bounds export memory)
+
+# Logging Configuration
+# Records are written to LOGS_DIR/app.jsonl by a background thread; override with
+# LIBRARY_LOG_LEVEL=DEBUG or LIBRARY_LOG_LEVELS=utils.whatsapp_automation=DEBUG
+LOG_LEVEL = "INFO"
+LOG_CONSOLE_LEVEL = "WARNING"
+LOG_MODULE_LEVELS = {
+    "selenium": "WARNING",
+    "urllib3": "WARNING",
+    "WDM": "WARNING",
+}
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
@@ -2,14 +2,21 @@
 Analytics interface
 """
 
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, date
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from utils.database_manager import DatabaseOperations
 from utils.excel_exporter import ExcelExporter
+from gui.export_progress import ExportProgressDialog
+from utils.chart_data import chart_data_provider
 from config.database import DatabaseManager
+from utils.events import (
+    event_bus, StudentSaved, StudentDeleted, SeatUpdated, HallChanged, TimeslotChanged, BookSaved, BookDeleted,
+    TablesChanged, SUBSCRIPTION_EVENTS, BORROWING_EVENTS
+)
+
+logger = logging.getLogger(__name__)
 
 
 class AnalyticsFrame(ttk.Frame):
@@ -21,6 +28,21 @@ class AnalyticsFrame(ttk.Frame):
         self.exporter = ExcelExporter()
         self.setup_ui()
         self.load_data()
+        
+        # Each view only reloads for the events that affect what it shows
+        event_bus.subscribe_widget(self, (StudentSaved, StudentDeleted, SeatUpdated, HallChanged, BookSaved, BookDeleted,
+                                          TablesChanged) + SUBSCRIPTION_EVENTS + BORROWING_EVENTS,
+                                   lambda events: self.load_statistics(),
+                                   tables=('students', 'seats', 'student_subscriptions', 'books', 'book_borrowings'))
+        event_bus.subscribe_widget(self, (HallChanged, StudentDeleted, TablesChanged), lambda events: self.draw_seat_map(),
+                                   tables=('halls', 'seats', 'student_subscriptions'))
+        event_bus.subscribe_widget(self, (SeatUpdated,) + SUBSCRIPTION_EVENTS,
+                                   lambda events: self.update_seat_map([event.seat_id for event in events]))
+        event_bus.subscribe_widget(self, (StudentSaved, StudentDeleted, TimeslotChanged, TablesChanged) + SUBSCRIPTION_EVENTS,
+                                   lambda events: self.show_expiring_subscriptions(),
+                                   tables=('students', 'student_subscriptions', 'timeslots'))
+        event_bus.subscribe_widget(self, (TimeslotChanged, TablesChanged),
+                                   lambda events: self.load_timeslots_for_availability(), tables=('timeslots',))
     
     def setup_ui(self):
         """Setup user interface"""
@@ -222,6 +244,10 @@ class AnalyticsFrame(ttk.Frame):
         ttk.Button(export_frame, text="Export Students Only", 
                   command=self.export_students).pack(side='left', padx=5)
         
+        # Export rows changed since the last incremental export
+        ttk.Button(export_frame, text="Export Changes Since Last Export", 
+                  command=self.export_changes).pack(side='left', padx=5)
+        
         # Monthly report frame
         monthly_frame = ttk.LabelFrame(reports_frame, text="Monthly Report", padding=10)
         monthly_frame.pack(fill='x', padx=10, pady=10)
@@ -352,73 +378,97 @@ class AnalyticsFrame(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load statistics: {str(e)}")
     
+    def update_seat_map(self, seat_ids):
+        """Recolor only the given seats; falls back to a full redraw when seats were added, removed or moved"""
+        seat_ids = [seat_id for seat_id in dict.fromkeys(seat_ids) if seat_id is not None]
+        if not seat_ids:
+            return
+        try:
+            from models.seat import Seat
+            rows = Seat.get_layout(seat_ids)
+        except Exception as e:
+            logger.error("Error updating seat map: %s", e)
+            return
+        
+        for seat in rows:
+            position = self.seat_map_positions.get(seat['id'])
+            if not seat['is_active'] and position is None:
+                continue
+            if not seat['is_active'] or position != (seat['hall_id'], seat['pos_x'], seat['pos_y']):
+                return self.draw_seat_map()
+            color = self._seat_map_color(seat)
+            if self.seat_map_colors.get(seat['id']) != color:
+                self.seat_canvas.itemconfigure(self.seat_map_items[seat['id']], fill=color)
+                self.seat_map_colors[seat['id']] = color
+    
+    def _seat_map_color(self, seat):
+        """Get the seat map color of a seat layout row"""
+        if seat['occupied']:
+            return 'lightcoral'  # Occupied
+        elif seat['gender_restriction'] == 'Female':
+            return 'lightpink'  # Girls only
+        elif seat['gender_restriction'] == 'Male':
+            return 'lightblue'  # Boys only
+        return 'lightgreen'  # Available
+    
     def draw_seat_map(self):
         """Draw seat occupancy map"""
         try:
             self.seat_canvas.delete("all")
+            self.seat_map_items = {}
+            self.seat_map_positions = {}
+            self.seat_map_colors = {}
             
-            # Get seat occupancy data
+            # Get seats with their hall position and occupancy in one query
             from models.seat import Seat
-            seats = Seat.get_all()
+            seats = Seat.get_layout()
             
-            # Debug: Count occupied seats
             occupied_count = 0
             
-            # Draw seats in a grid layout (10 rows, varying columns)
+            # Draw each hall's seat grid, halls stacked vertically
             seat_size = 30
             gap = 5
             start_x = 20
-            start_y = 20
-            
-            for seat in seats:
-                # Calculate position based on seat number
-                if seat.id <= 9:
-                    # Row 1: seats 1-9
-                    row = 0
-                    col = seat.id - 1
-                elif seat.id <= 71:
-                    # Rows 2-9: seats 10-71
-                    row = ((seat.id - 10) // 8) + 1
-                    col = (seat.id - 10) % 8
-                else:
-                    # Row 10: seats 72-82
-                    row = 9
-                    col = seat.id - 72
+            hall_top = hall_bottom = 20
+            current_hall = object()
+            
+            for index, seat in enumerate(seats):
+                if seat['hall_id'] != current_hall:
+                    if index:
+                        hall_top = hall_bottom + 4 * gap
+                    current_hall = seat['hall_id']
                 
-                x = start_x + col * (seat_size + gap)
-                y = start_y + row * (seat_size + gap)
+                x = start_x + (seat['pos_x'] or 0) * (seat_size + gap)
+                y = hall_top + (seat['pos_y'] or 0) * (seat_size + gap)
+                hall_bottom = max(hall_bottom, y + seat_size)
                 
-                # Determine seat color
-                occupants = seat.get_current_occupants()
-                if occupants:
-                    color = 'lightcoral'  # Occupied
+                if seat['occupied']:
                     occupied_count += 1
-                    # Debug: Print occupied seats
-                    if seat.id in [2, 3]:  # Focus on problematic seats
-                        print(f"DEBUG: Seat {seat.id} shows {len(occupants)} occupants in analytics")
-                elif seat.gender_restriction == 'Female':
-                    color = 'lightpink'  # Girls only
-                elif seat.gender_restriction == 'Male':
-                    color = 'lightblue'  # Boys only
-                else:
-                    color = 'lightgreen'  # Available
+                color = self._seat_map_color(seat)
                 
-                # Draw seat
-                self.seat_canvas.create_rectangle(x, y, x + seat_size, y + seat_size,
-                                                fill=color, outline='black')
+                # Draw seat, keeping its item so a subscription change only recolors it
+                self.seat_map_items[seat['id']] = self.seat_canvas.create_rectangle(
+                    x, y, x + seat_size, y + seat_size, fill=color, outline='black')
+                self.seat_map_positions[seat['id']] = (seat['hall_id'], seat['pos_x'], seat['pos_y'])
+                self.seat_map_colors[seat['id']] = color
                 self.seat_canvas.create_text(x + seat_size/2, y + seat_size/2,
-                                           text=str(seat.id), font=('Arial', 8))
+                                           text=str(seat['id']), font=('Arial', 8))
             
-            print(f"DEBUG: Analytics seat map drawn with {occupied_count} occupied seats")
+            self.seat_canvas.configure(scrollregion=self.seat_canvas.bbox("all"))
+            logger.debug("Analytics seat map drawn with %s occupied seats", occupied_count)
             
         except Exception as e:
-            print(f"Error drawing seat map: {e}")
+            logger.error("Error drawing seat map: %s", e)
             import traceback
             traceback.print_exc()
     
     def generate_chart(self):
         """Generate selected chart"""
         try:
+            # matplotlib is imported on first chart, keeping it out of startup
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            
             chart_type = self.chart_type_var.get()
             
             # Clear existing chart
@@ -447,11 +497,11 @@ class AnalyticsFrame(ttk.Frame):
     
     def create_occupancy_chart(self, ax):
         """Create occupancy rate chart"""
-        from models.timeslot import Timeslot
+        import matplotlib.pyplot as plt
         
-        timeslots = Timeslot.get_all()
-        names = [ts.name for ts in timeslots]
-        rates = [ts.get_occupancy_rate() for ts in timeslots]
+        occupancy = chart_data_provider.get_occupancy_rates()
+        names = [item['name'] for item in occupancy]
+        rates = [item['rate'] for item in occupancy]
         
         ax.bar(names, rates, color='skyblue')
         ax.set_title('Seat Occupancy Rate by Timeslot')
@@ -462,13 +512,15 @@ class AnalyticsFrame(ttk.Frame):
     
     def create_revenue_chart(self, ax):
         """Create revenue by timeslot chart"""
+        import matplotlib.pyplot as plt
+        
         try:
             # Get selected year and month from the controls
             selected_year = int(self.chart_year_var.get()) if hasattr(self, 'chart_year_var') else datetime.now().year
             selected_month = int(self.chart_month_var.get()) if hasattr(self, 'chart_month_var') else datetime.now().month
             
             # Get revenue data for selected month
-            revenue_data = self.db_ops.get_revenue_by_timeslot(selected_year, selected_month)
+            revenue_data = chart_data_provider.get_revenue_by_timeslot(selected_year, selected_month)
             
             if not revenue_data:
                 month_name = datetime(selected_year, selected_month, 1).strftime("%B %Y")
@@ -526,11 +578,9 @@ class AnalyticsFrame(ttk.Frame):
     
     def create_gender_chart(self, ax):
         """Create gender distribution pie chart"""
-        from models.student import Student
-        
-        students = Student.get_all()
-        male_count = len([s for s in students if s.gender == 'Male'])
-        female_count = len([s for s in students if s.gender == 'Female'])
+        gender_counts = chart_data_provider.get_gender_distribution()
+        male_count = gender_counts.get('Male', 0)
+        female_count = gender_counts.get('Female', 0)
         
         if male_count > 0 or female_count > 0:
             ax.pie([male_count, female_count], labels=['Male', 'Female'], 
@@ -542,16 +592,13 @@ class AnalyticsFrame(ttk.Frame):
     
     def create_book_categories_chart(self, ax):
         """Create book categories chart"""
-        from models.book import Book
-        from collections import Counter
+        import matplotlib.pyplot as plt
         
-        books = Book.get_all()
-        categories = [book.category or 'Uncategorized' for book in books]
-        category_counts = Counter(categories)
+        category_counts = chart_data_provider.get_book_category_counts()
         
         if category_counts:
-            categories = list(category_counts.keys())
-            counts = list(category_counts.values())
+            categories = [category for category, _ in category_counts]
+            counts = [count for _, count in category_counts]
             
             ax.bar(categories, counts, color='lightgreen')
             ax.set_title('Books by Category')
@@ -564,41 +611,55 @@ class AnalyticsFrame(ttk.Frame):
                    ha='center', va='center', transform=ax.transAxes)
     
     def export_all_data(self):
-        """Export all data to Excel"""
+        """Export all data to Excel in the background"""
         try:
-            success, filepath = self.exporter.export_all_data()
-            if success:
-                messagebox.showinfo("Export Successful", f"Data exported to:\n{filepath}")
-            else:
-                messagebox.showerror("Export Failed", filepath)
+            ExportProgressDialog(
+                self, "Exporting All Data",
+                lambda progress: self.exporter.export_all_data(progress=progress),
+                lambda filepath: messagebox.showinfo("Export Successful", f"Data exported to:\n{filepath}")
+            )
         except Exception as e:
             messagebox.showerror("Error", f"Export failed: {str(e)}")
     
     def export_students(self):
-        """Export students data only"""
+        """Export students data only, in the background"""
         try:
-            success, filepath = self.exporter.export_students_data()
-            if success:
-                messagebox.showinfo("Export Successful", f"Students data exported to:\n{filepath}")
-            else:
-                messagebox.showerror("Export Failed", filepath)
+            ExportProgressDialog(
+                self, "Exporting Students",
+                lambda progress: self.exporter.export_students_data(progress=progress),
+                lambda filepath: messagebox.showinfo("Export Successful",
+                                                     f"Students data exported to:\n{filepath}")
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Export failed: {str(e)}")
+
+    def export_changes(self):
+        """Export only rows changed since the previous incremental export, in the background"""
+        try:
+            ExportProgressDialog(
+                self, "Exporting Changes",
+                lambda progress: self.exporter.export_changes(progress=progress),
+                lambda filepath: messagebox.showinfo("Export Successful", 
+                                                     f"Changes exported to:\n{filepath}\n\n"
+                                                     f"Run merge_exports.py to combine delta files into a full snapshot.")
+            )
         except Exception as e:
             messagebox.showerror("Error", f"Export failed: {str(e)}")
 
     def export_comprehensive_report(self):
-        """Export comprehensive student-subscription report"""
+        """Export comprehensive student-subscription report in the background"""
         try:
-            success, filepath = self.exporter.export_comprehensive_student_report()
-            if success:
-                messagebox.showinfo("Export Successful", 
-                                  f"Comprehensive student report exported to:\n{filepath}\n\n"
-                                  f"This report includes:\n"
-                                  f"• Detailed student-subscription data with timeslot info\n"
-                                  f"• Seat numbers and duration details\n"
-                                  f"• Amount paid and cost calculations\n"
-                                  f"• Active and expired subscriptions in separate sheets")
-            else:
-                messagebox.showerror("Export Failed", filepath)
+            ExportProgressDialog(
+                self, "Exporting Comprehensive Student Report",
+                lambda progress: self.exporter.export_comprehensive_student_report(progress=progress),
+                lambda filepath: messagebox.showinfo("Export Successful", 
+                                                     f"Comprehensive student report exported to:\n{filepath}\n\n"
+                                                     f"This report includes:\n"
+                                                     f"• Detailed student-subscription data with timeslot info\n"
+                                                     f"• Seat numbers and duration details\n"
+                                                     f"• Amount paid and cost calculations\n"
+                                                     f"• Active and expired subscriptions in separate sheets")
+            )
         except Exception as e:
             messagebox.showerror("Error", f"Export failed: {str(e)}")
     
@@ -655,7 +716,7 @@ class AnalyticsFrame(ttk.Frame):
         """Refresh only the seat map visualization"""
         try:
             self.draw_seat_map()
-            print("Seat map refreshed successfully")
+            logger.debug("Seat map refreshed successfully")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to refresh seat map: {str(e)}")
     
@@ -673,7 +734,7 @@ class AnalyticsFrame(ttk.Frame):
             self.timeslots_data = {f"{ts.name} ({ts.start_time}-{ts.end_time})": ts for ts in timeslots}
             
         except Exception as e:
-            print(f"Error loading timeslots: {str(e)}")
+            logger.error("Error loading timeslots: %s", e)
     
     def show_available_seats(self):
         """Show available seats for selected timeslot"""
@@ -824,5 +885,5 @@ class AnalyticsFrame(ttk.Frame):
             return True
             
         except Exception as e:
-            print(f"Error checking seat availability: {str(e)}")
+            logger.error("Error checking seat availability: %s", e)
             return False
@@ -6,6 +6,11 @@ from models.book import Book
 from models.student import Student
 from models.book_borrowing import BookBorrowing
 from utils.validators import Validators, ValidationError
+from gui.virtual_tree import VirtualTreeview
+from gui.live_search import LiveSearch
+from utils.events import (
+    event_bus, BookSaved, BookDeleted, StudentSaved, StudentDeleted, TablesChanged, BORROWING_EVENTS
+)
 
 class BookManagementFrame(ttk.Frame):
     """Book management interface"""
@@ -14,6 +19,18 @@ class BookManagementFrame(ttk.Frame):
         super().__init__(parent)
         self.setup_ui()
         self.load_data()
+        
+        event_bus.subscribe_widget(self, (BookSaved, BookDeleted, TablesChanged), self._on_book_events,
+                                   tables=('books',))
+        event_bus.subscribe_widget(self, (StudentSaved, StudentDeleted, TablesChanged) + BORROWING_EVENTS,
+                                   lambda events: self.borrowing_tree.refresh_changes(),
+                                   tables=('students', 'book_borrowings'))
+    
+    def _on_book_events(self, events):
+        """Apply book changes to the book list, borrowing list and borrow combo"""
+        self.book_tree.refresh_changes()
+        self.borrowing_tree.refresh_changes()
+        self.load_books_for_borrowing()
     
     def setup_ui(self):
         """Setup user interface"""
@@ -83,18 +100,14 @@ class BookManagementFrame(ttk.Frame):
         ttk.Button(search_frame, text="Refresh", command=self.load_books).grid(row=0, column=3, padx=2)
         search_frame.columnconfigure(1, weight=1)
         book_columns = ('ID', 'Title', 'Author', 'Category', 'Total', 'Available', 'Status')
-        self.book_tree = ttk.Treeview(list_frame, columns=book_columns, show='headings', height=15)
+        self.book_tree = VirtualTreeview(list_frame, columns=book_columns, height=15, row_values=self._book_row_values)
         for col in book_columns:
             self.book_tree.heading(col, text=col)
             if col == 'Title': self.book_tree.column(col, width=200)
             elif col == 'Author': self.book_tree.column(col, width=150)
             else: self.book_tree.column(col, width=80)
-        v_scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.book_tree.yview)
-        h_scrollbar = ttk.Scrollbar(list_frame, orient='horizontal', command=self.book_tree.xview)
-        self.book_tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-        self.book_tree.grid(row=1, column=0, sticky='nsew')
-        v_scrollbar.grid(row=1, column=1, sticky='ns')
-        h_scrollbar.grid(row=2, column=0, sticky='ew')
+        self.book_tree.grid(row=1, column=0, rowspan=2, columnspan=2, sticky='nsew')
+        self.book_search = LiveSearch(self, self.book_search_var, self._query_books, self._show_book_results, name="Book search")
         list_frame.rowconfigure(1, weight=1)
         list_frame.columnconfigure(0, weight=1)
         self.book_tree.bind('<<TreeviewSelect>>', self.on_book_select)
@@ -159,7 +172,7 @@ class BookManagementFrame(ttk.Frame):
         ttk.Button(filter_frame, text="Apply Filter", command=self.load_borrowings).grid(row=0, column=2, padx=5)
         filter_frame.columnconfigure(1, weight=1)
         borrowing_columns = ('ID', 'Student', "Father's Name", 'Phone', 'Book', 'Borrow Date', 'Due Date', 'Days', 'Return Date', 'Fine', 'Status')
-        self.borrowing_tree = ttk.Treeview(list_frame, columns=borrowing_columns, show='headings', height=15)
+        self.borrowing_tree = VirtualTreeview(list_frame, columns=borrowing_columns, height=15, row_values=self._borrowing_row_values)
         for col in borrowing_columns:
             self.borrowing_tree.heading(col, text=col)
             if col in ['Student', 'Book', "Father's Name"]: self.borrowing_tree.column(col, width=150)
@@ -167,12 +180,7 @@ class BookManagementFrame(ttk.Frame):
             elif col in ['Borrow Date', 'Due Date', 'Return Date']: self.borrowing_tree.column(col, width=100)
             elif col == 'Days': self.borrowing_tree.column(col, width=50)
             else: self.borrowing_tree.column(col, width=80)
-        v_scrollbar2 = ttk.Scrollbar(list_frame, orient='vertical', command=self.borrowing_tree.yview)
-        h_scrollbar2 = ttk.Scrollbar(list_frame, orient='horizontal', command=self.borrowing_tree.xview)
-        self.borrowing_tree.configure(yscrollcommand=v_scrollbar2.set, xscrollcommand=h_scrollbar2.set)
-        self.borrowing_tree.grid(row=1, column=0, sticky='nsew')
-        v_scrollbar2.grid(row=1, column=1, sticky='ns')
-        h_scrollbar2.grid(row=2, column=0, sticky='ew')
+        self.borrowing_tree.grid(row=1, column=0, rowspan=2, columnspan=2, sticky='nsew')
         list_frame.rowconfigure(1, weight=1)
         list_frame.columnconfigure(0, weight=1)
         self.borrowing_tree.bind('<<TreeviewSelect>>', self.on_borrowing_select)
@@ -185,28 +193,30 @@ class BookManagementFrame(ttk.Frame):
 
     def load_books(self):
         """Load books into tree"""
-        for item in self.book_tree.get_children():
-            self.book_tree.delete(item)
         try:
-            books = Book.get_all()
-            for book in books:
-                status = "Available" if book.is_available() else "Out of Stock"
-                self.book_tree.insert('', 'end', values=(book.id, book.title, book.author or "N/A", book.category or "N/A", book.total_copies, book.available_copies, status))
+            self.book_tree.set_pager(Book.list_pager())
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load books: {str(e)}")
 
+    @staticmethod
+    def _book_row_values(row):
+        """Format a book list row"""
+        status = "Available" if row['available_copies'] > 0 else "Out of Stock"
+        return (row['id'], row['title'], row['author'] or "N/A", row['category'] or "N/A", row['total_copies'], row['available_copies'], status)
+
     def load_borrowings(self):
         """Load borrowings into tree"""
-        for item in self.borrowing_tree.get_children():
-            self.borrowing_tree.delete(item)
         try:
-            borrowings = BookBorrowing.get_all_details()
-            for borrowing in borrowings:
-                status = "Returned" if borrowing['is_returned'] else ("Overdue" if borrowing['due_date'] < str(date.today()) else "Active")
-                self.borrowing_tree.insert('', 'end', values=(borrowing['id'], borrowing['student_name'], borrowing['father_name'], borrowing['student_phone'], borrowing['book_title'], borrowing['borrow_date'], borrowing['due_date'], borrowing['days_borrowed'], borrowing['return_date'] or "N/A", f"Rs. {borrowing['fine_amount']}" if borrowing['fine_amount'] else "Rs. 0", status))
+            self.borrowing_tree.set_pager(BookBorrowing.list_pager(self.borrowing_filter_var.get()))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load borrowings: {str(e)}")
 
+    @staticmethod
+    def _borrowing_row_values(borrowing):
+        """Format a borrowing list row"""
+        status = "Returned" if borrowing['is_returned'] else ("Overdue" if borrowing['due_date'] < str(date.today()) else "Active")
+        return (borrowing['id'], borrowing['student_name'], borrowing['father_name'], borrowing['student_phone'], borrowing['book_title'], borrowing['borrow_date'], borrowing['due_date'], borrowing['days_borrowed'], borrowing['return_date'] or "N/A", f"Rs. {borrowing['fine_amount']}" if borrowing['fine_amount'] else "Rs. 0", status)
+
     def load_books_for_borrowing(self):
         """Load available books for borrowing combo"""
         try:
@@ -287,16 +297,22 @@ class BookManagementFrame(ttk.Frame):
 
     def search_books(self):
         """Search books"""
-        search_term = self.book_search_var.get().strip()
-        if not search_term: self.load_books(); return
-        for item in self.book_tree.get_children(): self.book_tree.delete(item)
+        self.book_search.search_now()
+
+    def _query_books(self, search_term, connection):
+        """Fetch the first page of a book search (runs on a worker thread)"""
+        pager = Book.list_pager(search_term or None)
+        pager.connection = connection
         try:
-            books = Book.search(search_term)
-            for book in books:
-                status = "Available" if book.is_available() else "Out of Stock"
-                self.book_tree.insert('', 'end', values=(book.id, book.title, book.author or "N/A", book.category or "N/A", book.total_copies, book.available_copies, status))
-        except Exception as e:
-            messagebox.showerror("Error", f"Search failed: {str(e)}")
+            snapshot = pager.snapshot(self.book_tree.page_size)
+        finally:
+            pager.connection = None
+        return pager, snapshot
+
+    def _show_book_results(self, search_term, result):
+        """Show the latest book search result"""
+        pager, snapshot = result
+        self.book_tree.set_pager(pager, snapshot=snapshot)
 
     def borrow_book(self):
         """Handle book borrowing"""
@@ -369,4 +385,7 @@ class BookManagementFrame(ttk.Frame):
 
     def refresh(self):
         """Refresh the interface"""
-        self.load_data()
+        # Only rows changed since the last sync are re-fetched and redrawn
+        self.book_tree.refresh_changes()
+        self.borrowing_tree.refresh_changes()
+        self.load_books_for_borrowing()
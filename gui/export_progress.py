@@ -0,0 +1,74 @@
+"""
+Export progress window
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from utils.export_jobs import ExportJob
+
+POLL_INTERVAL_MS = 100
+
+
+class ExportProgressDialog:
+    """Runs an export in the background and shows per-sheet progress with a Cancel button
+
+    run(progress) is an ExcelExporter export call returning (success, result); on
+    success on_success(result) is called, failures are reported in a message box.
+    The rest of the application stays usable while the export runs.
+    """
+
+    def __init__(self, parent, title, run, on_success):
+        self.on_success = on_success
+        self.job = ExportJob(title, run)
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry("420x150")
+        self.window.resizable(False, False)
+        self.window.transient(parent.winfo_toplevel())
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.setup_ui(title)
+
+        self.job.start(self.finish, widget=self.window)
+        self._after_id = self.window.after(POLL_INTERVAL_MS, self.poll)
+
+    def setup_ui(self, title):
+        """Setup progress widgets"""
+        main_frame = ttk.Frame(self.window, padding=15)
+        main_frame.pack(fill='both', expand=True)
+
+        ttk.Label(main_frame, text=f"{title}...", font=('Arial', 10, 'bold')).pack(anchor='w')
+        self.sheet_var = tk.StringVar(value="Taking a snapshot of the database")
+        ttk.Label(main_frame, textvariable=self.sheet_var).pack(anchor='w', pady=(8, 2))
+        self.progress_bar = ttk.Progressbar(main_frame, mode='determinate', maximum=1)
+        self.progress_bar.pack(fill='x')
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill='x', pady=(10, 0))
+        self.cancel_btn = ttk.Button(button_frame, text="Cancel", command=self.cancel)
+        self.cancel_btn.pack(side='right')
+
+    def poll(self):
+        """Show the job's latest progress"""
+        sheet, sheets_done, sheet_count, rows = self.job.status
+        if sheet is not None and not self.job.cancelled:
+            current = min(sheets_done + 1, sheet_count)
+            self.sheet_var.set(f"Sheet {current} of {sheet_count}: {sheet} ({rows:,} rows)")
+            self.progress_bar.config(maximum=sheet_count, value=sheets_done)
+        self._after_id = self.window.after(POLL_INTERVAL_MS, self.poll)
+
+    def cancel(self):
+        """Stop the export; its partial file is removed"""
+        self.job.cancel()
+        self.sheet_var.set("Cancelling...")
+        self.cancel_btn.config(state='disabled')
+
+    def finish(self, outcome):
+        """Close the window and report the export result"""
+        success, result = outcome
+        self.window.after_cancel(self._after_id)
+        self.window.destroy()
+        if success:
+            self.on_success(result)
+        elif not self.job.cancelled:
+            messagebox.showerror("Export Failed", result)
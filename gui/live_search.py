@@ -0,0 +1,110 @@
+"""
+Debounced search-as-you-type support
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from tkinter import messagebox
+from config.database import DatabaseManager
+from utils.task_executor import task_executor, PRIORITY_HIGH
+
+
+class LiveSearch:
+    """Runs a search shortly after typing stops, off the Tk thread
+
+    Each new search interrupts the SQLite query of the one it supersedes, and only the
+    result of the latest search is handed to apply_result. The time from the last
+    keystroke to the rendered result is kept in latencies (milliseconds).
+    """
+
+    def __init__(self, widget, variable, run_query, apply_result, delay_ms=250, name="search"):
+        self.widget = widget
+        self.variable = variable
+        self.run_query = run_query  # run_query(term, connection) -> result, called on a task executor worker
+        self.apply_result = apply_result  # apply_result(term, result), called on the Tk thread
+        self.delay_ms = delay_ms
+        self.name = name
+        self.db_manager = DatabaseManager()
+        self.latencies = deque(maxlen=200)
+
+        self._generation = 0
+        self._pending_after = None
+        self._last_keystroke = None
+        self._active_connection = None
+        self._lock = threading.Lock()
+
+        variable.trace_add('write', self._on_change)
+
+    def _on_change(self, *args):
+        self._last_keystroke = time.perf_counter()
+        if self._pending_after is not None:
+            self.widget.after_cancel(self._pending_after)
+        self._pending_after = self.widget.after(self.delay_ms, self.search_now)
+
+    def search_now(self):
+        """Start a search for the current text immediately"""
+        if self._pending_after is not None:
+            self.widget.after_cancel(self._pending_after)
+            self._pending_after = None
+        if self._last_keystroke is None:
+            self._last_keystroke = time.perf_counter()
+
+        term = self.variable.get().strip()
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            # Abort the superseded query instead of letting it run to completion
+            if self._active_connection is not None:
+                self._active_connection.interrupt()
+
+        keystroke_time = self._last_keystroke
+        # Submitting under the same key cancels the superseded search if it has not started
+        task_executor.submit(
+            self._run, generation, term, key=self.name, priority=PRIORITY_HIGH, widget=self.widget,
+            on_success=lambda result: self._deliver(generation, term, result, None, keystroke_time),
+            on_error=lambda e: self._deliver(generation, term, None, e, keystroke_time)
+        )
+
+    def _run(self, generation, term):
+        """Run the query on its own connection, which a newer search may interrupt"""
+        conn = self.db_manager.get_connection()
+        with self._lock:
+            if generation != self._generation:
+                conn.close()
+                return None
+            self._active_connection = conn
+        try:
+            return self.run_query(term, conn)
+        finally:
+            with self._lock:
+                if self._active_connection is conn:
+                    self._active_connection = None
+            conn.close()
+
+    def _deliver(self, generation, term, result, error, keystroke_time):
+        if generation != self._generation:
+            return  # A newer search has started; drop this result
+        if isinstance(error, sqlite3.OperationalError) and 'interrupt' in str(error):
+            return
+        if error is not None:
+            logging.error(f"{self.name} failed for {term!r}: {error}")
+            messagebox.showerror("Error", f"Search failed: {str(error)}")
+            return
+
+        self.apply_result(term, result)
+        latency_ms = (time.perf_counter() - keystroke_time) * 1000
+        self.latencies.append(latency_ms)
+        self._last_keystroke = None
+        logging.debug(f"{self.name} {term!r}: rendered {latency_ms:.0f} ms after last keystroke")
+
+    def latency_summary(self):
+        """Return (count, median, p95) of recorded keystroke-to-render latencies"""
+        if not self.latencies:
+            return 0, 0.0, 0.0
+        ordered = sorted(self.latencies)
+        median = ordered[len(ordered) // 2]
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return len(ordered), median, p95
@@ -0,0 +1,115 @@
+"""
+Bounded, batched activity log for Text widgets
+"""
+
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from config.settings import LOG_PANEL_MAX_LINES, LOG_PANEL_FLUSH_MS
+
+
+class LogPanel:
+    """Log lines from any thread into a Text widget without flooding the Tk queue
+
+    append() only touches an in-memory ring buffer. A fixed-rate after() loop
+    moves new lines into the widget in one insert per frame and trims it to
+    max_lines. When a log_path is given every line is also written to disk by a
+    background thread, so the widget can stay short while the full log is kept.
+    """
+
+    def __init__(self, log_path=None, max_lines=LOG_PANEL_MAX_LINES, flush_interval_ms=LOG_PANEL_FLUSH_MS):
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        self.log_path = log_path
+        self.text = None
+        self._pending = deque(maxlen=max_lines)  # lines not yet shown
+        self._dropped = 0  # lines that overflowed the buffer before a flush
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._file_queue = None
+        if log_path:
+            self._file_queue = queue.SimpleQueue()
+            threading.Thread(target=self._write_file, name="log-panel-writer", daemon=True).start()
+
+    def attach(self, text):
+        """Start showing lines in a (disabled) Text widget"""
+        self.text = text
+        text.bind('<Destroy>', lambda e: self.close() if e.widget is text else None, add='+')
+        self._after_id = text.after(self.flush_interval_ms, self._tick)
+
+    def append(self, message):
+        """Add a line to the log; safe to call from any thread"""
+        now = datetime.now()
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append(f"[{now.strftime('%H:%M:%S')}] {message}")
+        file_queue = self._file_queue  # close() may clear it from the Tk thread meanwhile
+        if file_queue is not None:
+            file_queue.put(f"{now.isoformat(sep=' ', timespec='milliseconds')} {message}\n")
+
+    def _tick(self):
+        self.flush()
+        self._after_id = self.text.after(self.flush_interval_ms, self._tick)
+
+    def flush(self):
+        """Move pending lines into the widget with a single insert"""
+        with self._lock:
+            if not self._pending:
+                return
+            lines = list(self._pending)
+            dropped, self._dropped = self._dropped, 0
+            self._pending.clear()
+        if dropped:
+            note = f" (full log: {self.log_path})" if self.log_path else ""
+            lines[0] = f"... {dropped + 1} earlier lines not shown{note}"
+
+        text = self.text
+        try:
+            at_bottom = text.yview()[1] >= 1.0
+            text.config(state='normal')
+            text.insert('end', '\n'.join(lines) + '\n')
+            line_count = int(text.index('end-1c').split('.')[0]) - 1
+            if line_count > self.max_lines:
+                text.delete('1.0', f'{line_count - self.max_lines + 1}.0')
+            text.config(state='disabled')
+            if at_bottom:
+                text.see('end')  # Follow new lines unless the user scrolled up to read
+        except Exception as e:
+            logging.error(f"Failed to update log panel: {e}")
+
+    def close(self):
+        """Stop the flush loop and finish writing the log file"""
+        if self._after_id is not None and self.text is not None:
+            try:
+                self.text.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        file_queue, self._file_queue = self._file_queue, None
+        if file_queue is not None:
+            file_queue.put(None)
+
+    def _write_file(self):
+        """Append queued lines to the log file, one write per batch"""
+        file_queue = self._file_queue
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as log_file:
+                while True:
+                    batch = [file_queue.get()]
+                    while True:
+                        try:
+                            batch.append(file_queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    done = None in batch
+                    log_file.write(''.join(line for line in batch if line is not None))
+                    log_file.flush()
+                    if done:
+                        return
+        except OSError as e:
+            logging.error(f"Failed to write log file {self.log_path}: {e}")
@@ -4,25 +4,65 @@ Main application window
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+import importlib
+import json
 import logging
+import os
+import time
 from config.settings import (
-    APP_NAME, APP_VERSION, APP_AUTHOR, WINDOW_WIDTH, WINDOW_HEIGHT, BACKGROUND_COLOR
+    APP_NAME, APP_VERSION, APP_AUTHOR, WINDOW_WIDTH, WINDOW_HEIGHT, BACKGROUND_COLOR,
+    UI_STATE_PATH, UI_STATE_SAVE_DELAY_MS, TAB_PREFETCH_DELAY_MS, STALL_WATCHDOG_ENABLED
 )
-from gui.student_management import StudentManagementFrame
-from gui.seat_management import SeatManagementFrame
-from gui.timeslot_management import TimeslotManagementFrame
-from gui.analytics import AnalyticsFrame
-from gui.book_management import BookManagementFrame
+from utils.events import event_bus
+from utils.change_watcher import ChangeWatcher
+from utils.task_executor import task_executor
+from utils.stall_watchdog import StallWatchdog
+
+# Tab key -> (title, module, frame class); frames are imported and built on first activation
+TAB_DEFINITIONS = [
+    ('student', "Student Management", 'gui.student_management', 'StudentManagementFrame'),
+    ('seat', "Seat Management", 'gui.seat_management', 'SeatManagementFrame'),
+    ('timeslot', "Timeslot Management", 'gui.timeslot_management', 'TimeslotManagementFrame'),
+    ('book', "Book Management", 'gui.book_management', 'BookManagementFrame'),
+    ('analytics', "Analytics", 'gui.analytics', 'AnalyticsFrame'),
+]
+
+# Export format (utils.export_writers.EXPORT_WRITERS key) -> label in Tools > Export Data
+EXPORT_FORMAT_LABELS = [
+    ('xlsx', "Excel (.xlsx)"),
+    ('csv', "CSV (.csv)"),
+    ('csv.gz', "CSV, gzip compressed (.csv.gz)"),
+    ('parquet', "Parquet (.parquet)"),
+]
 
 
 class MainWindow:
     """Main application window"""
     
-    def __init__(self, root):
+    def __init__(self, root, startup_timer=None):
         self.root = root
+        self.startup_timer = startup_timer
+        self.student_frame = None
+        self.seat_frame = None
+        self.timeslot_frame = None
+        self.book_frame = None
+        self.analytics_frame = None
+        self.receipt_tasks = {}  # task key -> receipt batch or book running in the background
+        # Frames subscribe to model events; deliver them once per idle cycle
+        event_bus.attach_tk(root)
+        task_executor.attach_tk(root)
         self.setup_window()
         self.create_menu()
         self.create_main_interface()
+        
+        # Pick up changes made by other instances sharing the database
+        self.change_watcher = ChangeWatcher(root)
+        self.change_watcher.start()
+        
+        # Record handlers that freeze the main loop
+        self.stall_watchdog = StallWatchdog(root)
+        if STALL_WATCHDOG_ENABLED:
+            self.stall_watchdog.start()
     
     def setup_window(self):
         """Setup main window properties"""
@@ -58,15 +98,27 @@ class MainWindow:
         # Tools menu
         tools_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Tools", menu=tools_menu)
-        tools_menu.add_command(label="Export Data", command=self.export_data)
+        export_menu = tk.Menu(tools_menu, tearoff=0)
+        tools_menu.add_cascade(label="Export Data", menu=export_menu)
+        for export_format, label in EXPORT_FORMAT_LABELS:
+            export_menu.add_command(label=label, command=lambda f=export_format: self.export_data(f))
         tools_menu.add_separator()
         tools_menu.add_command(label="Generate Comprehensive Receipt", command=self.generate_comprehensive_receipt)
+        batch_menu = tk.Menu(tools_menu, tearoff=0)
+        tools_menu.add_cascade(label="Batch Receipts", menu=batch_menu)
+        batch_menu.add_command(label="Receipts for This Month's Subscriptions",
+                               command=self.generate_monthly_receipts)
+        batch_menu.add_command(label="Monthly Receipt Book (Single PDF)...", command=self.generate_receipt_book)
+        batch_menu.add_command(label="Comprehensive Receipts for All Students (Zip)...",
+                               command=self.generate_all_student_receipts)
         tools_menu.add_separator()
         tools_menu.add_command(label="WhatsApp Automation", command=self.open_whatsapp_automation)
         
         # Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
+        help_menu.add_command(label="UI Stall Report", command=self.show_stall_report)
+        help_menu.add_separator()
         help_menu.add_command(label="About", command=self.show_about)
     
     def create_main_interface(self):
@@ -79,35 +131,116 @@ class MainWindow:
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.pack(fill='both', expand=True)
         
-        # Student Management tab
-        self.student_frame = StudentManagementFrame(self.notebook)
-        self.notebook.add(self.student_frame, text="Student Management")
+        # Add an empty container per tab; the real frame is built when first shown
+        self.tab_containers = {}
+        for key, title, _, _ in TAB_DEFINITIONS:
+            container = ttk.Frame(self.notebook)
+            self.notebook.add(container, text=title)
+            self.tab_containers[key] = container
         
-        # Seat Management tab
-        self.seat_frame = SeatManagementFrame(self.notebook)
-        self.notebook.add(self.seat_frame, text="Seat Management")
+        self.tab_usage = self._load_tab_usage()
+        self._tabs_ready = False
+        self._save_after_id = None
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+        self.notebook.bind('<Destroy>', lambda e: self._flush_tab_usage() if e.widget is self.notebook else None,
+                           add='+')
         
-        # Timeslot Management tab
-        self.timeslot_frame = TimeslotManagementFrame(self.notebook)
-        self.notebook.add(self.timeslot_frame, text="Timeslot Management")
+        # Populate the visible tab once the window is up, then prefetch the most-used one
+        self.root.after_idle(self._build_initial_tab)
         
-        # Set up cross-frame communication
-        # When timeslots are updated, refresh student management
-        self.timeslot_frame.set_refresh_callback(self.student_frame.refresh)
+        # Status bar
+        self.create_status_bar()
+    
+    def _on_tab_changed(self, event=None):
+        """Build the selected tab on first activation and record its usage"""
+        key = self._selected_tab_key()
+        if key is None or not self._tabs_ready:
+            return
+        self.ensure_tab(key)
+        self.tab_usage[key] = self.tab_usage.get(key, 0) + 1
+        if self._save_after_id is None:
+            self._save_after_id = self.root.after(UI_STATE_SAVE_DELAY_MS, self._flush_tab_usage)
+    
+    def _selected_tab_key(self):
+        """Return the key of the currently selected tab"""
+        selected = self.notebook.select()
+        for key, container in self.tab_containers.items():
+            if str(container) == selected:
+                return key
+        return None
+    
+    def _build_initial_tab(self):
+        """Populate the visible tab and schedule the most-used tab prefetch"""
+        key = self._selected_tab_key() or TAB_DEFINITIONS[0][0]
+        self.ensure_tab(key)
+        self._tabs_ready = True
         
-        # When subscriptions are updated, refresh analytics
-        self.student_frame.set_analytics_refresh_callback(self.refresh_analytics)
+        if self.startup_timer:
+            elapsed = self.startup_timer.mark("first tab populated")
+        else:
+            from utils.startup_timing import PROCESS_START
+            elapsed = time.perf_counter() - PROCESS_START
+        logging.info(f"Startup: '{key}' tab populated after {elapsed * 1000:.0f} ms")
         
-        # Book Management tab
-        self.book_frame = BookManagementFrame(self.notebook)
-        self.notebook.add(self.book_frame, text="Book Management")
+        prefetch_key = self._most_used_tab(exclude=key)
+        if prefetch_key:
+            self.root.after(TAB_PREFETCH_DELAY_MS, lambda: self.root.after_idle(self.ensure_tab, prefetch_key))
+    
+    def _most_used_tab(self, exclude=None):
+        """Return the most frequently opened tab other than exclude"""
+        candidates = [key for key, _, _, _ in TAB_DEFINITIONS if key != exclude]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda key: self.tab_usage.get(key, 0))
+    
+    def ensure_tab(self, key):
+        """Create and populate the frame for a tab if it has not been built yet"""
+        frame = getattr(self, f"{key}_frame")
+        if frame is not None:
+            return frame
         
-        # Analytics tab
-        self.analytics_frame = AnalyticsFrame(self.notebook)
-        self.notebook.add(self.analytics_frame, text="Analytics")
+        _, title, module_name, class_name = next(d for d in TAB_DEFINITIONS if d[0] == key)
+        start = time.perf_counter()
+        try:
+            frame_class = getattr(importlib.import_module(module_name), class_name)
+            frame = frame_class(self.tab_containers[key])
+            frame.pack(fill='both', expand=True)
+        except Exception as e:
+            logging.error(f"Failed to build {title} tab: {e}")
+            messagebox.showerror("Error", f"Failed to load {title}: {str(e)}")
+            return None
         
-        # Status bar
-        self.create_status_bar()
+        setattr(self, f"{key}_frame", frame)
+        logging.info(f"Built {title} tab in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return frame
+    
+    def _load_tab_usage(self):
+        """Load per-tab activation counts"""
+        try:
+            with open(UI_STATE_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f).get('tab_usage', {})
+        except (OSError, ValueError):
+            return {}
+    
+    def _flush_tab_usage(self):
+        """Write out tab usage recorded since the last save"""
+        if self._save_after_id is None:
+            return
+        try:
+            self.root.after_cancel(self._save_after_id)
+        except tk.TclError:
+            pass
+        self._save_after_id = None
+        self._save_tab_usage()
+    
+    def _save_tab_usage(self):
+        """Persist per-tab activation counts"""
+        try:
+            os.makedirs(os.path.dirname(UI_STATE_PATH), exist_ok=True)
+            with open(UI_STATE_PATH, 'w', encoding='utf-8') as f:
+                json.dump({'tab_usage': self.tab_usage}, f)
+        except OSError as e:
+            logging.warning(f"Could not save UI state: {e}")
     
     def create_status_bar(self):
         """Create status bar at bottom"""
@@ -181,27 +314,28 @@ class MainWindow:
                     if success:
                         messagebox.showinfo("Restore", "Database restored successfully!")
                         self.update_status("Database restored")
-                        # Refresh all frames
-                        self.refresh_all_frames()
                     else:
                         messagebox.showerror("Restore Error", message)
         
         except Exception as e:
             messagebox.showerror("Restore Error", f"Failed to restore database: {str(e)}")
     
-    def export_data(self):
-        """Export data to Excel"""
+    def export_data(self, export_format='xlsx'):
+        """Export all data as Excel, CSV or Parquet"""
         try:
             from utils.excel_exporter import ExcelExporter
+            from gui.export_progress import ExportProgressDialog
             
-            exporter = ExcelExporter()
-            success, filepath = exporter.export_all_data()
-            
-            if success:
+            def exported(filepath):
                 messagebox.showinfo("Export", f"Data exported successfully to:\n{filepath}")
-                self.update_status("Data exported to Excel")
-            else:
-                messagebox.showerror("Export Error", filepath)
+                self.update_status(f"Data exported to {dict(EXPORT_FORMAT_LABELS)[export_format]}")
+            
+            exporter = ExcelExporter()
+            ExportProgressDialog(
+                self.root, "Exporting Data",
+                lambda progress: exporter.export_all_data(export_format, progress=progress), exported
+            )
+            self.update_status("Exporting data in the background...")
         
         except Exception as e:
             messagebox.showerror("Export Error", f"Failed to export data: {str(e)}")
@@ -214,27 +348,13 @@ class MainWindow:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open WhatsApp automation: {str(e)}")
     
-    def refresh_all_frames(self):
-        """Refresh all frames after database changes"""
-        try:
-            if hasattr(self.student_frame, 'refresh'):
-                self.student_frame.refresh()
-            if hasattr(self.timeslot_frame, 'refresh'):
-                self.timeslot_frame.refresh()
-            if hasattr(self.book_frame, 'refresh'):
-                self.book_frame.refresh()
-            if hasattr(self.analytics_frame, 'refresh'):
-                self.analytics_frame.refresh()
-        except Exception as e:
-            print(f"Error refreshing frames: {e}")
-    
-    def refresh_analytics(self):
-        """Refresh analytics frame specifically"""
+    def show_stall_report(self):
+        """Show the handlers that blocked the user interface"""
         try:
-            if hasattr(self.analytics_frame, 'refresh'):
-                self.analytics_frame.refresh()
+            from gui.stall_report import StallReportWindow
+            StallReportWindow(self.root, self.stall_watchdog)
         except Exception as e:
-            print(f"Error refreshing analytics: {e}")
+            messagebox.showerror("Error", f"Failed to open stall report: {str(e)}")
     
     def show_about(self):
         """Show about dialog"""
@@ -256,6 +376,128 @@ Built with Python, SQLite, and Tkinter
         
         messagebox.showinfo("About", about_text)
 
+    def _receipt_task_running(self, key, title):
+        """Tell the user if a receipt job with this key is still running; return True if so"""
+        task = self.receipt_tasks.get(key)
+        if task is not None and not task.done() and not task.cancelled:
+            messagebox.showinfo(title, "The previous request is still being generated. "
+                                       "Please wait for it to finish before starting another.")
+            return True
+        return False
+    
+    def generate_monthly_receipts(self):
+        """Render receipts for every subscription starting this month into the receipts folder"""
+        if self._receipt_task_running('receipt_batch', "Batch Receipts"):
+            return
+        try:
+            from utils.database_manager import DatabaseOperations
+            
+            query = '''
+                SELECT id FROM student_subscriptions
+                WHERE is_active = 1 AND start_date >= date('now', 'start of month')
+            '''
+            subscription_ids = [row['id'] for row in DatabaseOperations().db_manager.execute_query(query)]
+            if not subscription_ids:
+                messagebox.showinfo("Info", "No subscriptions start this month")
+                return
+            self._run_receipt_batch(subscription_ids=subscription_ids)
+        
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to generate receipts: {str(e)}")
+    
+    def generate_all_student_receipts(self):
+        """Render a comprehensive receipt for every active student into one zip file"""
+        if self._receipt_task_running('receipt_batch', "Batch Receipts"):
+            return
+        try:
+            from tkinter import filedialog
+            from models.student import Student
+            
+            zip_path = filedialog.asksaveasfilename(
+                title="Save Student Receipts",
+                defaultextension=".zip",
+                initialfile=f"student_receipts_{time.strftime('%Y%m%d')}.zip",
+                filetypes=[("Zip files", "*.zip"), ("All files", "*.*")]
+            )
+            if zip_path:
+                self._run_receipt_batch(student_ids=[student.id for student in Student.get_all()], zip_path=zip_path)
+        
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to generate receipts: {str(e)}")
+    
+    def generate_receipt_book(self):
+        """Write all receipts issued in a month into one PDF with an index"""
+        if self._receipt_task_running('receipt_book', "Receipt Book"):
+            return
+        try:
+            from datetime import date, datetime, timedelta
+            from tkinter import filedialog, simpledialog
+            from utils.pdf_generator import PDFGenerator
+            
+            month = simpledialog.askstring(
+                "Receipt Book", "Month (YYYY-MM):", initialvalue=date.today().strftime('%Y-%m'), parent=self.root
+            )
+            if not month:
+                return
+            start_date = datetime.strptime(month.strip(), '%Y-%m').date()
+            end_date = (start_date + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            
+            filepath = filedialog.asksaveasfilename(
+                title="Save Receipt Book",
+                defaultextension=".pdf",
+                initialfile=f"receipt_book_{start_date.strftime('%Y-%m')}.pdf",
+                filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")]
+            )
+            if not filepath:
+                return
+            
+            def show_result(outcome):
+                success, result = outcome
+                if not success:
+                    messagebox.showerror("Error", result)
+                    return
+                messagebox.showinfo(
+                    "Receipt Book",
+                    f"{result['count']} receipts ({result['pages']} pages) written in {result['seconds']:.1f} s\n\n"
+                    f"Saved to: {result['path']}"
+                )
+                self.update_status(f"Receipt book saved: {result['count']} receipts")
+            
+            self.update_status("Generating receipt book in the background...")
+            self.receipt_tasks['receipt_book'] = task_executor.submit(
+                PDFGenerator().generate_receipt_book, start_date, end_date, filepath,
+                key='receipt_book', replace=False, on_success=show_result,
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to generate receipt book: {str(e)}")
+            )
+        
+        except ValueError:
+            messagebox.showerror("Error", "Please enter the month as YYYY-MM")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to generate receipt book: {str(e)}")
+    
+    def _run_receipt_batch(self, subscription_ids=(), student_ids=(), zip_path=None):
+        """Render a receipt batch in the background and report the result"""
+        from utils.pdf_generator import PDFGenerator
+        
+        def show_result(outcome):
+            success, result = outcome
+            if not success:
+                messagebox.showerror("Error", result)
+                return
+            message = (f"Generated {result['count']} receipts in {result['seconds']:.1f} s "
+                       f"({result['per_second']:.1f} receipts/s)\n\nSaved to: {result['path']}")
+            if result['failed']:
+                message += f"\n\n{len(result['failed'])} receipts failed, e.g. {result['failed'][0][0]}: {result['failed'][0][1]}"
+            messagebox.showinfo("Batch Receipts", message)
+            self.update_status(f"Generated {result['count']} receipts")
+        
+        self.update_status("Generating receipts in the background...")
+        self.receipt_tasks['receipt_batch'] = task_executor.submit(
+            PDFGenerator().generate_receipts_batch, subscription_ids, student_ids, zip_path,
+            key='receipt_batch', replace=False, on_success=show_result,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to generate receipts: {str(e)}")
+        )
+    
     def generate_comprehensive_receipt(self):
         """Generate comprehensive receipt for a selected student"""
         try:
@@ -2,11 +2,43 @@
 Seat management interface
 """
 
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.seat import Seat
+from models.hall import Hall
 from models.subscription import Subscription
+from models.timeslot import Timeslot
 from config.database import DatabaseManager
+from utils.chart_data import chart_data_provider
+from utils.task_executor import task_executor, PRIORITY_HIGH
+from utils.events import (
+    event_bus, SeatUpdated, HallChanged, StudentDeleted, TimeslotChanged, TablesChanged,
+    SUBSCRIPTION_EVENTS
+)
+
+logger = logging.getLogger(__name__)
+
+# Seat map zoom limits; below LABEL_MIN_ZOOM seat numbers and row labels are hidden
+MIN_ZOOM = 0.2
+MAX_ZOOM = 3.0
+LABEL_MIN_ZOOM = 0.6
+
+STATUS_VIEW = "Status"
+DAY_HEATMAP_VIEW = "Heatmap: whole day"
+
+# Heatmap color stops from free to fully booked
+HEATMAP_STOPS = ((0.0, (144, 238, 144)), (0.5, (255, 215, 90)), (1.0, (220, 50, 50)))
+
+
+def heatmap_color(fraction):
+    """Interpolate the heatmap color for a booked fraction between 0 and 1"""
+    fraction = min(1.0, max(0.0, fraction))
+    for (low, low_rgb), (high, high_rgb) in zip(HEATMAP_STOPS, HEATMAP_STOPS[1:]):
+        if fraction <= high:
+            t = (fraction - low) / (high - low)
+            return '#%02x%02x%02x' % tuple(round(a + (b - a) * t) for a, b in zip(low_rgb, high_rgb))
+    return '#%02x%02x%02x' % HEATMAP_STOPS[-1][1]
 
 
 class SeatManagementFrame(ttk.Frame):
@@ -14,8 +46,51 @@ class SeatManagementFrame(ttk.Frame):
     
     def __init__(self, parent):
         super().__init__(parent)
+        # Retained seat map state: canvas items and the state they were last drawn with
+        self.seats = {}  # seat id -> Seat
+        self.seat_items = {}  # seat id -> rectangle item id
+        self.seat_colors = {}  # seat id -> current fill color
+        self.seat_occupancy_cache = {}
+        self.zoom = 1.0
+        self._label_state = None
+        self._label_font_size = None
+        self.halls = {}  # combo label -> Hall
+        self.heatmap_views = {DAY_HEATMAP_VIEW: None}  # view label -> timeslot id (None = whole day)
+        self.heatmap = None  # seat id -> booked fraction while a heatmap view is shown
         self.setup_ui()
         self.load_data()
+        
+        event_bus.subscribe_widget(self, (SeatUpdated, StudentDeleted, TablesChanged) + SUBSCRIPTION_EVENTS,
+                                   self._on_seat_events, tables=('seats', 'student_subscriptions', 'students'))
+        event_bus.subscribe_widget(self, (HallChanged, TablesChanged), self._on_hall_events, tables=('halls',))
+        event_bus.subscribe_widget(self, (TimeslotChanged, TablesChanged), self._on_timeslot_events,
+                                   tables=('timeslots',))
+    
+    def _on_hall_events(self, events):
+        """Reload the hall list and redraw the layout when halls change"""
+        self.load_halls()
+        self.draw_seat_layout()
+    
+    def _on_timeslot_events(self, events):
+        """Refresh the heatmap views, and the colors if a heatmap is shown"""
+        self.load_heatmap_views()
+        if self.heatmap is not None:
+            self.update_seats()
+    
+    def _on_seat_events(self, events):
+        """Recolor the seats affected by subscription and seat changes"""
+        seat_ids = set()
+        for event in events:
+            if isinstance(event, TablesChanged):
+                seat_ids = None  # Unknown rows: re-check every seat (still one query)
+                break
+            if isinstance(event, StudentDeleted):
+                query = "SELECT DISTINCT seat_id FROM student_subscriptions WHERE student_id = ?"
+                rows = DatabaseManager().execute_query(query, (event.student_id,))
+                seat_ids.update(row['seat_id'] for row in rows)
+            else:
+                seat_ids.add(event.seat_id)
+        self.update_seats(seat_ids)
     
     def setup_ui(self):
         """Setup user interface"""
@@ -55,28 +130,34 @@ class SeatManagementFrame(ttk.Frame):
         self.seat_id_entry = ttk.Entry(info_frame, textvariable=self.seat_id_var, state='readonly', width=15)
         self.seat_id_entry.grid(row=0, column=1, pady=2, sticky='w')
         
+        # Hall
+        ttk.Label(info_frame, text="Hall:").grid(row=1, column=0, sticky='w', pady=2)
+        self.hall_var = tk.StringVar()
+        self.hall_combo = ttk.Combobox(info_frame, textvariable=self.hall_var, state='disabled', width=15)
+        self.hall_combo.grid(row=1, column=1, pady=2, sticky='w')
+        
         # Row Number
-        ttk.Label(info_frame, text="Row Number:").grid(row=1, column=0, sticky='w', pady=2)
+        ttk.Label(info_frame, text="Row Number:").grid(row=2, column=0, sticky='w', pady=2)
         self.row_number_var = tk.StringVar()
         self.row_entry = ttk.Entry(info_frame, textvariable=self.row_number_var, state='readonly', width=15)
-        self.row_entry.grid(row=1, column=1, pady=2, sticky='w')
+        self.row_entry.grid(row=2, column=1, pady=2, sticky='w')
         
         # Gender Restriction
-        ttk.Label(info_frame, text="Gender Restriction:").grid(row=2, column=0, sticky='w', pady=2)
+        ttk.Label(info_frame, text="Gender Restriction:").grid(row=3, column=0, sticky='w', pady=2)
         self.gender_var = tk.StringVar()
         self.gender_combo = ttk.Combobox(info_frame, textvariable=self.gender_var, 
                                    values=['Male', 'Female', 'Any'], state='disabled', width=15)
-        self.gender_combo.grid(row=2, column=1, pady=2, sticky='w')
+        self.gender_combo.grid(row=3, column=1, pady=2, sticky='w')
         
         # Current Status
-        ttk.Label(info_frame, text="Current Status:").grid(row=3, column=0, sticky='w', pady=2)
+        ttk.Label(info_frame, text="Current Status:").grid(row=4, column=0, sticky='w', pady=2)
         self.status_var = tk.StringVar(value="Select mode and seat")
         status_label = ttk.Label(info_frame, textvariable=self.status_var, foreground='blue')
-        status_label.grid(row=3, column=1, pady=2, sticky='w')
+        status_label.grid(row=4, column=1, pady=2, sticky='w')
         
         # Buttons
         button_frame = ttk.Frame(info_frame)
-        button_frame.grid(row=4, column=0, columnspan=2, pady=10, sticky='ew')
+        button_frame.grid(row=5, column=0, columnspan=2, pady=10, sticky='ew')
         
         self.save_btn = ttk.Button(button_frame, text="Save Seat", command=self.save_seat)
         self.save_btn.pack(side='left', padx=5)
@@ -93,7 +174,7 @@ class SeatManagementFrame(ttk.Frame):
         
         # Diagnostic buttons
         diagnostic_frame = ttk.Frame(info_frame)
-        diagnostic_frame.grid(row=5, column=0, columnspan=2, pady=5, sticky='ew')
+        diagnostic_frame.grid(row=6, column=0, columnspan=2, pady=5, sticky='ew')
         
         ttk.Button(diagnostic_frame, text="Diagnose Seat", command=self.diagnose_seat_occupancy).pack(side='left', padx=5)
         ttk.Button(diagnostic_frame, text="Cleanup Expired", command=self.cleanup_expired_subscriptions).pack(side='left', padx=5)
@@ -143,6 +224,27 @@ class SeatManagementFrame(ttk.Frame):
         ttk.Button(control_frame, text="Refresh Layout", command=self.load_data).pack(side='left', padx=5)
         ttk.Button(control_frame, text="Reset All Seats", command=self.reset_all_seats).pack(side='left', padx=5)
         ttk.Button(control_frame, text="Fix Occupancy Issues", command=self.cleanup_expired_subscriptions).pack(side='left', padx=5)
+        ttk.Button(control_frame, text="Add Hall", command=self.add_hall).pack(side='left', padx=5)
+        ttk.Button(control_frame, text="+", width=3, command=lambda: self.zoom_seat_map(1.25)).pack(side='left', padx=(15, 2))
+        ttk.Button(control_frame, text="-", width=3, command=lambda: self.zoom_seat_map(0.8)).pack(side='left', padx=2)
+        ttk.Button(control_frame, text="Fit", width=4, command=self.zoom_to_fit).pack(side='left', padx=2)
+        
+        # Color seats by status or by how much of the day/timeslot they are booked
+        view_frame = ttk.Frame(grid_frame)
+        view_frame.pack(fill='x', pady=(0, 10))
+        ttk.Label(view_frame, text="Color by:").pack(side='left', padx=5)
+        self.view_var = tk.StringVar(value=STATUS_VIEW)
+        self.view_combo = ttk.Combobox(view_frame, textvariable=self.view_var, state='readonly', width=30)
+        self.view_combo.pack(side='left', padx=5)
+        self.view_combo.bind('<<ComboboxSelected>>', lambda e: self.change_seat_view())
+        
+        self.heatmap_legend = ttk.Frame(view_frame)
+        ttk.Label(self.heatmap_legend, text="0%").pack(side='left', padx=2)
+        gradient = tk.Canvas(self.heatmap_legend, width=120, height=16, highlightthickness=0)
+        gradient.pack(side='left')
+        for i in range(24):
+            gradient.create_rectangle(i * 5, 0, i * 5 + 5, 16, width=0, fill=heatmap_color(i / 23))
+        ttk.Label(self.heatmap_legend, text="100% booked").pack(side='left', padx=2)
         
         # Legend
         legend_frame = ttk.Frame(control_frame)
@@ -196,6 +298,25 @@ class SeatManagementFrame(ttk.Frame):
         
         # Configure canvas scroll region
         self.seat_canvas.bind('<Configure>', self.on_canvas_configure)
+        
+        # One binding for every seat; the clicked seat is found from the item tags
+        self.seat_canvas.tag_bind('seat', '<Button-1>', self.on_seat_click)
+        
+        # Wheel scrolls (Ctrl+wheel zooms), middle-button drag pans
+        self.seat_canvas.bind('<MouseWheel>', self._on_canvas_wheel)
+        self.seat_canvas.bind('<Button-4>', lambda e: self._on_canvas_wheel(e, -1))
+        self.seat_canvas.bind('<Button-5>', lambda e: self._on_canvas_wheel(e, 1))
+        self.seat_canvas.bind('<ButtonPress-2>', lambda e: self.seat_canvas.scan_mark(e.x, e.y))
+        self.seat_canvas.bind('<B2-Motion>', lambda e: self.seat_canvas.scan_dragto(e.x, e.y, gain=1))
+    
+    def on_seat_click(self, event):
+        """Select the seat under the mouse"""
+        for tag in self.seat_canvas.gettags('current'):
+            if tag.startswith('seat_'):
+                seat = self.seats.get(int(tag[5:]))
+                if seat:
+                    self.select_seat(seat)
+                return
     
     def on_canvas_configure(self, event):
         """Configure canvas scroll region"""
@@ -203,109 +324,197 @@ class SeatManagementFrame(ttk.Frame):
     
     def load_data(self):
         """Load seat data"""
+        self.load_halls()
+        self.load_heatmap_views()
         self.draw_seat_layout()
         self.clear_selection()
     
+    def load_halls(self):
+        """Load halls into the editor combo box"""
+        try:
+            self.halls = {hall.name: hall for hall in Hall.get_all()}
+            self.hall_combo['values'] = list(self.halls)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load halls: {str(e)}")
+    
+    def load_heatmap_views(self):
+        """Load the seat map views: status, whole-day heatmap and one heatmap per timeslot"""
+        try:
+            views = {DAY_HEATMAP_VIEW: None}
+            for timeslot in Timeslot.get_all():
+                views[f"Heatmap: {timeslot.name} ({timeslot.start_time}-{timeslot.end_time})"] = timeslot.id
+            self.heatmap_views = views
+            self.view_combo['values'] = [STATUS_VIEW] + list(views)
+            if self.view_var.get() not in views and self.view_var.get() != STATUS_VIEW:
+                self.view_var.set(STATUS_VIEW)
+                self.change_seat_view()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load timeslots: {str(e)}")
+    
+    def change_seat_view(self):
+        """Switch the seat map between status colors and a heatmap"""
+        if self.view_var.get() == STATUS_VIEW:
+            self.heatmap = None
+            self.heatmap_legend.pack_forget()
+        else:
+            self._load_heatmap()
+            self.heatmap_legend.pack(side='left', padx=10)
+        self.recolor_seats()
+    
+    def _load_heatmap(self):
+        """Pick the fractions of the selected view from the cached heatmap"""
+        try:
+            timeslot_id = self.heatmap_views.get(self.view_var.get())
+            self.heatmap = chart_data_provider.get_seat_heatmap().fractions(timeslot_id)
+        except Exception as e:
+            self.heatmap = {}
+            messagebox.showerror("Error", f"Failed to load occupancy heatmap: {str(e)}")
+    
+    def recolor_seats(self):
+        """Recolor every drawn seat whose color differs from the current view"""
+        for seat_id, seat in self.seats.items():
+            color = self.get_seat_color(seat)
+            if self.seat_colors.get(seat_id) != color:
+                self.seat_canvas.itemconfigure(self.seat_items[seat_id], fill=color)
+                self.seat_colors[seat_id] = color
+    
+    def add_hall(self):
+        """Create a hall with a grid of seats"""
+        from tkinter import simpledialog
+        
+        name = simpledialog.askstring("Add Hall", "Hall name:", parent=self)
+        if not name or not name.strip():
+            return
+        rows = simpledialog.askinteger("Add Hall", "Number of rows:", parent=self, minvalue=1, maxvalue=200)
+        if not rows:
+            return
+        seats_per_row = simpledialog.askinteger("Add Hall", "Seats per row:", parent=self, minvalue=1, maxvalue=200)
+        if not seats_per_row:
+            return
+        
+        try:
+            hall = Hall(name=name.strip(), display_order=len(self.halls))
+            hall.save()
+            created = hall.add_seat_rows(rows, seats_per_row)
+            messagebox.showinfo("Success", f"Hall '{hall.name}' created with {created} seats.\n"
+                                           f"Use the seat editor to set gender restrictions.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to create hall: {str(e)}")
+    
+    def update_seats(self, seat_ids=None):
+        """Recolor only the seats whose occupancy or gender restriction changed
+        
+        Falls back to a full redraw when seats were added, removed or moved.
+        """
+        if seat_ids is not None:
+            seat_ids = [seat_id for seat_id in seat_ids if seat_id is not None]
+            if not seat_ids:
+                return
+        try:
+            rows = Seat.get_layout(seat_ids)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to refresh seat layout: {str(e)}")
+            return
+        
+        found = {row['id'] for row in rows}
+        if seat_ids is None and found != set(self.seats):
+            return self.draw_seat_layout()
+        if self.heatmap is not None:
+            self._load_heatmap()
+        
+        for row in rows:
+            seat = self.seats.get(row['id'])
+            if not row['is_active'] and seat is None:
+                continue
+            if not row['is_active'] or seat is None or \
+                    (seat.hall_id, seat.pos_x, seat.pos_y) != (row['hall_id'], row['pos_x'], row['pos_y']):
+                return self.draw_seat_layout()
+            seat.gender_restriction = row['gender_restriction']
+            self.seat_occupancy_cache[seat.id] = bool(row['occupied'])
+            color = self.get_seat_color(seat)
+            if self.seat_colors.get(seat.id) != color:
+                self.seat_canvas.itemconfigure(self.seat_items[seat.id], fill=color)
+                self.seat_colors[seat.id] = color
+    
     def draw_seat_layout(self):
         """Draw seat layout on canvas"""
         try:
             self.seat_canvas.delete("all")
-            
-            # Get all seats
-            seats = Seat.get_all()
-            if not seats:
+            self.seats = {}
+            self.seat_items = {}
+            self.seat_colors = {}
+            self.seat_occupancy_cache = {}
+            self._label_state = None
+            self._label_font_size = None
+            if self.heatmap is not None:
+                self._load_heatmap()
+            
+            # Get all seats with hall, position and occupancy in one query, in drawing order
+            rows = Seat.get_layout()
+            if not rows:
                 self.seat_canvas.create_text(200, 200, text="No seats found", 
                                            font=('Arial', 16), fill='red')
                 return
             
-            # Pre-fetch occupancy status for all seats to avoid multiple DB queries
-            self.seat_occupancy_cache = {}
-            try:
-                from datetime import date
-                today = date.today()
+            # Define layout parameters (at zoom 1.0)
+            seat_size = 40
+            pitch_x = seat_size + 5
+            pitch_y = seat_size + 25  # Extra space between rows
+            start_x = 60
+            hall_gap = 40
+            
+            current_hall = object()
+            hall_top = hall_bottom = 0
+            labelled_rows = set()
+            for row in rows:
+                seat = Seat._from_row(row)
+                self.seats[seat.id] = seat
+                self.seat_occupancy_cache[seat.id] = bool(row['occupied'])
                 
-                # Get all active subscriptions in one query
-                db_manager = DatabaseManager()
-                query = '''
-                    SELECT ss.seat_id
-                    FROM student_subscriptions ss
-                    JOIN students s ON ss.student_id = s.id
-                    WHERE ss.is_active = 1 AND s.is_active = 1 AND ss.end_date >= ?
-                '''
-                active_subscriptions = db_manager.execute_query(query, (today,))
+                # Halls are stacked vertically, each with a title
+                if seat.hall_id != current_hall:
+                    title_y = hall_bottom + hall_gap if self.seat_items else 20
+                    current_hall = seat.hall_id
+                    self.seat_canvas.create_text(start_x - 50, title_y, text=row['hall_name'] or "Unassigned",
+                                                 anchor='w', font=('Arial', 12, 'bold'), tags=('hall_label',))
+                    hall_top = hall_bottom = title_y + 20
                 
-                # Create a set of occupied seat IDs
-                occupied_seat_ids = {row['seat_id'] for row in active_subscriptions}
+                x = start_x + (seat.pos_x or 0) * pitch_x
+                y = hall_top + (seat.pos_y or 0) * pitch_y
+                hall_bottom = max(hall_bottom, y + seat_size)
                 
-                # Cache occupancy status
-                for seat in seats:
-                    self.seat_occupancy_cache[seat.id] = seat.id in occupied_seat_ids
-            except Exception as e:
-                print(f"Warning: Could not pre-fetch seat occupancy: {str(e)}")
-                # If pre-fetch fails, we'll check individually when needed
-                self.seat_occupancy_cache = {}
-            
-            # Define layout parameters
-            seat_size = 40
-            gap = 5
-            seats_per_row = 10
-            start_x = 60
-            start_y = 40
-            
-            # Group seats by row for proper layout
-            rows = {}
-            for seat in seats:
-                row_num = seat.row_number
-                if row_num not in rows:
-                    rows[row_num] = []
-                rows[row_num].append(seat)
-            
-            # Draw seats row by row
-            for row_num in sorted(rows.keys()):
-                row_seats = sorted(rows[row_num], key=lambda s: s.id)
+                # Draw row label once per row
+                if (seat.hall_id, seat.pos_y) not in labelled_rows:
+                    labelled_rows.add((seat.hall_id, seat.pos_y))
+                    self.seat_canvas.create_text(start_x - 10, y + seat_size/2,
+                                               text=f"Row {seat.row_number}", anchor='e',
+                                               font=('Arial', 10, 'bold'), tags=('row_label',))
                 
-                # Calculate row position
-                y = start_y + (row_num - 1) * (seat_size + gap + 20)  # Extra space for row labels
+                # Determine seat color based on gender restriction and occupancy
+                color = self.get_seat_color(seat)
                 
-                # Draw row label
-                self.seat_canvas.create_text(start_x - 30, y + seat_size/2, 
-                                           text=f"Row {row_num}", anchor='e', 
-                                           font=('Arial', 10, 'bold'))
+                # Create a unique tag for the seat
+                seat_tag = f"seat_{seat.id}"
                 
-                # Draw seats in the row
-                seats_in_current_row = 0
-                for seat in row_seats:
-                    x = start_x + (seats_in_current_row % seats_per_row) * (seat_size + gap)
-                    
-                    # Move to next row if too many seats
-                    if seats_in_current_row > 0 and seats_in_current_row % seats_per_row == 0:
-                        y += seat_size + gap
-                    
-                    # Determine seat color based on gender restriction and occupancy
-                    color = self.get_seat_color(seat)
-                    
-                    # Create a unique tag for the seat
-                    seat_tag = f"seat_{seat.id}"
-
-                    # Draw seat rectangle
-                    self.seat_canvas.create_rectangle(
-                        x, y, x + seat_size, y + seat_size,
-                        fill=color, outline='black', width=2,
-                        tags=(seat_tag,)
-                    )
-                    
-                    # Draw seat number
-                    self.seat_canvas.create_text(
-                        x + seat_size/2, y + seat_size/2,
-                        text=str(seat.id), font=('Arial', 9, 'bold'),
-                        tags=(seat_tag,)
-                    )
-                    
-                    # Bind click event to the tag, making both rectangle and text clickable
-                    self.seat_canvas.tag_bind(seat_tag, '<Button-1>', 
-                                            lambda event, s=seat: self.select_seat(s))
-                    
-                    seats_in_current_row += 1
+                # Draw seat rectangle
+                self.seat_items[seat.id] = self.seat_canvas.create_rectangle(
+                    x, y, x + seat_size, y + seat_size,
+                    fill=color, outline='black', width=2,
+                    tags=('seat', 'seat_box', seat_tag)
+                )
+                self.seat_colors[seat.id] = color
+                
+                # Draw seat number
+                self.seat_canvas.create_text(
+                    x + seat_size/2, y + seat_size/2,
+                    text=str(seat.id), font=('Arial', 9, 'bold'),
+                    tags=('seat', 'seat_label', seat_tag)
+                )
+            
+            # Keep the current zoom across redraws
+            if self.zoom != 1.0:
+                self.seat_canvas.scale('all', 0, 0, self.zoom, self.zoom)
+            self._apply_level_of_detail()
             
             # Update canvas scroll region
             self.seat_canvas.configure(scrollregion=self.seat_canvas.bbox("all"))
@@ -313,8 +522,76 @@ class SeatManagementFrame(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to draw seat layout: {str(e)}")
     
+    def zoom_seat_map(self, factor, event=None):
+        """Scale the seat map, keeping the point under the mouse in place"""
+        zoom = min(MAX_ZOOM, max(MIN_ZOOM, self.zoom * factor))
+        factor = zoom / self.zoom
+        if factor == 1.0:
+            return
+        
+        canvas = self.seat_canvas
+        if event is not None:
+            anchor_x, anchor_y = canvas.canvasx(event.x), canvas.canvasy(event.y)
+        self.zoom = zoom
+        # Scaling about the origin keeps redraws (which re-apply self.zoom) consistent
+        canvas.scale('all', 0, 0, factor, factor)
+        self._apply_level_of_detail()
+        canvas.configure(scrollregion=canvas.bbox("all"))
+        
+        if event is not None:
+            x0, y0, x1, y1 = [float(v) for v in str(canvas.cget('scrollregion')).split()]
+            if x1 > x0:
+                canvas.xview_moveto((anchor_x * factor - event.x - x0) / (x1 - x0))
+            if y1 > y0:
+                canvas.yview_moveto((anchor_y * factor - event.y - y0) / (y1 - y0))
+    
+    def zoom_to_fit(self):
+        """Zoom so the whole layout fits the visible canvas"""
+        bbox = self.seat_canvas.bbox("all")
+        if not bbox:
+            return
+        width = self.seat_canvas.winfo_width()
+        height = self.seat_canvas.winfo_height()
+        content_width, content_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+        if width > 1 and height > 1 and content_width > 0 and content_height > 0:
+            self.zoom_seat_map(min(width / content_width, height / content_height) * 0.95)
+            self.seat_canvas.xview_moveto(0)
+            self.seat_canvas.yview_moveto(0)
+    
+    def _apply_level_of_detail(self):
+        """Hide small text when zoomed out and scale seat numbers with the zoom"""
+        canvas = self.seat_canvas
+        state = 'normal' if self.zoom >= LABEL_MIN_ZOOM else 'hidden'
+        if state != self._label_state:
+            # One call per tag, however many seats there are
+            canvas.itemconfigure('seat_label', state=state)
+            canvas.itemconfigure('row_label', state=state)
+            canvas.itemconfigure('seat_box', width=2 if state == 'normal' else 1)
+            self._label_state = state
+        
+        font_size = max(6, round(9 * self.zoom))
+        if state == 'normal' and font_size != self._label_font_size:
+            canvas.itemconfigure('seat_label', font=('Arial', font_size, 'bold'))
+            canvas.itemconfigure('row_label', font=('Arial', max(6, round(10 * self.zoom)), 'bold'))
+            self._label_font_size = font_size
+    
+    def _on_canvas_wheel(self, event, units=None):
+        """Scroll the seat map, or zoom it with Ctrl held"""
+        if units is None:
+            units = -1 if event.delta > 0 else 1
+        if event.state & 0x0004:  # Control
+            self.zoom_seat_map(1.2 if units < 0 else 1 / 1.2, event)
+        elif event.state & 0x0001:  # Shift
+            self.seat_canvas.xview_scroll(units * 2, 'units')
+        else:
+            self.seat_canvas.yview_scroll(units * 2, 'units')
+        return 'break'
+    
     def get_seat_color(self, seat):
         """Get color for seat based on gender restriction and occupancy"""
+        if self.heatmap is not None:
+            return heatmap_color(self.heatmap.get(seat.id, 0.0))
+        
         # Check if seat is currently occupied
         occupied = self.seat_occupancy_cache.get(seat.id, False)
         
@@ -359,7 +636,7 @@ class SeatManagementFrame(ttk.Frame):
             return len(current_subscriptions) > 0
             
         except Exception as e:
-            print(f"Error checking seat occupancy for seat {seat_id}: {str(e)}")
+            logger.error("Error checking seat occupancy for seat %s: %s", seat_id, e)
             return False
     
     def select_seat(self, seat):
@@ -371,6 +648,7 @@ class SeatManagementFrame(ttk.Frame):
             
             self.seat_id_var.set(str(seat.id))
             self.row_number_var.set(str(seat.row_number))
+            self.hall_var.set(next((name for name, hall in self.halls.items() if hall.id == seat.hall_id), ""))
             self.gender_var.set(seat.gender_restriction)
             
             # Check if seat is occupied
@@ -388,9 +666,8 @@ class SeatManagementFrame(ttk.Frame):
                 # delete_btn removed for data protection
                 self.gender_combo.config(state='readonly')
             
-            # Load occupancy details in a separate thread to keep UI responsive
-            import threading
-            threading.Thread(target=self._load_seat_occupancy_thread, args=(seat.id,), daemon=True).start()
+            # Load occupancy details in the background to keep UI responsive
+            self.load_seat_occupancy(seat.id)
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to select seat: {str(e)}")
@@ -403,6 +680,7 @@ class SeatManagementFrame(ttk.Frame):
             # Edit existing seat mode
             self.seat_id_entry.config(state='readonly')
             self.row_entry.config(state='readonly')
+            self.hall_combo.config(state='disabled')
             self.gender_combo.config(state='disabled')
             self.save_btn.config(state='disabled')
             self.update_btn.config(state='disabled')
@@ -414,6 +692,9 @@ class SeatManagementFrame(ttk.Frame):
             # Add new seat mode
             self.seat_id_entry.config(state='normal')
             self.row_entry.config(state='normal')
+            self.hall_combo.config(state='readonly')
+            if not self.hall_var.get() and self.halls:
+                self.hall_var.set(next(iter(self.halls)))
             self.gender_combo.config(state='readonly')
             self.save_btn.config(state='normal')
             self.update_btn.config(state='disabled')
@@ -472,14 +753,16 @@ class SeatManagementFrame(ttk.Frame):
                 f"Create new seat {seat_id} in row {row_number} with {gender} restriction?"):
                 return
             
-            # Create new seat
-            new_seat = Seat(seat_id=seat_id, row_number=row_number, gender_restriction=gender)
+            # Create new seat at the end of its row in the selected hall
+            hall = self.halls.get(self.hall_var.get())
+            new_seat = Seat(seat_id=seat_id, row_number=row_number, gender_restriction=gender,
+                            hall_id=hall.id if hall else None)
             new_seat.save()
             
             messagebox.showinfo("Success", f"Seat {seat_id} created successfully!")
             
             # Refresh the display
-            self.load_data()
+            self.draw_seat_layout()
             
             # Switch to edit mode and select the new seat
             self.editor_mode.set("edit")
@@ -489,86 +772,79 @@ class SeatManagementFrame(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to create seat: {str(e)}")
     
-    def _load_seat_occupancy_thread(self, seat_id):
-        """Load occupancy details for selected seat in a background thread"""
+    def _fetch_seat_occupancy(self, seat_id):
+        """Build the occupancy rows for a seat (runs on a worker thread)"""
+        from models.student import Student
+        from models.timeslot import Timeslot
+        
+        # Get all subscriptions for this seat (active and expired)
+        subscriptions = Subscription.get_by_seat_id(seat_id, active_only=False)
+        
+        rows = []
+        for sub in subscriptions:
+            # Get related data
+            student = Student.get_by_id(sub.student_id)
+            timeslot = Timeslot.get_by_id(sub.timeslot_id)
+            
+            if student and timeslot:
+                # Determine detailed status
+                status_parts = []
+                
+                if not student.is_active:
+                    status_parts.append("Student Inactive")
+                
+                if not sub.is_active:
+                    status_parts.append("Sub Deactivated")
+                
+                if sub.is_expired():
+                    status_parts.append("Expired")
+                
+                if not status_parts:
+                    status_parts.append("Active")
+                
+                status = " | ".join(status_parts)
+                
+                # Color coding based on status
+                if "Active" in status and len(status_parts) == 1:
+                    # True active subscription
+                    tag = "active"
+                elif "Expired" in status or "Deactivated" in status:
+                    # Problematic subscription
+                    tag = "problem"
+                else:
+                    tag = "inactive"
+                
+                rows.append(((timeslot.name, student.name, sub.start_date, sub.end_date, status), tag))
+        return rows
+    
+    def _show_seat_occupancy(self, rows):
+        """Fill the occupancy tree with rows from _fetch_seat_occupancy"""
         try:
-            from datetime import date
-            today = date.today()
-            
-            # Get all subscriptions for this seat (active and expired)
-            subscriptions = Subscription.get_by_seat_id(seat_id, active_only=False)
+            # Clear existing items
+            for item in self.occupancy_tree.get_children():
+                self.occupancy_tree.delete(item)
             
-            # Schedule UI update on main thread
-            def update_ui():
-                try:
-                    # Clear existing items
-                    for item in self.occupancy_tree.get_children():
-                        self.occupancy_tree.delete(item)
-                    
-                    for sub in subscriptions:
-                        # Get related data
-                        from models.student import Student
-                        from models.timeslot import Timeslot
-                        
-                        student = Student.get_by_id(sub.student_id)
-                        timeslot = Timeslot.get_by_id(sub.timeslot_id)
-                        
-                        if student and timeslot:
-                            # Determine detailed status
-                            status_parts = []
-                            
-                            if not student.is_active:
-                                status_parts.append("Student Inactive")
-                            
-                            if not sub.is_active:
-                                status_parts.append("Sub Deactivated")
-                            
-                            if sub.is_expired():
-                                status_parts.append("Expired")
-                            
-                            if not status_parts:
-                                status_parts.append("Active")
-                            
-                            status = " | ".join(status_parts)
-                            
-                            # Color coding based on status
-                            if "Active" in status and len(status_parts) == 1:
-                                # True active subscription
-                                tag = "active"
-                            elif "Expired" in status or "Deactivated" in status:
-                                # Problematic subscription
-                                tag = "problem"
-                            else:
-                                tag = "inactive"
-                            
-                            item = self.occupancy_tree.insert('', 'end', values=(
-                                timeslot.name,
-                                student.name,
-                                sub.start_date,
-                                sub.end_date,
-                                status
-                            ), tags=(tag,))
-                    
-                    # Configure tag colors
-                    self.occupancy_tree.tag_configure("active", background="lightgreen")
-                    self.occupancy_tree.tag_configure("problem", background="lightcoral")
-                    self.occupancy_tree.tag_configure("inactive", background="lightgray")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to update seat occupancy UI: {str(e)}")
+            for values, tag in rows:
+                self.occupancy_tree.insert('', 'end', values=values, tags=(tag,))
             
-            # Schedule UI update on main thread
-            if hasattr(self, 'seat_canvas') and self.seat_canvas.winfo_exists():
-                self.seat_canvas.after(0, update_ui)
-        
+            # Configure tag colors
+            self.occupancy_tree.tag_configure("active", background="lightgreen")
+            self.occupancy_tree.tag_configure("problem", background="lightcoral")
+            self.occupancy_tree.tag_configure("inactive", background="lightgray")
         except Exception as e:
-            # Schedule error message on main thread
-            if hasattr(self, 'seat_canvas') and self.seat_canvas.winfo_exists():
-                self.seat_canvas.after(0, lambda: messagebox.showerror("Error", f"Failed to load seat occupancy: {str(e)}"))
+            messagebox.showerror("Error", f"Failed to update seat occupancy UI: {str(e)}")
     
     def load_seat_occupancy(self, seat_id):
-        """Load occupancy details for selected seat (deprecated - use _load_seat_occupancy_thread instead)"""
-        import threading
-        threading.Thread(target=self._load_seat_occupancy_thread, args=(seat_id,), daemon=True).start()
+        """Load occupancy details for a seat in the background
+        
+        Selecting another seat supersedes a load that has not finished yet.
+        """
+        task_executor.submit(
+            self._fetch_seat_occupancy, seat_id,
+            key='seat_occupancy', priority=PRIORITY_HIGH, widget=self,
+            on_success=self._show_seat_occupancy,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load seat occupancy: {str(e)}")
+        )
     
     def update_seat_gender(self):
         """Update seat gender restriction"""
@@ -606,8 +882,8 @@ class SeatManagementFrame(ttk.Frame):
             
             messagebox.showinfo("Success", f"Seat {seat.id} gender restriction updated to {new_gender}")
             
-            # Refresh the display
-            self.draw_seat_layout()
+            # Recolor just this seat
+            self.update_seats([seat.id])
             self.select_seat(seat)  # Reselect the seat to refresh info
             
         except Exception as e:
@@ -655,42 +931,39 @@ class SeatManagementFrame(ttk.Frame):
     
     def reset_all_seats(self):
         """Reset all seats to default configuration"""
+        from config.settings import DEFAULT_SEAT_LAYOUT
+        
+        summary = "\n".join(f"• Row {row}: Seats {first}-{last} for {gender}"
+                             for row, first, last, gender in DEFAULT_SEAT_LAYOUT)
         if not messagebox.askyesno("Confirmation", 
-            "This will reset all seats to their default gender configuration:\n"
-            "• Row 1 and 10: Seats 1-9 and 72-82 for Girls\n"
-            "• Row 2-9: Seats 10-71 for Boys\n\n"
+            "This will reset the default seats to their gender configuration:\n"
+            f"{summary}\n\n"
             "Occupied seats will NOT be changed.\n"
             "Are you sure you want to continue?"):
             return
         
         try:
-            seats = Seat.get_all()
-            updated_count = 0
+            defaults = {seat_id: gender for _, first, last, gender in DEFAULT_SEAT_LAYOUT
+                        for seat_id in range(first, last + 1)}
+            changes = []
             skipped_count = 0
             
-            for seat in seats:
-                # Skip occupied seats
-                if self.is_seat_occupied(seat.id):
+            # One query for every seat's restriction and occupancy
+            for row in Seat.get_layout():
+                default = defaults.get(row['id'])
+                if default is None or row['gender_restriction'] == default:
+                    continue
+                if row['occupied']:
                     skipped_count += 1
                     continue
-                
-                # Apply default configuration
-                if seat.id <= 9 or (72 <= seat.id <= 82):
-                    # Girls seats (Row 1 and 10)
-                    if seat.gender_restriction != 'Female':
-                        seat.gender_restriction = 'Female'
-                        seat.save()
-                        updated_count += 1
-                elif 10 <= seat.id <= 71:
-                    # Boys seats (Row 2-9)
-                    if seat.gender_restriction != 'Male':
-                        seat.gender_restriction = 'Male'
-                        seat.save()
-                        updated_count += 1
+                changes.append((row['id'], default))
+            
+            updated_count = Seat.bulk_update_gender(changes)
             
             message = f"Reset completed!\n• {updated_count} seats updated\n• {skipped_count} occupied seats skipped"
             messagebox.showinfo("Reset Complete", message)
-            self.load_data()
+            self.update_seats()
+            self.clear_selection()
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to reset seats: {str(e)}")
@@ -709,7 +982,7 @@ class SeatManagementFrame(ttk.Frame):
     
     def refresh(self):
         """Refresh the seat management interface"""
-        self.load_data()
+        self.update_seats()
     
     def cleanup_expired_subscriptions(self):
         """Clean up expired subscriptions that might be causing false 'occupied' status"""
@@ -933,7 +1206,7 @@ class SeatManagementFrame(ttk.Frame):
                         restored_count += 1
                     except Exception as e:
                         failed_count += 1
-                        print(f"Failed to restore seat {seat_id}: {e}")
+                        logger.warning("Failed to restore seat %s: %s", seat_id, e)
                 
                 if restored_count > 0:
                     messagebox.showinfo("Success", 
@@ -958,7 +1231,7 @@ class SeatManagementFrame(ttk.Frame):
                             restored_count += 1
                         except Exception as e:
                             failed_count += 1
-                            print(f"Failed to restore seat {seat.id}: {e}")
+                            logger.warning("Failed to restore seat %s: %s", seat.id, e)
                     
                     if restored_count > 0:
                         messagebox.showinfo("Success", 
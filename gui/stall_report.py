@@ -0,0 +1,88 @@
+"""
+UI stall report window
+"""
+
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+
+class StallReportWindow:
+    """Shows the handlers that blocked the main loop, worst first"""
+
+    def __init__(self, parent, watchdog):
+        self.watchdog = watchdog
+        self.rows = {}
+        self.window = tk.Toplevel(parent)
+        self.window.title("UI Stall Report")
+        self.window.geometry("900x550")
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        """Setup report widgets"""
+        main_frame = ttk.Frame(self.window, padding=10)
+        main_frame.pack(fill='both', expand=True)
+
+        control_frame = ttk.Frame(main_frame)
+        control_frame.pack(fill='x', pady=(0, 10))
+        self.status_var = tk.StringVar()
+        ttk.Label(control_frame, textvariable=self.status_var).pack(side='left')
+        ttk.Button(control_frame, text="Close", command=self.window.destroy).pack(side='right', padx=5)
+        ttk.Button(control_frame, text="Reset", command=self.reset).pack(side='right', padx=5)
+        self.toggle_btn = ttk.Button(control_frame, command=self.toggle)
+        self.toggle_btn.pack(side='right', padx=5)
+        ttk.Button(control_frame, text="Refresh", command=self.refresh).pack(side='right', padx=5)
+
+        columns = ('Handler', 'Location', 'Stalls', 'Total (ms)', 'Worst (ms)')
+        self.tree = ttk.Treeview(main_frame, columns=columns, show='headings', height=10)
+        widths = (260, 330, 70, 90, 90)
+        for column, width in zip(columns, widths):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width, anchor='w' if width > 100 else 'e')
+        self.tree.pack(fill='both', expand=True)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+
+        ttk.Label(main_frame, text="Main thread stack during the worst stall:").pack(anchor='w', pady=(10, 2))
+        self.stack_text = scrolledtext.ScrolledText(main_frame, height=10, font=('Courier', 9), state='disabled')
+        self.stack_text.pack(fill='both', expand=True)
+
+    def refresh(self):
+        """Reload the report from the watchdog"""
+        self.tree.delete(*self.tree.get_children())
+        self.rows = {}
+        report = self.watchdog.get_report()
+        for index, row in enumerate(report):
+            iid = str(index)
+            self.rows[iid] = row
+            self.tree.insert('', 'end', iid=iid, values=(
+                row['handler'], row['location'], row['stalls'],
+                f"{row['total_ms']:.0f}", f"{row['worst_ms']:.0f}"
+            ))
+        state = "on" if self.watchdog.running else "off"
+        self.status_var.set(f"Monitoring {state} - {sum(row['stalls'] for row in report)} stalls recorded")
+        self.toggle_btn.config(text="Stop Monitoring" if self.watchdog.running else "Start Monitoring")
+        self._show_stack("")
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self._show_stack(self.rows[selection[0]]['stack'] or "")
+
+    def _show_stack(self, text):
+        self.stack_text.config(state='normal')
+        self.stack_text.delete('1.0', 'end')
+        self.stack_text.insert('1.0', text)
+        self.stack_text.config(state='disabled')
+
+    def toggle(self):
+        """Start or stop the watchdog"""
+        if self.watchdog.running:
+            self.watchdog.stop()
+        else:
+            self.watchdog.start()
+        self.refresh()
+
+    def reset(self):
+        """Clear the collected stalls"""
+        self.watchdog.reset()
+        self.refresh()
@@ -7,7 +7,6 @@ from tkinter import ttk, messagebox
 import logging
 import os
 import subprocess
-import threading
 from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from models.student import Student
@@ -15,6 +14,14 @@ from models.subscription import Subscription
 from models.seat import Seat
 from models.timeslot import Timeslot
 from utils.validators import Validators, ValidationError
+from gui.virtual_tree import VirtualTreeview
+from gui.live_search import LiveSearch
+from utils.events import (
+    event_bus, StudentSaved, StudentDeleted, TimeslotChanged, TablesChanged, SUBSCRIPTION_EVENTS
+)
+from utils.task_executor import task_executor, PRIORITY_LOW
+
+logger = logging.getLogger(__name__)
 
 
 class StudentManagementFrame(ttk.Frame):
@@ -26,14 +33,22 @@ class StudentManagementFrame(ttk.Frame):
         self.timeslots = {}
         self.available_seats = {}
         self.current_student_id = None
-        self.analytics_refresh_callback = None
         
         self.setup_ui()
         self.load_data()
+        
+        event_bus.subscribe_widget(self, (StudentSaved, StudentDeleted, TablesChanged) + SUBSCRIPTION_EVENTS,
+                                   self._on_student_events, tables=('students', 'student_subscriptions'))
+        event_bus.subscribe_widget(self, (TimeslotChanged, TablesChanged), lambda events: self.load_timeslots(),
+                                   tables=('timeslots',))
     
-    def set_analytics_refresh_callback(self, callback):
-        """Set callback function to refresh analytics"""
-        self.analytics_refresh_callback = callback
+    def _on_student_events(self, events):
+        """Apply student and subscription changes to the list and the open student"""
+        self.student_tree.refresh_changes()
+        if self.current_student_id and any(
+                isinstance(event, TablesChanged) or getattr(event, 'student_id', None) == self.current_student_id
+                for event in events):
+            self.load_student_subscriptions(self.current_student_id)
     
     def set_today_date(self):
         """Set registration date to today"""
@@ -335,23 +350,21 @@ class StudentManagementFrame(ttk.Frame):
         # Configure search frame column weights
         search_frame.columnconfigure(1, weight=1)
         
-        # Student list
+        # Student list (virtualized: only the visible rows are fetched and rendered)
         columns = ('ID', 'Name', 'Gender', 'Mobile', 'Registration Date', 'Active Subscriptions')
-        self.student_tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
+        self.student_tree = VirtualTreeview(list_frame, columns=columns, height=15,
+                                            row_values=self._student_row_values)
         
         for col in columns:
             self.student_tree.heading(col, text=col)
             self.student_tree.column(col, width=100)
         
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.student_tree.yview)
-        h_scrollbar = ttk.Scrollbar(list_frame, orient='horizontal', command=self.student_tree.xview)
-        self.student_tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        # Grid layout for tree (scrollbars are part of the widget)
+        self.student_tree.grid(row=1, column=0, rowspan=2, columnspan=2, sticky='nsew')
         
-        # Grid layout for tree and scrollbars
-        self.student_tree.grid(row=1, column=0, sticky='nsew')
-        v_scrollbar.grid(row=1, column=1, sticky='ns')
-        h_scrollbar.grid(row=2, column=0, sticky='ew')
+        # Search as you type (debounced, runs off the Tk thread)
+        self.student_search = LiveSearch(self, self.search_var, self._query_students,
+                                         self._show_student_results, name="Student search")
         
         # Configure grid weights
         list_frame.rowconfigure(1, weight=1)
@@ -411,27 +424,23 @@ class StudentManagementFrame(ttk.Frame):
     
     def load_students(self):
         """Load students into the tree"""
-        # Clear existing items
-        for item in self.student_tree.get_children():
-            self.student_tree.delete(item)
-        
         try:
-            students = Student.get_all()
-            for student in students:
-                # Get active subscriptions count
-                active_subs = len(student.get_active_subscriptions())
-                
-                self.student_tree.insert('', 'end', values=(
-                    student.id,
-                    student.name,
-                    student.gender,
-                    student.mobile_number,
-                    student.registration_date,
-                    active_subs
-                ))
+            self.student_tree.set_pager(Student.list_pager())
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load students: {str(e)}")
     
+    @staticmethod
+    def _student_row_values(row):
+        """Format a student list row"""
+        return (
+            row['id'],
+            row['name'],
+            row['gender'],
+            row['mobile_number'],
+            row['registration_date'],
+            row['active_subscriptions']
+        )
+    
     def load_timeslots(self):
         """Load timeslots into combo box"""
         try:
@@ -601,7 +610,7 @@ class StudentManagementFrame(ttk.Frame):
                     student.save()
                     
                     messagebox.showinfo("Success", "Student updated successfully!")
-                    self.load_students()
+                    self.student_tree.refresh_changes()
                     return
             
             # Create new student
@@ -611,7 +620,7 @@ class StudentManagementFrame(ttk.Frame):
             messagebox.showinfo("Success", 
                 f"Student '{validated_data['name']}' created successfully!\n"
                 f"You can now add subscriptions using the 'Add Subscription' button.")
-            self.load_students()
+            self.student_tree.refresh_changes()
             
             # Select the newly created student in the tree
             self.select_student_by_id(student_id)
@@ -721,15 +730,9 @@ class StudentManagementFrame(ttk.Frame):
             from utils.whatsapp_automation import WhatsAppAutomation
             whatsapp = WhatsAppAutomation()
             
-            def send_message_thread():
-                try:
-                    # Check if WhatsApp is initialized
-                    if not whatsapp.driver:
-                        messagebox.showerror("Error", "WhatsApp automation is not initialized. Please initialize WhatsApp first.")
-                        return
-                    
-                    # Create comprehensive message with enhanced details
-                    message = f"""📚 *{student_data['name']} - Complete Profile*
+            def send_message():
+                # Create comprehensive message with enhanced details (runs on a worker thread)
+                message = f"""📚 *{student_data['name']} - Complete Profile*
 
 👤 *Student Information:*
 • Name: {student_data['name']}
@@ -748,19 +751,19 @@ class StudentManagementFrame(ttk.Frame):
 
 📝 *Complete Subscription History:*"""
 
-                    for i, sub in enumerate(subscription_details, 1):
-                        if sub['status'] == 'Active':
-                            status_emoji = "✅"
-                        elif sub['status'] == 'Upcoming':
-                            status_emoji = "🔜"
-                        else:
-                            status_emoji = "❌"
-                        
-                        seat_info = f"Seat {sub['seat_number']}"
-                        if sub['seat_row']:
-                            seat_info += f" ({sub['seat_row']})"
-                        
-                        message += f"""
+                for i, sub in enumerate(subscription_details, 1):
+                    if sub['status'] == 'Active':
+                        status_emoji = "✅"
+                    elif sub['status'] == 'Upcoming':
+                        status_emoji = "🔜"
+                    else:
+                        status_emoji = "❌"
+                    
+                    seat_info = f"Seat {sub['seat_number']}"
+                    if sub['seat_row']:
+                        seat_info += f" ({sub['seat_row']})"
+                    
+                    message += f"""
 
 {i}. {status_emoji} *Receipt: {sub['receipt_number']}*
    • {seat_info}
@@ -771,19 +774,19 @@ class StudentManagementFrame(ttk.Frame):
    • Status: {sub['status']}
    • Registered: {sub['created_date']}"""
 
-                    # Add current active subscription details if any
-                    current_active = [sub for sub in subscription_details if sub['status'] == 'Active']
-                    if current_active:
-                        message += f"""
+                # Add current active subscription details if any
+                current_active = [sub for sub in subscription_details if sub['status'] == 'Active']
+                if current_active:
+                    message += f"""
 
 🎯 *Current Active Subscription(s):*"""
-                        for sub in current_active:
-                            days_remaining = (datetime.strptime(sub['end_date'], '%Y-%m-%d').date() - datetime.now().date()).days
-                            message += f"""
+                    for sub in current_active:
+                        days_remaining = (datetime.strptime(sub['end_date'], '%Y-%m-%d').date() - datetime.now().date()).days
+                        message += f"""
 • Seat {sub['seat_number']} - {sub['timeslot_name']}
 • Valid until: {sub['end_date']} ({days_remaining} days remaining)"""
 
-                    message += f"""
+                message += f"""
 
 📍 *{LIBRARY_NAME}*
 📞 {LIBRARY_PHONE}
@@ -794,16 +797,17 @@ Thank you for being part of our library family! 📚✨
 
 _This message contains complete subscription history for {student_data['name']}_"""
 
-                    # Send comprehensive message
-                    success, result = whatsapp.send_message(student_data['mobile_number'], message)
-                    
-                    if success:
-                        messagebox.showinfo("Success", f"Comprehensive details sent to {student_data['name']}")
-                    else:
-                        messagebox.showerror("Error", f"Failed to send message: {result}")
-                        
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to send WhatsApp message: {str(e)}")
+                # Send comprehensive message
+                return whatsapp.send_message(student_data['mobile_number'], message)
+            
+            def show_result(outcome):
+                success, result = outcome
+                if success:
+                    messagebox.showinfo("Success", f"Comprehensive details sent to {student_data['name']}")
+                elif success is None:
+                    messagebox.showwarning("Not Confirmed", f"{result}\n\nCheck WhatsApp before sending it again.")
+                else:
+                    messagebox.showerror("Error", f"Failed to send message: {result}")
             
             # Import library settings for message
             from config.settings import LIBRARY_NAME, LIBRARY_PHONE, LIBRARY_EMAIL, LIBRARY_ADDRESS
@@ -824,21 +828,26 @@ _This message contains complete subscription history for {student_data['name']}_
 This will send ALL subscription history and current status."""
             
             if messagebox.askyesno("Confirm WhatsApp Message", confirmation_msg):
-                import threading
-                threading.Thread(target=send_message_thread, daemon=True).start()
+                # Check if WhatsApp is initialized
+                if not whatsapp.driver:
+                    messagebox.showerror("Error", "WhatsApp automation is not initialized. Please initialize WhatsApp first.")
+                    return
+                
+                # One send per student at a time, however often the button is clicked
+                task_executor.submit(
+                    send_message, key=f"whatsapp_profile:{self.current_student_id}",
+                    priority=PRIORITY_LOW, replace=False, widget=self,
+                    on_success=show_result,
+                    on_error=lambda e: messagebox.showerror("Error", f"Failed to send WhatsApp message: {str(e)}")
+                )
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to send comprehensive details: {str(e)}")
     
     def select_student_by_id(self, student_id):
         """Select a student in the tree by their ID"""
-        for item in self.student_tree.get_children():
-            item_values = self.student_tree.item(item)['values']
-            if item_values[0] == student_id:
-                self.student_tree.selection_set(item)
-                self.student_tree.focus(item)
-                self.on_student_select(None)  # Trigger selection event
-                break
+        if self.student_tree.select_row(student_id):
+            self.on_student_select(None)  # Trigger selection event
     
     def clear_form(self):
         """Clear the form"""
@@ -882,7 +891,7 @@ This will send ALL subscription history and current status."""
                 if student:
                     student.delete()
                     messagebox.showinfo("Success", "Student deleted successfully!")
-                    self.load_students()
+                    self.student_tree.refresh_changes()
                     self.clear_form()
         
         except Exception as e:
@@ -983,7 +992,7 @@ This will send ALL subscription history and current status."""
                 f"Receipt Number: {subscription.receipt_number}")
             
             # Refresh interface
-            self.load_students()
+            self.student_tree.refresh_changes()
             self.load_student_subscriptions(student_id)
             self.select_student_by_id(student_id)
             
@@ -1194,35 +1203,28 @@ This will send ALL subscription history and current status."""
     
     def search_students(self):
         """Search students"""
-        search_term = self.search_var.get().strip()
-        if not search_term:
-            self.load_students()
-            return
-        
+        self.student_search.search_now()
+    
+    def _query_students(self, search_term, connection):
+        """Fetch the first page of a student search (runs on a worker thread)"""
+        pager = Student.list_pager(search_term or None)
+        pager.connection = connection
         try:
-            # Clear existing items
-            for item in self.student_tree.get_children():
-                self.student_tree.delete(item)
-            
-            students = Student.search(search_term)
-            for student in students:
-                active_subs = len(student.get_active_subscriptions())
-                
-                self.student_tree.insert('', 'end', values=(
-                    student.id,
-                    student.name,
-                    student.gender,
-                    student.mobile_number,
-                    student.registration_date,
-                    active_subs
-                ))
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Search failed: {str(e)}")
+            snapshot = pager.snapshot(self.student_tree.page_size)
+        finally:
+            pager.connection = None
+        return pager, snapshot
+    
+    def _show_student_results(self, search_term, result):
+        """Show the latest student search result"""
+        pager, snapshot = result
+        self.student_tree.set_pager(pager, snapshot=snapshot)
     
     def refresh(self):
         """Refresh the interface"""
-        self.load_data()
+        # Only rows changed since the last sync are re-fetched and redrawn
+        self.student_tree.refresh_changes()
+        self.load_timeslots()
     
     def on_subscription_select(self, event):
         """Handle subscription selection"""
@@ -1281,7 +1283,7 @@ This will send ALL subscription history and current status."""
                 student_item = self.student_tree.item(student_selection[0])
                 student_id = student_item['values'][0]
                 self.load_student_subscriptions(student_id)
-                self.load_students()  # Refresh student list to update subscription count
+                self.student_tree.refresh_changes()  # Refresh student list to update subscription count
     
     def renew_subscription(self):
         """Renew selected subscription"""
@@ -1300,11 +1302,7 @@ This will send ALL subscription history and current status."""
                 student_item = self.student_tree.item(student_selection[0])
                 student_id = student_item['values'][0]
                 self.load_student_subscriptions(student_id)
-                self.load_students()  # Refresh student list to update subscription count
-                
-                # Refresh analytics if callback is set
-                if self.analytics_refresh_callback:
-                    self.analytics_refresh_callback()
+                self.student_tree.refresh_changes()  # Refresh student list to update subscription count
     
     def delete_subscription(self):
         """Delete selected subscription"""
@@ -1330,7 +1328,7 @@ This will send ALL subscription history and current status."""
                     student_item = self.student_tree.item(student_selection[0])
                     student_id = student_item['values'][0]
                     self.load_student_subscriptions(student_id)
-                    self.load_students()  # Refresh student list to update subscription count
+                    self.student_tree.refresh_changes()  # Refresh student list to update subscription count
                     
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete subscription: {str(e)}")
@@ -1353,16 +1351,11 @@ This will send ALL subscription history and current status."""
                 messagebox.showerror("Error", "Failed to get complete subscription data")
                 return
             
-            # Generate PDF
+            # Reuses the saved PDF unless the subscription or student changed since
             pdf_generator = PDFGenerator()
-            filename = f"receipt_{subscription.receipt_number}.pdf"
-            
-            success, result = pdf_generator.generate_subscription_receipt(
-                subscription, student, seat, timeslot, filename
-            )
+            success, result = pdf_generator.get_subscription_receipt(subscription, student, seat, timeslot)
             
             if success:
-                messagebox.showinfo("Success", f"Receipt saved as {filename}")
                 # Open the PDF file
                 import subprocess
                 import os
@@ -1372,7 +1365,8 @@ This will send ALL subscription history and current status."""
                     elif os.name == 'posix':  # Linux/Mac
                         subprocess.run(['xdg-open', result], check=True)
                 except Exception as e:
-                    print(f"Could not open PDF: {e}")
+                    logger.warning("Could not open PDF: %s", e)
+                    messagebox.showinfo("Receipt", f"Receipt saved as {result}")
             else:
                 messagebox.showerror("Error", f"Failed to generate receipt: {result}")
                 
@@ -1692,10 +1686,6 @@ class SubscriptionRenewalDialog(tk.Toplevel):
             self.renewed = True
             messagebox.showinfo("Success", f"Subscription renewed successfully!\nNew period: {self.subscription.start_date} to {self.subscription.end_date}")
             
-            # Call analytics refresh callback if available
-            if hasattr(self.parent, 'analytics_refresh_callback') and self.parent.analytics_refresh_callback:
-                self.parent.analytics_refresh_callback()
-            
             self.destroy()
             
         except ValueError:
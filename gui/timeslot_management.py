@@ -6,6 +6,11 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from models.timeslot import Timeslot
 from utils.validators import Validators, ValidationError
+from utils.chart_data import chart_data_provider
+from gui.virtual_tree import sync_treeview
+from utils.events import (
+    event_bus, TimeslotChanged, SeatUpdated, StudentDeleted, TablesChanged, SUBSCRIPTION_EVENTS
+)
 
 
 class TimeslotManagementFrame(ttk.Frame):
@@ -13,13 +18,13 @@ class TimeslotManagementFrame(ttk.Frame):
     
     def __init__(self, parent):
         super().__init__(parent)
-        self.refresh_callback = None  # Callback for when timeslots are updated
         self.setup_ui()
         self.load_data()
-    
-    def set_refresh_callback(self, callback):
-        """Set callback function to refresh other interfaces when timeslots change"""
-        self.refresh_callback = callback
+        
+        # The list shows timeslot fields and occupancy rates
+        event_bus.subscribe_widget(
+            self, (TimeslotChanged, SeatUpdated, StudentDeleted, TablesChanged) + SUBSCRIPTION_EVENTS,
+            lambda events: self.load_data(), tables=('timeslots', 'seats', 'student_subscriptions'))
     
     def setup_ui(self):
         """Setup user interface"""
@@ -197,15 +202,14 @@ class TimeslotManagementFrame(ttk.Frame):
 
     def load_data(self):
         """Load timeslots into the tree"""
-        # Clear existing items
-        for item in self.timeslot_tree.get_children():
-            self.timeslot_tree.delete(item)
-        
         try:
+            items = []
             timeslots = Timeslot.get_all()
+            occupancy_rates = {item['id']: item['rate']
+                               for item in chart_data_provider.get_occupancy_rates()}
             for timeslot in timeslots:
                 # Calculate occupancy rate
-                occupancy_rate = timeslot.get_occupancy_rate()
+                occupancy_rate = occupancy_rates.get(timeslot.id, 0)
                 
                 # Format time display for overnight timeslots
                 start_time = timeslot.start_time
@@ -231,7 +235,7 @@ class TimeslotManagementFrame(ttk.Frame):
                 except:
                     time_display = f"{start_time} - {end_time}"
                 
-                self.timeslot_tree.insert('', 'end', values=(
+                items.append((timeslot.id, (
                     timeslot.id,
                     timeslot.name,
                     start_time,
@@ -240,7 +244,10 @@ class TimeslotManagementFrame(ttk.Frame):
                     f"{timeslot.duration_months} months",
                     "Yes" if timeslot.lockers_available else "No",
                     f"{occupancy_rate:.1f}%"
-                ))
+                )))
+            
+            # Update rows in place so unchanged timeslots (and the selection) are left alone
+            sync_treeview(self.timeslot_tree, items)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load timeslots: {str(e)}")
     
@@ -321,10 +328,6 @@ class TimeslotManagementFrame(ttk.Frame):
             self.load_data()
             self.clear_form()
             
-            # Refresh other interfaces that depend on timeslots
-            if self.refresh_callback:
-                self.refresh_callback()
-            
         except ValidationError as e:
             messagebox.showerror("Validation Error", str(e))
         except Exception as e:
@@ -355,10 +358,6 @@ class TimeslotManagementFrame(ttk.Frame):
                     messagebox.showinfo("Success", "Timeslot deleted successfully!")
                     self.load_data()
                     self.clear_form()
-                    
-                    # Refresh other interfaces that depend on timeslots
-                    if self.refresh_callback:
-                        self.refresh_callback()
         
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete timeslot: {str(e)}")
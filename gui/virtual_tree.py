@@ -0,0 +1,400 @@
+"""
+Virtualized list widget for large tables
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+
+class VirtualTreeview(ttk.Frame):
+    """Treeview that only renders the visible rows of a KeysetPager
+
+    Rows are fetched page by page (keyset pagination, sorted in SQLite) into a small
+    LRU cache that acts as the scroll buffer. The selected row is remembered while it
+    is scrolled out of view, so selection()/item() keep working like a plain Treeview.
+    Columns such as active subscriptions or overdue status depend on today's date
+    without the rows changing, so the list is reloaded when the date changes.
+    """
+
+    def __init__(self, parent, columns, row_values, row_id=None, page_size=100,
+                 max_cached_pages=10, height=15):
+        super().__init__(parent)
+        self.row_values = row_values
+        self.row_id = row_id or (lambda row: row['id'])
+        self.page_size = page_size
+        self.max_cached_pages = max_cached_pages
+        self.pager = None
+        self.total = 0
+        self.offset = 0
+        self.visible_rows = height
+        self._pages = OrderedDict()  # page number -> rows, least recently used first
+        self._rendered = {}  # iid -> values currently shown in the Treeview
+        self.watermarks = {}  # change source table -> high-water mark at the last sync
+        self._loaded_on = None  # Date of the last full load
+        self._day_change_id = None
+        self._selected = None  # (iid, item dict, row id) of the selected row
+        self._window_ids = {}  # iid -> row id of the rows in the visible window
+        self._select_handlers = []
+
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', height=height)
+        self.v_scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        h_scrollbar = ttk.Scrollbar(self, orient='horizontal', command=self.tree.xview)
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.v_scrollbar.grid(row=0, column=1, sticky='ns')
+        h_scrollbar.grid(row=1, column=0, sticky='ew')
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll_units(-3))
+        self.tree.bind('<Button-5>', lambda e: self._scroll_units(3))
+        self.tree.bind('<Down>', lambda e: self._on_arrow(1))
+        self.tree.bind('<Up>', lambda e: self._on_arrow(-1))
+        self.tree.bind('<Next>', lambda e: self._scroll_units(self.visible_rows))
+        self.tree.bind('<Prior>', lambda e: self._scroll_units(-self.visible_rows))
+        self.tree.bind('<Destroy>', self._on_destroy, add='+')
+        self._schedule_day_change()
+
+    # Data
+
+    def set_pager(self, pager, keep_position=False, snapshot=None):
+        """Show the rows of a new pager
+        
+        snapshot is an optional result of pager.snapshot(page_size) fetched in the background.
+        """
+        self.pager = pager
+        self._pages.clear()
+        self._loaded_on = _query_date()
+        if snapshot is not None:
+            self.watermarks = snapshot['watermarks']
+            self.total = snapshot['total']
+            self._pages[0] = snapshot['first_page']
+        else:
+            # Taken before counting so writes racing with the load are picked up next sync
+            self.watermarks = pager.watermarks()
+            self.total = pager.count()
+        if not keep_position:
+            self.offset = 0
+        # A search or filter may hide the selected row; don't let selection() return it
+        if self._selected and (not keep_position or not pager.rows_for_ids([self._selected[2]])):
+            self._selected = None
+        self.offset = self._clamp(self.offset)
+        self._render()
+
+    def refresh(self):
+        """Reload the current pager, keeping the scroll position"""
+        if self.pager is not None:
+            self.set_pager(self.pager, keep_position=True)
+
+    def refresh_changes(self):
+        """Apply rows changed since the last sync instead of reloading the list
+        
+        Returns the number of changed list ids that were looked at.
+        """
+        if self.pager is None:
+            return 0
+        if not self.pager.change_sources or self._loaded_on != _query_date():
+            self.refresh()
+            return self.total
+
+        new_watermarks = self.pager.watermarks()
+        changed = self.pager.changed_ids(self.watermarks)
+        self.watermarks = new_watermarks
+        if not changed:
+            return 0
+
+        current = self.pager.rows_for_ids(changed)
+        cached = {}
+        for page_no, rows in self._pages.items():
+            for index, row in enumerate(rows):
+                row_id = self.row_id(row)
+                if row_id in changed:
+                    cached[row_id] = (page_no, index)
+
+        structural = False
+        check_count = False
+        for row_id in changed:
+            row = current.get(row_id)
+            location = cached.get(row_id)
+            if location is None:
+                # Not loaded here: a new row shifts positions, a vanished one may change the count
+                structural = structural or row is not None
+                check_count = check_count or row is None
+                continue
+            page_no, index = location
+            old_row = self._pages[page_no][index]
+            if row is None or self.pager.key_of(row) != self.pager.key_of(old_row):
+                structural = True  # Removed or moved to another position
+            else:
+                self._pages[page_no][index] = row
+
+        if structural or check_count:
+            total = self.pager.count()
+            if structural or total != self.total:
+                self.total = total
+                self._pages.clear()
+                self.offset = self._clamp(self.offset)
+
+        self._render()
+        return len(changed)
+
+    def _schedule_day_change(self):
+        """Reload the list just after the date of the list queries changes"""
+        now = datetime.now(timezone.utc)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        delay_ms = int((midnight - now).total_seconds() * 1000) + 1000
+        self._day_change_id = self.after(delay_ms, self._on_day_change)
+
+    def _on_day_change(self):
+        if self._loaded_on != _query_date():
+            self.refresh()
+        self._schedule_day_change()
+
+    def _on_destroy(self, event):
+        if event.widget is self.tree and self._day_change_id is not None:
+            self.after_cancel(self._day_change_id)
+            self._day_change_id = None
+
+    def _page(self, page_no):
+        """Return a page of rows, fetching it with a keyset query if needed"""
+        rows = self._pages.get(page_no)
+        if rows is not None:
+            self._pages.move_to_end(page_no)
+            return rows
+
+        after = None
+        if page_no > 0:
+            previous = self._pages.get(page_no - 1)
+            if previous and len(previous) == self.page_size:
+                after = self.pager.key_of(previous[-1])
+            else:
+                after = self.pager.seek(page_no * self.page_size)
+
+        rows = list(self.pager.page(after, self.page_size))
+        self._pages[page_no] = rows
+        while len(self._pages) > self.max_cached_pages:
+            self._pages.popitem(last=False)
+        return rows
+
+    def _rows(self, start, count):
+        """Return rows [start, start + count) from the page cache"""
+        if self.pager is None or count <= 0:
+            return []
+        rows = []
+        first_page = start // self.page_size
+        last_page = (start + count - 1) // self.page_size
+        for page_no in range(first_page, last_page + 1):
+            rows.extend(self._page(page_no))
+        skip = start - first_page * self.page_size
+        return rows[skip:skip + count]
+
+    # Rendering
+
+    def _render(self):
+        """Sync the Treeview items with the visible window"""
+        rows = self._rows(self.offset, self.visible_rows)
+        wanted = [(str(self.row_id(row)), self.row_values(row)) for row in rows]
+        wanted_ids = {iid for iid, _ in wanted}
+        self._window_ids = {str(self.row_id(row)): self.row_id(row) for row in rows}
+
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted_ids]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                self._rendered.pop(iid, None)
+
+        # Only touch items whose values changed or that are new to the window
+        for index, (iid, values) in enumerate(wanted):
+            if iid in self._rendered:
+                if self._rendered[iid] != values:
+                    self.tree.item(iid, values=values)
+            else:
+                self.tree.insert('', index, iid=iid, values=values)
+            self._rendered[iid] = values
+
+        order = [iid for iid, _ in wanted]
+        if list(self.tree.get_children()) != order:
+            for index, iid in enumerate(order):
+                self.tree.move(iid, '', index)
+
+        # Re-select the remembered row when it scrolls back into view
+        if self._selected and self.tree.exists(self._selected[0]) \
+                and self._selected[0] not in self.tree.selection():
+            self.tree.selection_set(self._selected[0])
+
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self.total <= 0:
+            self.v_scrollbar.set(0, 1)
+        else:
+            first = self.offset / self.total
+            last = min(1.0, (self.offset + self.visible_rows) / self.total)
+            self.v_scrollbar.set(first, last)
+
+    # Scrolling
+
+    def _clamp(self, offset):
+        return min(max(0, offset), max(0, self.total - self.visible_rows))
+
+    def scroll_to(self, offset):
+        """Scroll so that the row at offset is the first visible row"""
+        offset = self._clamp(offset)
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _scroll_units(self, rows):
+        self.scroll_to(self.offset + rows)
+        return 'break'
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(value) * self.total))
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_to(self.offset + int(value) * step)
+
+    def _on_mousewheel(self, event):
+        return self._scroll_units(-3 if event.delta > 0 else 3)
+
+    def _on_arrow(self, direction):
+        """Scroll the window when keyboard navigation reaches its edge"""
+        children = self.tree.get_children()
+        if not children:
+            return None
+        edge = children[-1] if direction > 0 else children[0]
+        if self.tree.focus() != edge:
+            return None  # Let the Treeview move within the window
+
+        before = self.offset
+        self.scroll_to(self.offset + direction)
+        if self.offset == before:
+            return 'break'
+        children = self.tree.get_children()
+        target = children[-1] if direction > 0 else children[0]
+        self.tree.selection_set(target)
+        self.tree.focus(target)
+        return 'break'
+
+    def _on_configure(self, event):
+        """Recompute how many rows fit when the widget is resized"""
+        row_height = 20
+        header_height = 25
+        children = self.tree.get_children()
+        if children:
+            bbox = self.tree.bbox(children[0])
+            if bbox:
+                header_height, row_height = bbox[1], bbox[3]
+        rows = max(1, (event.height - header_height) // row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.offset = self._clamp(self.offset)
+            self._render()
+
+    # Selection
+
+    def _on_tree_select(self, event):
+        selection = self.tree.selection()
+        if not selection:
+            return  # Rows scrolled out of the window keep their logical selection
+        iid = selection[0]
+        if self._selected and self._selected[0] == iid:
+            return
+        self._selected = (iid, self.tree.item(iid), self._window_ids.get(iid))
+        for handler in self._select_handlers:
+            handler(event)
+
+    def select_row(self, row_id, column='id'):
+        """Scroll to the row whose column equals row_id and select it"""
+        if self.pager is None:
+            return False
+        row = self.pager.find(column, row_id)
+        if row is None:
+            return False
+        position = self.pager.position_of(self.pager.key_of(row))
+        self.scroll_to(position - self.visible_rows // 2)
+        iid = str(self.row_id(row))
+        if not self.tree.exists(iid):
+            return False
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)
+        self.tree.see(iid)
+        return True
+
+    # Treeview compatibility
+
+    def bind(self, sequence=None, func=None, add=None):
+        if sequence == '<<TreeviewSelect>>' and func is not None:
+            self._select_handlers.append(func)
+            return None
+        return self.tree.bind(sequence, func, add)
+
+    def selection(self):
+        selection = self.tree.selection()
+        if selection:
+            return selection
+        return (self._selected[0],) if self._selected else ()
+
+    def selection_set(self, *items):
+        items = [iid for iid in items if self.tree.exists(iid)]
+        if items:
+            self.tree.selection_set(*items)
+
+    def selection_remove(self, *items):
+        self._selected = None
+        current = self.tree.selection()
+        if current:
+            self.tree.selection_remove(*current)
+
+    def item(self, iid, option=None, **kw):
+        if self.tree.exists(iid):
+            return self.tree.item(iid, option, **kw)
+        if self._selected and self._selected[0] == iid:
+            data = self._selected[1]
+            return data[option] if option else dict(data)
+        raise tk.TclError(f'Item {iid} not found')
+
+    def heading(self, column, option=None, **kw):
+        return self.tree.heading(column, option, **kw)
+
+    def column(self, column, option=None, **kw):
+        return self.tree.column(column, option, **kw)
+
+    def get_children(self, item=None):
+        return self.tree.get_children(item)
+
+    def focus(self, item=None):
+        return self.tree.focus(item)
+
+    def see(self, item):
+        if self.tree.exists(item):
+            self.tree.see(item)
+
+
+def _query_date():
+    """Today's date as SQLite's date('now') sees it (UTC)"""
+    return datetime.now(timezone.utc).date()
+
+
+def sync_treeview(tree, items):
+    """Update a plain Treeview in place from (iid, values) pairs, touching only changed items"""
+    wanted = {str(iid): tuple(values) for iid, values in items}
+    stale = [iid for iid in tree.get_children() if iid not in wanted]
+    if stale:
+        tree.delete(*stale)
+
+    for index, (iid, values) in enumerate(wanted.items()):
+        if tree.exists(iid):
+            # Compare as strings since Tk hands values back converted
+            if tuple(str(v) for v in tree.item(iid, 'values')) != tuple(str(v) for v in values):
+                tree.item(iid, values=values)
+            tree.move(iid, '', index)
+        else:
+            tree.insert('', index, iid=iid, values=values)
@@ -2,12 +2,18 @@
 WhatsApp automation window
 """
 
+import logging
 import os
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
 from utils.whatsapp_automation import WhatsAppAutomation
 from models.subscription import Subscription
+from utils.task_executor import task_executor, PRIORITY_HIGH
+from gui.log_panel import LogPanel
+from config.settings import LOGS_DIR
+
+logger = logging.getLogger(__name__)
 
 
 class WhatsAppWindow:
@@ -16,6 +22,7 @@ class WhatsAppWindow:
     def __init__(self, parent):
         self.parent = parent
         self.whatsapp = WhatsAppAutomation()
+        self.log_panel = LogPanel(os.path.join(LOGS_DIR, "whatsapp.log"))
         self.setup_window()
     
     def setup_window(self):
@@ -63,6 +70,19 @@ class WhatsAppWindow:
         
         # Custom messages tab
         self.create_custom_messages_tab(notebook)
+        
+        # Point out messages an interrupted run left in the outbox
+        task_executor.submit(self.whatsapp.outbox_status, key='whatsapp_outbox_counts', widget=self.window,
+                             on_success=self.report_outbox)
+    
+    def report_outbox(self, counts):
+        """Log unsent outbox messages found when the window opens"""
+        if counts is None:  # Messages are being sent right now
+            return
+        unsent = counts.get('pending', 0) + counts.get('uncertain', 0)
+        if unsent:
+            self.log_message(f"⚠️ {unsent} messages from an earlier run were not sent; "
+                             "log in and use 'Resume Unsent Messages' to continue")
     
     def start_status_monitor(self):
         """Start periodic status monitoring"""
@@ -208,6 +228,10 @@ Note: Keep this window open while using WhatsApp automation.
         close_btn.grid(row=0, column=3, sticky='ew', padx=5, pady=5)
         self.create_tooltip(close_btn, "Close WhatsApp Web browser session")
         
+        resume_btn = ttk.Button(button_frame, text="Resume Unsent Messages", command=self.resume_outbox)
+        resume_btn.grid(row=1, column=0, columnspan=2, sticky='ew', padx=5, pady=5)
+        self.create_tooltip(resume_btn, "Send messages left in the outbox by an interrupted run")
+        
         # Diagnostic frame
         diagnostic_frame = ttk.LabelFrame(login_frame, text="Diagnostic Tools", padding=10)
         diagnostic_frame.grid(row=3, column=0, sticky='ew', pady=10, padx=10)
@@ -229,6 +253,7 @@ Note: Keep this window open while using WhatsApp automation.
         
         self.log_text = scrolledtext.ScrolledText(log_frame, height=10, state='disabled', wrap='word')
         self.log_text.grid(row=0, column=0, sticky='nsew')
+        self.log_panel.attach(self.log_text)
     
     def create_reminders_tab(self, parent):
         """Create subscription reminders tab"""
@@ -509,33 +534,8 @@ The message includes readmission contact information and encourages them to retu
         self.results_text.grid(row=0, column=0, sticky='nsew')
     
     def log_message(self, message):
-        """Add message to log - thread safe version"""
-        def update_log():
-            try:
-                # Check if widget still exists
-                if hasattr(self, 'log_text') and self.log_text.winfo_exists():
-                    from datetime import datetime
-                    timestamp = datetime.now().strftime('%H:%M:%S')
-                    self.log_text.config(state='normal')
-                    self.log_text.insert('end', f"[{timestamp}] {message}\n")
-                    self.log_text.see('end')
-                    self.log_text.config(state='disabled')
-                    # Force update the GUI
-                    self.log_text.update_idletasks()
-            except Exception as e:
-                # Fallback to console logging if GUI fails
-                print(f"GUI Log Error: {e} - Message: {message}")
-        
-        # Always print to console for debugging
-        print(f"WhatsApp Log: {message}")
-        
-        # Schedule GUI update on main thread
-        try:
-            if hasattr(self, 'window') and self.window:
-                self.window.after(0, update_log)
-        except Exception as e:
-            # If after() fails, just print to console
-            print(f"Error scheduling GUI update: {e}")
+        """Add message to log - thread safe, drawn in batches and written to the log file"""
+        self.log_panel.append(message)
     
     def initialize_whatsapp(self):
         """Initialize WhatsApp Web"""
@@ -807,7 +807,7 @@ The message includes readmission contact information and encourages them to retu
                 if hasattr(self, 'window') and self.window.winfo_exists():
                     self.window.update_idletasks()
         except Exception as e:
-            print(f"Error updating progress: {e}")
+            logger.error("Error updating progress: %s", e)
     
     def update_ui_responsively(self):
         """Update UI elements responsively"""
@@ -847,55 +847,55 @@ The message includes readmission contact information and encourages them to retu
             except Exception:
                 pass
         
-        def check_thread():
+        def check():
+            """Return the connection status to show (runs on a worker thread)"""
+            if not self.whatsapp.driver:
+                self.log_message("WhatsApp driver not initialized")
+                return "Not connected"
+            
+            # Use the comprehensive login status check method
             try:
-                if not self.whatsapp.driver:
-                    self.window.after(0, lambda: self.status_var.set("Not connected"))
-                    self.log_message("WhatsApp driver not initialized")
-                    self.window.after(0, restore_button_text)
-                    return
+                is_logged_in, status_message = self.whatsapp.check_login_status()
                 
-                # Use the comprehensive login status check method
-                try:
-                    is_logged_in, status_message = self.whatsapp.check_login_status()
-                    
-                    if is_logged_in:
-                        self.whatsapp.is_logged_in = True
-                        self.window.after(0, lambda: self.status_var.set("Connected"))
-                        self.log_message("✅ WhatsApp is connected and ready")
-                        self.log_message(f"Status details: {status_message}")
-                    else:
-                        self.whatsapp.is_logged_in = False
-                        if "QR code" in status_message:
-                            self.window.after(0, lambda: self.status_var.set("Waiting for QR scan"))
-                            self.log_message("📱 QR code visible - please scan to login")
-                        elif "loading" in status_message.lower():
-                            self.window.after(0, lambda: self.status_var.set("Loading..."))
-                            self.log_message("⏳ WhatsApp Web is loading...")
-                        else:
-                            self.window.after(0, lambda: self.status_var.set("Disconnected"))
-                            self.log_message(f"❌ Not connected: {status_message}")
-                        
-                except Exception as e:
-                    # Handle connection errors gracefully
-                    error_str = str(e).lower()
-                    if any(error in error_str for error in ["connection refused", "session deleted", "chrome not reachable"]):
-                        self.whatsapp.is_logged_in = False
-                        self.window.after(0, lambda: self.status_var.set("Browser crashed"))
-                        self.log_message("❌ Browser session ended or crashed")
-                    else:
-                        self.whatsapp.is_logged_in = False
-                        self.window.after(0, lambda: self.status_var.set("Error"))
-                        self.log_message(f"❌ Error checking status: {str(e)}")
+                if is_logged_in:
+                    self.whatsapp.is_logged_in = True
+                    self.log_message("✅ WhatsApp is connected and ready")
+                    self.log_message(f"Status details: {status_message}")
+                    return "Connected"
+                
+                self.whatsapp.is_logged_in = False
+                if "QR code" in status_message:
+                    self.log_message("📱 QR code visible - please scan to login")
+                    return "Waiting for QR scan"
+                elif "loading" in status_message.lower():
+                    self.log_message("⏳ WhatsApp Web is loading...")
+                    return "Loading..."
+                else:
+                    self.log_message(f"❌ Not connected: {status_message}")
+                    return "Disconnected"
                     
             except Exception as e:
-                self.window.after(0, lambda: self.status_var.set("Error"))
-                self.log_message(f"❌ Status check failed: {str(e)}")
-            finally:
-                self.window.after(0, restore_button_text)
-        
-        # Run status check in background thread
-        threading.Thread(target=check_thread, daemon=True).start()
+                # Handle connection errors gracefully
+                self.whatsapp.is_logged_in = False
+                error_str = str(e).lower()
+                if any(error in error_str for error in ["connection refused", "session deleted", "chrome not reachable"]):
+                    self.log_message("❌ Browser session ended or crashed")
+                    return "Browser crashed"
+                self.log_message(f"❌ Error checking status: {str(e)}")
+                return "Error"
+        
+        def show_status(status):
+            self.status_var.set(status)
+            restore_button_text()
+        
+        def show_error(error):
+            self.status_var.set("Error")
+            self.log_message(f"❌ Status check failed: {str(error)}")
+            restore_button_text()
+        
+        # Run status check in the background; repeated clicks join the check in flight
+        task_executor.submit(check, key='whatsapp_status', replace=False, widget=self.window,
+                             on_success=show_status, on_error=show_error)
     
     def update_button_text(self, parent, old_text, new_text):
         """Update button text recursively"""
@@ -911,49 +911,48 @@ The message includes readmission contact information and encourages them to retu
     def force_status_check(self):
         """Force an immediate status check with detailed logging"""
         def force_check():
+            """Return the connection status to show (runs on a worker thread)"""
+            self.log_message("🔄 Forcing status check...")
+            
+            if not self.whatsapp.driver:
+                self.log_message("❌ No driver initialized")
+                return "Not connected"
+            
+            # Check current URL
             try:
-                self.log_message("🔄 Forcing status check...")
-                
-                if not self.whatsapp.driver:
-                    self.window.after(0, lambda: self.status_var.set("Not connected"))
-                    self.log_message("❌ No driver initialized")
-                    return
-                
-                # Check current URL
-                try:
-                    current_url = self.whatsapp.driver.current_url
-                    self.log_message(f"📍 Current URL: {current_url}")
-                except Exception as e:
-                    self.log_message(f"❌ Cannot get current URL: {e}")
-                    self.window.after(0, lambda: self.status_var.set("Error"))
-                    return
-                
-                # Use comprehensive status check
-                is_logged_in, status_message = self.whatsapp.check_login_status()
-                self.log_message(f"🔍 Status check result: {status_message}")
-                
-                if is_logged_in:
-                    self.whatsapp.is_logged_in = True
-                    self.window.after(0, lambda: self.status_var.set("Connected"))
-                    self.log_message("✅ WhatsApp is connected!")
-                else:
-                    self.whatsapp.is_logged_in = False
-                    if "QR code" in status_message:
-                        self.window.after(0, lambda: self.status_var.set("Waiting for QR scan"))
-                        self.log_message("📱 QR code visible - please scan to login")
-                    elif "loading" in status_message.lower():
-                        self.window.after(0, lambda: self.status_var.set("Loading"))
-                        self.log_message("⏳ Page still loading...")
-                    else:
-                        self.window.after(0, lambda: self.status_var.set("Not connected"))
-                        self.log_message(f"❌ Not connected: {status_message}")
-                    
+                current_url = self.whatsapp.driver.current_url
+                self.log_message(f"📍 Current URL: {current_url}")
             except Exception as e:
-                self.log_message(f"❌ Force status check failed: {str(e)}")
-                self.window.after(0, lambda: self.status_var.set("Error"))
+                self.log_message(f"❌ Cannot get current URL: {e}")
+                return "Error"
+            
+            # Use comprehensive status check
+            is_logged_in, status_message = self.whatsapp.check_login_status()
+            self.log_message(f"🔍 Status check result: {status_message}")
+            
+            if is_logged_in:
+                self.whatsapp.is_logged_in = True
+                self.log_message("✅ WhatsApp is connected!")
+                return "Connected"
+            
+            self.whatsapp.is_logged_in = False
+            if "QR code" in status_message:
+                self.log_message("📱 QR code visible - please scan to login")
+                return "Waiting for QR scan"
+            elif "loading" in status_message.lower():
+                self.log_message("⏳ Page still loading...")
+                return "Loading"
+            else:
+                self.log_message(f"❌ Not connected: {status_message}")
+                return "Not connected"
+        
+        def show_error(error):
+            self.log_message(f"❌ Force status check failed: {str(error)}")
+            self.status_var.set("Error")
         
-        # Run in background thread
-        threading.Thread(target=force_check, daemon=True).start()
+        # Run in the background, sharing the key with check_status so checks never stack
+        task_executor.submit(force_check, key='whatsapp_status', replace=False, widget=self.window,
+                             on_success=self.status_var.set, on_error=show_error)
     
     def close_whatsapp(self):
         """Close WhatsApp connection"""
@@ -966,105 +965,79 @@ The message includes readmission contact information and encourages them to retu
     
     def load_expiring_subscriptions(self):
         """Load expiring subscriptions"""
-        # Find and disable the load button temporarily
+        def set_load_button(old_text, new_text, state):
+            try:
+                for widget in self.window.winfo_children():
+                    if isinstance(widget, ttk.Frame):
+                        for child in widget.winfo_children():
+                            if isinstance(child, ttk.Notebook):
+                                for tab in child.tabs():
+                                    tab_frame = child.nametowidget(tab)
+                                    self.update_button_text(tab_frame, old_text, new_text)
+                                    self.set_button_state(tab_frame, "Load Expiring Subscriptions", state)
+            except Exception:
+                pass
+        
         try:
-            for widget in self.window.winfo_children():
-                if isinstance(widget, ttk.Frame):
-                    for child in widget.winfo_children():
-                        if isinstance(child, ttk.Notebook):
-                            for tab in child.tabs():
-                                tab_frame = child.nametowidget(tab)
-                                self.update_button_text(tab_frame, "Load Expiring Subscriptions", "Loading...")
-                                self.set_button_state(tab_frame, "Load Expiring Subscriptions", 'disabled')
-        except Exception:
-            pass
+            days = int(self.reminder_days_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a valid number of days")
+            return
         
-        def load_thread():
-            try:
-                # Get data in background thread
-                days = int(self.reminder_days_var.get())
-                # Fetch both expiring and already expired subscriptions
-                expiring_subs = Subscription.get_expiring_soon(days=days)
-                already_expired_subs = Subscription.get_all_expired_subscriptions()
+        # Find and disable the load button temporarily
+        set_load_button("Load Expiring Subscriptions", "Loading...", 'disabled')
+        
+        def fetch():
+            # Fetch both expiring and already expired subscriptions
+            expiring_subs = Subscription.get_expiring_soon(days=days)
+            already_expired_subs = Subscription.get_all_expired_subscriptions()
 
-                # Combine and remove duplicates (if any)
-                all_subs_dict = {sub['id']: sub for sub in expiring_subs}
-                for sub in already_expired_subs:
-                    if sub['id'] not in all_subs_dict:
-                        all_subs_dict[sub['id']] = sub
-            
-                combined_subs = list(all_subs_dict.values())
-                
-                # Update UI in main thread
-                def update_ui():
-                    try:
-                        # Clear existing items
-                        # Clear existing items and selections
-                        for item in self.reminder_tree.get_children():
-                            self.reminder_tree.delete(item)
-                        self.reminder_selections.clear()
-                        
-                        for sub in combined_subs:
-                            from datetime import datetime, date
-                            end_date = datetime.strptime(sub['end_date'], '%Y-%m-%d').date()
-                            days_left = (end_date - date.today()).days
-                            
-                            item_id = self.reminder_tree.insert('', 'end', values=(
-                                '☐',  # Unchecked checkbox
-                                sub['student_name'],
-                                sub['mobile_number'],
-                                f"Seat {sub['seat_number']}",
-                                sub['timeslot_name'],
-                                sub['end_date'],
-                                days_left
-                            ))
-                            # Store subscription data for this item
-                            self.reminder_selections[item_id] = {'selected': False, 'data': sub}
-                        
-                        self.log_message(f"Loaded {len(combined_subs)} students for reminders (expiring and expired)")                     
-                    except Exception as e:
-                        self.log_message(f"Error updating UI: {str(e)}")
-                        messagebox.showerror("Error", f"Failed to load expiring subscriptions: {str(e)}")
-                    finally:
-                        # Re-enable button and restore text
-                        try:
-                            for widget in self.window.winfo_children():
-                                if isinstance(widget, ttk.Frame):
-                                    for child in widget.winfo_children():
-                                        if isinstance(child, ttk.Notebook):
-                                            for tab in child.tabs():
-                                                tab_frame = child.nametowidget(tab)
-                                                self.update_button_text(tab_frame, "Loading...", "Load Expiring Subscriptions")
-                                                self.set_button_state(tab_frame, "Load Expiring Subscriptions", 'normal')
-                        except Exception:
-                            pass
+            # Combine and remove duplicates (if any)
+            all_subs_dict = {sub['id']: sub for sub in expiring_subs}
+            for sub in already_expired_subs:
+                if sub['id'] not in all_subs_dict:
+                    all_subs_dict[sub['id']] = sub
+            return list(all_subs_dict.values())
+        
+        def update_ui(combined_subs):
+            try:
+                # Clear existing items and selections
+                for item in self.reminder_tree.get_children():
+                    self.reminder_tree.delete(item)
+                self.reminder_selections.clear()
                 
-                # Schedule UI update on main thread
-                if hasattr(self, 'window') and self.window.winfo_exists():
-                    self.window.after(0, update_ui)
+                from datetime import datetime, date
+                for sub in combined_subs:
+                    end_date = datetime.strptime(sub['end_date'], '%Y-%m-%d').date()
+                    days_left = (end_date - date.today()).days
                     
+                    item_id = self.reminder_tree.insert('', 'end', values=(
+                        '☐',  # Unchecked checkbox
+                        sub['student_name'],
+                        sub['mobile_number'],
+                        f"Seat {sub['seat_number']}",
+                        sub['timeslot_name'],
+                        sub['end_date'],
+                        days_left
+                    ))
+                    # Store subscription data for this item
+                    self.reminder_selections[item_id] = {'selected': False, 'data': sub}
+                
+                self.log_message(f"Loaded {len(combined_subs)} students for reminders (expiring and expired)")
             except Exception as e:
-                # Schedule error message on main thread
-                if hasattr(self, 'window') and self.window.winfo_exists():
-                    error_msg = str(e)  # Capture the error message
-                    def show_error():
-                        messagebox.showerror("Error", f"Failed to load expiring subscriptions: {error_msg}")
-                        # Re-enable button
-                        try:
-                            for widget in self.window.winfo_children():
-                                if isinstance(widget, ttk.Frame):
-                                    for child in widget.winfo_children():
-                                        if isinstance(child, ttk.Notebook):
-                                            for tab in child.tabs():
-                                                tab_frame = child.nametowidget(tab)
-                                                self.update_button_text(tab_frame, "Loading...", "Load Expiring Subscriptions")
-                                                self.set_button_state(tab_frame, "Load Expiring Subscriptions", 'normal')
-                        except Exception:
-                            pass
-                    self.window.after(0, show_error)
+                self.log_message(f"Error updating UI: {str(e)}")
+                messagebox.showerror("Error", f"Failed to load expiring subscriptions: {str(e)}")
+            finally:
+                # Re-enable button and restore text
+                set_load_button("Loading...", "Load Expiring Subscriptions", 'normal')
+        
+        def show_error(error):
+            messagebox.showerror("Error", f"Failed to load expiring subscriptions: {str(error)}")
+            set_load_button("Loading...", "Load Expiring Subscriptions", 'normal')
         
-        # Run in background thread
-        threading.Thread(target=load_thread, daemon=True).start()
+        # Load in the background; a newer request supersedes one still running
+        task_executor.submit(fetch, key='whatsapp_expiring', priority=PRIORITY_HIGH, widget=self.window,
+                             on_success=update_ui, on_error=show_error)
     
     def send_subscription_reminders(self):
         """Send subscription reminder messages with improved responsiveness"""
@@ -1095,34 +1068,19 @@ The message includes readmission contact information and encourages them to retu
             try:
                 self.log_message(f"Starting to send subscription reminders to {len(selected_subs)} students...")
                 
-                # Send messages with progress updates
-                total = len(selected_subs)
-                success_count = 0
-                fail_count = 0
-                
-                # Process in smaller batches for better responsiveness
-                batch_size = 5
-                for i in range(0, total, batch_size):
-                    batch = selected_subs[i:i+batch_size]
-                    
-                    # Update progress
-                    progress_msg = f"Sending subscription reminders... ({i+1}-{min(i+batch_size, total)}/{total})"
-                    self.window.after(0, lambda msg=progress_msg: self.update_progress(msg))
-                    
-                    # Send batch
-                    batch_success, batch_fail = self.whatsapp.send_subscription_reminders(batch)
-                    success_count += batch_success
-                    fail_count += batch_fail
-                    
-                    # Brief pause to allow UI updates
-                    import time
-                    time.sleep(0.1)
+                # Sent through the outbox: students already reminded for this term are skipped
+                results = self.whatsapp.send_subscription_reminders(
+                    selected_subs, progress=self._outbox_progress("Sending subscription reminders")
+                )
+                success_count = sum(1 for result in results if result['success'])
+                fail_count = len(results) - success_count
                 
                 # Update UI in main thread
                 def update_ui():
                     self.set_buttons_state(self.reminder_tree.master.master, 'normal')
                     self.update_progress("")
                     self.log_message(f"✅ Subscription reminders sent! Success: {success_count}, Failed: {fail_count}")
+                    self.log_send_timings()
                     messagebox.showinfo("Messages Sent", 
                                       f"Subscription reminders sent successfully!\n\nSuccess: {success_count}\nFailed: {fail_count}")
                 
@@ -1143,59 +1101,44 @@ The message includes readmission contact information and encourages them to retu
     
     def load_expired_subscriptions(self):
         """Load expired subscriptions for cancellation messages"""
-        def load_thread():
+        def update_ui(expired_subs):
             try:
-                # Get all expired subscriptions
-                from models.subscription import Subscription
-                expired_subs = Subscription.get_all_expired_subscriptions()
+                # Clear existing items
+                for item in self.cancellation_tree.get_children():
+                    self.cancellation_tree.delete(item)
+                self.cancellation_selections.clear()
                 
-                def update_ui():
-                    try:
-                        # Clear existing items
-                        for item in self.cancellation_tree.get_children():
-                            self.cancellation_tree.delete(item)
-                        self.cancellation_selections.clear()
-                        
-                        # Add expired subscriptions to tree
-                        for sub in expired_subs:
-                            from datetime import date, datetime
-                            
-                            # Calculate days expired
-                            end_date = datetime.strptime(sub['end_date'], '%Y-%m-%d').date()
-                            days_expired = (date.today() - end_date).days
-                            
-                            item_id = self.cancellation_tree.insert('', 'end', values=(
-                                '☐',  # Unchecked checkbox
-                                sub['student_name'],
-                                sub['mobile_number'],
-                                sub['seat_number'],
-                                sub['timeslot_name'],
-                                sub['end_date'],
-                                f"{days_expired} days"
-                            ))
-                            # Store subscription data for this item
-                            self.cancellation_selections[item_id] = {'selected': False, 'data': sub}
-                        
-                        self.log_message(f"Loaded {len(expired_subs)} expired subscriptions for cancellation")
-                        
-                    except Exception as e:
-                        self.log_message(f"Error updating UI: {str(e)}")
-                        messagebox.showerror("Error", f"Failed to load expired subscriptions: {str(e)}")
-                
-                # Schedule UI update on main thread
-                if hasattr(self, 'window') and self.window.winfo_exists():
-                    self.window.after(0, update_ui)
+                # Add expired subscriptions to tree
+                from datetime import date, datetime
+                for sub in expired_subs:
+                    # Calculate days expired
+                    end_date = datetime.strptime(sub['end_date'], '%Y-%m-%d').date()
+                    days_expired = (date.today() - end_date).days
                     
+                    item_id = self.cancellation_tree.insert('', 'end', values=(
+                        '☐',  # Unchecked checkbox
+                        sub['student_name'],
+                        sub['mobile_number'],
+                        sub['seat_number'],
+                        sub['timeslot_name'],
+                        sub['end_date'],
+                        f"{days_expired} days"
+                    ))
+                    # Store subscription data for this item
+                    self.cancellation_selections[item_id] = {'selected': False, 'data': sub}
+                
+                self.log_message(f"Loaded {len(expired_subs)} expired subscriptions for cancellation")
+                
             except Exception as e:
-                # Schedule error message on main thread
-                if hasattr(self, 'window') and self.window.winfo_exists():
-                    error_msg = str(e)  # Capture the error message
-                    def show_error():
-                        messagebox.showerror("Error", f"Failed to load expired subscriptions: {error_msg}")
-                    self.window.after(0, show_error)
-        
-        # Run in background thread
-        threading.Thread(target=load_thread, daemon=True).start()
+                self.log_message(f"Error updating UI: {str(e)}")
+                messagebox.showerror("Error", f"Failed to load expired subscriptions: {str(e)}")
+        
+        # Load in the background; a newer request supersedes one still running
+        task_executor.submit(
+            Subscription.get_all_expired_subscriptions,
+            key='whatsapp_expired', priority=PRIORITY_HIGH, widget=self.window, on_success=update_ui,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load expired subscriptions: {str(e)}")
+        )
     
     def send_cancellation_messages(self):
         """Send cancellation messages to selected students with improved responsiveness"""
@@ -1222,51 +1165,97 @@ The message includes readmission contact information and encourages them to retu
             try:
                 self.log_message(f"Starting to send cancellation messages to {len(selected_students)} students...")
                 
-                # Send messages with progress updates
-                total = len(selected_students)
-                success_count = 0
-                fail_count = 0
-                
-                # Process in smaller batches for better responsiveness
-                batch_size = 5
-                for i in range(0, total, batch_size):
-                    batch = selected_students[i:i+batch_size]
-                    
-                    # Update progress
-                    progress_msg = f"Sending cancellation messages... ({i+1}-{min(i+batch_size, total)}/{total})"
-                    self.window.after(0, lambda msg=progress_msg: self.update_progress(msg))
-                    
-                    # Send batch
-                    batch_success, batch_fail = self.whatsapp.send_subscription_cancellations(batch)
-                    success_count += batch_success
-                    fail_count += batch_fail
-                    
-                    # Brief pause to allow UI updates
-                    import time
-                    time.sleep(0.1)
+                results = self.whatsapp.send_subscription_cancellations(
+                    selected_students, progress=self._outbox_progress("Sending cancellation messages")
+                )
+                success_count = sum(1 for result in results if result['success'])
+                fail_count = len(results) - success_count
                 
                 # Update UI in main thread
                 def update_ui():
                     self.set_buttons_state(self.cancellation_tree.master.master, 'normal')
                     self.update_progress("")
                     self.log_message(f"✅ Cancellation messages sent! Success: {success_count}, Failed: {fail_count}")
+                    self.log_send_timings()
                     messagebox.showinfo("Messages Sent", 
                                       f"Cancellation messages sent successfully!\n\nSuccess: {success_count}\nFailed: {fail_count}")
                 
                 self.window.after(0, update_ui)
                 
             except Exception as e:
-                def show_error():
-                    self.set_buttons_state(self.cancellations_frame, 'normal')
+                error_msg = str(e)
+                def show_error(msg=error_msg):
+                    self.set_buttons_state(self.cancellation_tree.master.master, 'normal')
                     self.update_progress("")
-                    self.log_message(f"❌ Error sending cancellation messages: {str(e)}")
-                    messagebox.showerror("Error", f"Failed to send cancellation messages: {str(e)}")
+                    self.log_message(f"❌ Error sending cancellation messages: {msg}")
+                    messagebox.showerror("Error", f"Failed to send cancellation messages: {msg}")
                 
                 self.window.after(0, show_error)
         
         # Start sending in background thread
         threading.Thread(target=send_thread, daemon=True).start()
     
+    def log_send_timings(self):
+        """Log the per-step timing summary of the last sending run"""
+        if self.whatsapp.last_run_summary:
+            for line in self.whatsapp.last_run_summary.splitlines():
+                self.log_message(f"⏱️ {line.strip()}")
+    
+    def _outbox_progress(self, label):
+        """Return an outbox progress callback that shows '<label>... (n/total)'"""
+        def progress(index, total, message):
+            self.window.after(0, lambda: self.update_progress(f"{label}... ({index}/{total})"))
+        return progress
+    
+    def resume_outbox(self):
+        """Send outbox messages left unsent by an earlier run that was interrupted"""
+        if not self.whatsapp.is_logged_in:
+            messagebox.showwarning("Warning", "Please login to WhatsApp first")
+            return
+        
+        from models.message_outbox import OutboxMessage
+        
+        def resume(send_uncertain):
+            # Runs on a worker thread: requeue, then send whatever is pending
+            if send_uncertain:
+                OutboxMessage.requeue(statuses=(OutboxMessage.UNCERTAIN,))
+            pending = len(OutboxMessage.pending_ids())
+            if not pending:
+                return None
+            self.log_message(f"Resuming {pending} unsent messages from the outbox...")
+            return self.whatsapp.drain_outbox(progress=self._outbox_progress("Sending unsent messages"))
+        
+        def finish(outcome):
+            self.update_progress("")
+            if outcome is None:
+                messagebox.showinfo("Outbox", "There are no unsent messages in the outbox")
+                return
+            sent, failed = outcome
+            self.log_message(f"✅ Outbox resumed: {sent} sent, {failed} failed")
+            self.log_send_timings()
+            messagebox.showinfo("Messages Sent", f"Unsent messages resumed.\n\nSuccess: {sent}\nFailed: {failed}")
+        
+        def confirm(counts):
+            if counts is None:
+                messagebox.showinfo("Outbox", "Messages are already being sent; try again when they are done")
+                return
+            uncertain = counts.get(OutboxMessage.UNCERTAIN, 0)
+            send_uncertain = bool(uncertain) and messagebox.askyesno(
+                "Interrupted Messages",
+                f"{uncertain} messages were being sent when the last run stopped and may already have been delivered.\n\n"
+                "Send them again?"
+            )
+            task_executor.submit(
+                resume, send_uncertain, key='whatsapp_outbox', replace=False, widget=self.window,
+                on_success=finish, on_error=lambda e: self.log_message(f"❌ Error resuming outbox: {str(e)}")
+            )
+        
+        # Interrupted messages are marked uncertain first, so the counts include them
+        task_executor.submit(
+            self.whatsapp.outbox_status, key='whatsapp_outbox_counts', widget=self.window, on_success=confirm,
+            on_error=lambda e: self.log_message(f"❌ Error reading outbox: {str(e)}")
+        )
+    
     def send_custom_messages(self):
         """Send custom messages"""
         if not self.whatsapp.is_logged_in:
@@ -1316,6 +1305,7 @@ The message includes readmission contact information and encourages them to retu
                 failed = len(results) - successful
                 
                 self.log_message(f"Custom messages sent: {successful} successful, {failed} failed")
+                self.log_send_timings()
                 
             except Exception as e:
                 self.log_message(f"Error sending custom messages: {str(e)}")
@@ -1514,7 +1504,7 @@ The message includes readmission contact information and encourages them to retu
             # Destroy the window
             self.window.destroy()
         except Exception as e:
-            print(f"Error closing WhatsApp window: {e}")
+            logger.error("Error closing WhatsApp window: %s", e)
             try:
                 self.window.destroy()
             except:
@@ -1624,57 +1614,44 @@ The message includes readmission contact information and encourages them to retu
     
     def load_all_expired_students(self):
         """Load all expired students regardless of expiry date"""
-        def load_thread():
+        def update_ui(expired_subs):
             try:
-                # Get all expired subscriptions
-                from models.subscription import Subscription
-                expired_subs = Subscription.get_all_expired_subscriptions()
+                # Clear existing items and selections
+                for item in self.cancellation_tree.get_children():
+                    self.cancellation_tree.delete(item)
+                self.cancellation_selections.clear()
                 
-                # Update UI in main thread
-                def update_ui():
-                    try:
-                        # Clear existing items and selections
-                        for item in self.cancellation_tree.get_children():
-                            self.cancellation_tree.delete(item)
-                        self.cancellation_selections.clear()
-                        
-                        # Add expired subscriptions to tree
-                        for sub in expired_subs:
-                            from datetime import date, datetime
-                            
-                            # Calculate days expired
-                            end_date = datetime.strptime(sub['end_date'], '%Y-%m-%d').date()
-                            days_expired = (date.today() - end_date).days
-                            
-                            item_id = self.cancellation_tree.insert('', 'end', values=(
-                                '☐',  # Unchecked checkbox
-                                sub['student_name'],
-                                sub['mobile_number'],
-                                sub['seat_number'],
-                                sub['timeslot_name'],
-                                sub['end_date'],
-                                f"{days_expired} days"
-                            ))
-                            # Store subscription data for this item
-                            self.cancellation_selections[item_id] = {'selected': False, 'data': sub}
-                        
-                        self.log_message(f"Loaded {len(expired_subs)} expired students")
-                        
-                    except Exception as e:
-                        self.log_message(f"Error updating UI: {str(e)}")
-                        messagebox.showerror("Error", f"Failed to load expired students: {str(e)}")
-                
-                # Schedule UI update on main thread
-                if hasattr(self, 'window') and self.window.winfo_exists():
-                    self.window.after(0, update_ui)
+                # Add expired subscriptions to tree
+                from datetime import date, datetime
+                for sub in expired_subs:
+                    # Calculate days expired
+                    end_date = datetime.strptime(sub['end_date'], '%Y-%m-%d').date()
+                    days_expired = (date.today() - end_date).days
                     
+                    item_id = self.cancellation_tree.insert('', 'end', values=(
+                        '☐',  # Unchecked checkbox
+                        sub['student_name'],
+                        sub['mobile_number'],
+                        sub['seat_number'],
+                        sub['timeslot_name'],
+                        sub['end_date'],
+                        f"{days_expired} days"
+                    ))
+                    # Store subscription data for this item
+                    self.cancellation_selections[item_id] = {'selected': False, 'data': sub}
+                
+                self.log_message(f"Loaded {len(expired_subs)} expired students")
+                
             except Exception as e:
-                # Schedule error message on main thread
-                if hasattr(self, 'window') and self.window.winfo_exists():
-                    self.window.after(0, lambda: messagebox.showerror("Error", f"Failed to load expired students: {str(e)}"))
-        
-        # Run in background thread
-        threading.Thread(target=load_thread, daemon=True).start()
+                self.log_message(f"Error updating UI: {str(e)}")
+                messagebox.showerror("Error", f"Failed to load expired students: {str(e)}")
+        
+        # Load in the background; fills the same list as load_expired_subscriptions, so shares its key
+        task_executor.submit(
+            Subscription.get_all_expired_subscriptions,
+            key='whatsapp_expired', priority=PRIORITY_HIGH, widget=self.window, on_success=update_ui,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load expired students: {str(e)}")
+        )
     
     def __del__(self):
         """Cleanup when window is closed"""
@@ -7,26 +7,40 @@ Version: 1.0.7
 
 import sys
 import os
-import tkinter as tk
-from tkinter import messagebox
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config.database import DatabaseManager
-from gui.main_window import MainWindow
-
 
 def main():
     """Main application entry point"""
+    # Everything runs here rather than at import time: receipt batch workers are spawned
+    # processes that import this module as __mp_main__ and must not start logging or the GUI
+    from utils.startup_timing import create_startup_timer
+    from utils.logging_config import setup_logging
+    
+    # Created before the GUI imports so their cost shows up in the report
+    startup_timer = create_startup_timer()
+    setup_logging(console_level="INFO" if startup_timer.import_timer else None)
+    
+    import tkinter as tk
+    from tkinter import messagebox
+    
     try:
+        from config.database import DatabaseManager
+        from gui.main_window import MainWindow
+        startup_timer.mark("imports done")
+        
         # Initialize database
         db_manager = DatabaseManager()
         db_manager.initialize_database()
+        startup_timer.mark("database ready")
         
         # Create main application window
         root = tk.Tk()
-        MainWindow(root)
+        startup_timer.watch_window(root)
+        MainWindow(root, startup_timer)
+        startup_timer.mark("main window built")
         
         # Start the application
         root.mainloop()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Merge incremental (delta) exports back into a full snapshot workbook
+
+Usage: python merge_exports.py [delta.xlsx ...] [-o snapshot.xlsx]
+Without files, every library_delta_*.xlsx in the exports folder is merged.
+"""
+
+import argparse
+import glob
+import os
+import sys
+from datetime import datetime
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_dir)
+
+
+def main():
+    from config.settings import EXPORTS_DIR
+    from utils.excel_exporter import merge_delta_exports
+
+    parser = argparse.ArgumentParser(description="Rebuild a full snapshot from delta exports")
+    parser.add_argument('deltas', nargs='*', help="Delta files, starting from the first full export")
+    parser.add_argument('-o', '--output', help="Snapshot file to write")
+    args = parser.parse_args()
+
+    deltas = args.deltas or glob.glob(os.path.join(EXPORTS_DIR, 'library_delta_*.xlsx'))
+    if not deltas:
+        print("No delta exports found.")
+        return 1
+    output = args.output or os.path.join(
+        EXPORTS_DIR, f"library_snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    )
+    merge_delta_exports(deltas, output)
+    print(f"Merged {len(deltas)} delta exports into {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,8 @@
 Book model for database operations
 """
 
-from config.database import DatabaseManager
+from config.database import DatabaseManager, KeysetPager
+from utils.events import publish, BookSaved, BookDeleted
 
 
 class Book:
@@ -23,9 +24,11 @@ class Book:
     def save(self):
         """Save book to database"""
         if self.id:
-            return self._update()
+            result = self._update()
         else:
-            return self._create()
+            result = self._create()
+        publish(BookSaved(self.id))
+        return result
     
     def _create(self):
         """Create new book record"""
@@ -66,6 +69,7 @@ class Book:
         query = "UPDATE books SET is_active = 0 WHERE id = ?"
         self.db_manager.execute_query(query, (self.id,))
         self.is_active = False
+        publish(BookDeleted(self.id))
     
     @classmethod
     def get_by_id(cls, book_id):
@@ -105,6 +109,27 @@ class Book:
         results = db_manager.execute_query(query, (search_pattern, search_pattern, search_pattern))
         return [cls._from_row(row) for row in results]
     
+    # Sources of change for the book list: (table, watermark column, affected book ids)
+    LIST_CHANGE_SOURCES = (
+        ('books', 'change_seq', "SELECT id FROM books WHERE change_seq > ?"),
+        ('row_deletions', 'id', "SELECT row_id FROM row_deletions WHERE id > ? AND table_name = 'books'"),
+    )
+    
+    @classmethod
+    def list_pager(cls, search_term=None):
+        """Get a title-sorted keyset pager over active books for list views"""
+        query = '''
+            SELECT id, title, author, category, total_copies, available_copies
+            FROM books
+            WHERE is_active = 1
+        '''
+        params = ()
+        if search_term:
+            search_pattern = f"%{search_term}%"
+            query += " AND (title LIKE ? OR author LIKE ? OR isbn LIKE ?)"
+            params = (search_pattern, search_pattern, search_pattern)
+        return KeysetPager(query, params, order_by=('title', 'id'), change_sources=cls.LIST_CHANGE_SOURCES)
+    
     @classmethod
     def get_by_category(cls, category):
         """Get books by category"""
@@ -139,6 +164,7 @@ class Book:
         self.available_copies -= 1
         query = "UPDATE books SET available_copies = ? WHERE id = ?"
         self.db_manager.execute_query(query, (self.available_copies, self.id))
+        publish(BookSaved(self.id))
     
     def return_book(self):
         """Increase available copies when book is returned"""
@@ -148,6 +174,7 @@ class Book:
         self.available_copies += 1
         query = "UPDATE books SET available_copies = ? WHERE id = ?"
         self.db_manager.execute_query(query, (self.available_copies, self.id))
+        publish(BookSaved(self.id))
     
     def get_borrowing_history(self):
         """Get borrowing history for this book"""
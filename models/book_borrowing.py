@@ -1,9 +1,20 @@
-from config.database import DatabaseManager
+from config.database import DatabaseManager, KeysetPager
+from utils.events import publish, BookBorrowed, BookReturned, BorrowingDeleted
 from datetime import date
 
 class BookBorrowing:
     """Model for book borrowings"""
 
+    # Sources of change for the borrowing list: (table, watermark column, affected borrowing ids)
+    LIST_CHANGE_SOURCES = (
+        ('book_borrowings', 'change_seq', "SELECT id FROM book_borrowings WHERE change_seq > ?"),
+        ('students', 'change_seq',
+         "SELECT bb.id FROM book_borrowings bb JOIN students s ON bb.student_id = s.id WHERE s.change_seq > ?"),
+        ('books', 'change_seq',
+         "SELECT bb.id FROM book_borrowings bb JOIN books b ON bb.book_id = b.id WHERE b.change_seq > ?"),
+        ('row_deletions', 'id', "SELECT row_id FROM row_deletions WHERE id > ? AND table_name = 'book_borrowings'"),
+    )
+
     def __init__(self, student_id, book_id, borrow_date, due_date, return_date=None, fine_amount=0, is_returned=0, id=None):
         self.id = id
         self.student_id = student_id
@@ -21,7 +32,8 @@ class BookBorrowing:
             INSERT INTO book_borrowings (student_id, book_id, borrow_date, due_date, is_returned, fine_amount)
             VALUES (?, ?, ?, ?, ?, ?)
         '''
-        db.execute_query(query, (self.student_id, self.book_id, self.borrow_date, self.due_date, self.is_returned, self.fine_amount))
+        self.id = db.execute_query(query, (self.student_id, self.book_id, self.borrow_date, self.due_date, self.is_returned, self.fine_amount))
+        publish(BookBorrowed(self.id, self.book_id, self.student_id))
         return self
 
     def return_book(self):
@@ -35,6 +47,7 @@ class BookBorrowing:
         book = Book.get_by_id(self.book_id)
         if book:
             book.return_book()
+        publish(BookReturned(self.id, self.book_id, self.student_id))
 
     @staticmethod
     def get_by_id(borrowing_id):
@@ -48,9 +61,8 @@ class BookBorrowing:
         return None
 
     @staticmethod
-    def get_all_details(filter_by='All'):
-        """Get all borrowing records with student and book details"""
-        db = DatabaseManager()
+    def _details_query(filter_by='All'):
+        """Build the borrowing details query for a filter"""
         query = '''
             SELECT bb.id, s.name as student_name, s.father_name, s.mobile_number as student_phone, b.title as book_title,
                    bb.borrow_date, bb.due_date, CAST(julianday(bb.due_date) - julianday(bb.borrow_date) AS INTEGER) as days_borrowed,
@@ -65,14 +77,26 @@ class BookBorrowing:
             query += " WHERE bb.is_returned = 1"
         elif filter_by == "Overdue":
             query += " WHERE bb.is_returned = 0 AND bb.due_date < date('now')"
-        
-        query += " ORDER BY bb.borrow_date DESC"
+        return query
+
+    @staticmethod
+    def get_all_details(filter_by='All'):
+        """Get all borrowing records with student and book details"""
+        db = DatabaseManager()
+        query = BookBorrowing._details_query(filter_by) + " ORDER BY bb.borrow_date DESC"
         return db.execute_query(query)
 
+    @staticmethod
+    def list_pager(filter_by='All'):
+        """Get a keyset pager over borrowing details, newest first"""
+        return KeysetPager(BookBorrowing._details_query(filter_by), order_by=('borrow_date', 'id'), descending=True,
+                           change_sources=BookBorrowing.LIST_CHANGE_SOURCES)
+
     @staticmethod
     def delete_by_id(borrowing_id):
         """Delete a borrowing record by its ID"""
         db = DatabaseManager()
         query = "DELETE FROM book_borrowings WHERE id = ?"
         db.execute_query(query, (borrowing_id,))
+        publish(BorrowingDeleted(borrowing_id))
 
@@ -0,0 +1,98 @@
+"""
+Hall model for database operations
+"""
+
+from config.database import DatabaseManager, SEAT_INSERT_QUERY, expand_seat_layout
+from utils.events import publish, HallChanged
+
+
+class Hall:
+    """Hall model class"""
+    
+    def __init__(self, name=None, display_order=0, hall_id=None):
+        self.id = hall_id
+        self.name = name
+        self.display_order = display_order
+        self.is_active = True
+        self.db_manager = DatabaseManager()
+    
+    def save(self):
+        """Save hall to database"""
+        if self.id:
+            result = self._update()
+        else:
+            result = self._create()
+        publish(HallChanged(self.id))
+        return result
+    
+    def _create(self):
+        """Create new hall record"""
+        query = "INSERT INTO halls (name, display_order) VALUES (?, ?)"
+        self.id = self.db_manager.execute_query(query, (self.name, self.display_order))
+        return self.id
+    
+    def _update(self):
+        """Update existing hall record"""
+        query = "UPDATE halls SET name = ?, display_order = ? WHERE id = ?"
+        self.db_manager.execute_query(query, (self.name, self.display_order, self.id))
+        return self.id
+    
+    def add_seat_rows(self, rows, seats_per_row, gender_restriction='Any'):
+        """Bulk-create rows of seats below the hall's existing rows
+        
+        Seat ids continue after the highest existing id. Returns the number of seats created.
+        """
+        if not self.id:
+            raise ValueError("Cannot add seats to a hall without ID")
+        
+        query = '''
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM seats) as last_id,
+                   COALESCE(MAX(row_number), 0) as last_row,
+                   MAX(pos_y) as last_y
+            FROM seats WHERE hall_id = ?
+        '''
+        row = self.db_manager.execute_query(query, (self.id,))[0]
+        next_id = row['last_id'] + 1
+        layout = []
+        for index in range(rows):
+            first_id = next_id + index * seats_per_row
+            layout.append((row['last_row'] + index + 1, first_id, first_id + seats_per_row - 1, gender_restriction))
+        
+        first_pos_y = 0 if row['last_y'] is None else int(row['last_y']) + 1
+        seats = expand_seat_layout(self.id, layout, first_pos_y)
+        self.db_manager.execute_many(SEAT_INSERT_QUERY, seats)
+        publish(HallChanged(self.id))
+        return len(seats)
+    
+    @classmethod
+    def get_by_id(cls, hall_id):
+        """Get hall by ID"""
+        db_manager = DatabaseManager()
+        result = db_manager.execute_query("SELECT * FROM halls WHERE id = ?", (hall_id,))
+        return cls._from_row(result[0]) if result else None
+    
+    @classmethod
+    def get_all(cls, active_only=True):
+        """Get all halls in display order"""
+        db_manager = DatabaseManager()
+        query = "SELECT * FROM halls"
+        if active_only:
+            query += " WHERE is_active = 1"
+        query += " ORDER BY display_order, id"
+        return [cls._from_row(row) for row in db_manager.execute_query(query)]
+    
+    @classmethod
+    def _from_row(cls, row):
+        """Create Hall object from database row"""
+        hall = cls()
+        hall.id = row['id']
+        hall.name = row['name']
+        hall.display_order = row['display_order']
+        hall.is_active = bool(row['is_active'])
+        return hall
+    
+    def __str__(self):
+        return self.name
+    
+    def __repr__(self):
+        return f"Hall(id={self.id}, name='{self.name}')"
@@ -0,0 +1,198 @@
+"""
+Outbox model for WhatsApp messages, persisted so bulk sends can resume after a crash
+"""
+
+import json
+import uuid
+from config.database import DatabaseManager
+from config.settings import OUTBOX_MAX_ATTEMPTS, OUTBOX_CLAIM_TIMEOUT
+
+
+class OutboxMessage:
+    """A message in the message_outbox table
+
+    A message moves pending -> sending -> sent. A failed send returns it to pending
+    until it has been tried OUTBOX_MAX_ATTEMPTS times, after which it is failed.
+    A message still in 'sending' when the next drain starts was interrupted mid-send
+    (the app or Chrome died), so whether it was delivered is unknown: it is marked
+    uncertain and is only sent again after requeue().
+
+    Several PCs may drain the same outbox, so a claim records this process's OWNER
+    token and only the process whose UPDATE moved the message to 'sending' sends it.
+    """
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    UNCERTAIN = 'uncertain'
+
+    OWNER = uuid.uuid4().hex  # Claim token of this process
+
+    def __init__(self, id=None, idempotency_key=None, campaign=None, student_id=None, recipient_name=None,
+                 phone=None, message=None, status=PENDING, attempts=0, last_error=None, claimed_by=None,
+                 created_at=None, updated_at=None, sent_at=None):
+        self.id = id
+        self.idempotency_key = idempotency_key
+        self.campaign = campaign
+        self.student_id = student_id
+        self.recipient_name = recipient_name
+        self.phone = phone
+        self.message = message
+        self.status = status
+        self.attempts = attempts
+        self.last_error = last_error
+        self.claimed_by = claimed_by
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.sent_at = sent_at
+
+    @staticmethod
+    def make_key(campaign, student_id=None, phone=None):
+        """Idempotency key of a campaign's message to one student (or phone number)"""
+        return f"{campaign}:{student_id if student_id is not None else phone}"
+
+    @classmethod
+    def enqueue(cls, messages):
+        """Add [{campaign, student_id, name, phone, message}, ...] and return their outbox ids
+
+        A message whose idempotency key is already in the outbox is not added again, so
+        re-running a campaign returns the existing rows whatever their status.
+        """
+        rows = {}
+        for item in messages:
+            key = cls.make_key(item['campaign'], item.get('student_id'), item['phone'])
+            rows.setdefault(key, (key, item['campaign'], item.get('student_id'),
+                                  item.get('name'), item['phone'], item['message']))
+        if not rows:
+            return []
+
+        db_manager = DatabaseManager()
+        db_manager.execute_many('''
+            INSERT OR IGNORE INTO message_outbox
+                (idempotency_key, campaign, student_id, recipient_name, phone, message)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', list(rows.values()))
+        results = db_manager.execute_query(
+            "SELECT id, idempotency_key FROM message_outbox WHERE idempotency_key IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(rows)),)
+        )
+        ids = {row['idempotency_key']: row['id'] for row in results}
+        return [ids[key] for key in rows]
+
+    @classmethod
+    def get_by_ids(cls, ids):
+        """Get outbox messages by id, in id order"""
+        db_manager = DatabaseManager()
+        results = db_manager.execute_query(
+            "SELECT * FROM message_outbox WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id",
+            (json.dumps(list(ids)),)
+        )
+        return [cls._from_row(row) for row in results]
+
+    @classmethod
+    def pending_ids(cls, ids=None):
+        """Ids of pending messages in send order, optionally limited to ids"""
+        db_manager = DatabaseManager()
+        query = "SELECT id FROM message_outbox WHERE status = 'pending'"
+        params = ()
+        if ids is not None:
+            query += " AND id IN (SELECT value FROM json_each(?))"
+            params = (json.dumps(list(ids)),)
+        return [row['id'] for row in db_manager.execute_query(query + " ORDER BY id", params)]
+
+    @classmethod
+    def claim(cls, message_id):
+        """Mark a pending message as sending and return it, or None if it is no longer pending
+
+        The state change is committed before the message is handed to WhatsApp, so a
+        crash during the send leaves it in 'sending' for recover_interrupted(). A message
+        another PC claimed first is not returned.
+        """
+        db_manager = DatabaseManager()
+        claimed = db_manager.execute_update('''
+            UPDATE message_outbox
+            SET status = 'sending', claimed_by = ?, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'pending'
+        ''', (cls.OWNER, message_id))
+        if not claimed:
+            return None
+        return cls._from_row(db_manager.execute_query("SELECT * FROM message_outbox WHERE id = ?", (message_id,))[0])
+
+    @classmethod
+    def recover_interrupted(cls):
+        """Mark messages left in 'sending' by a crashed run as uncertain; return how many
+
+        Call it only while this process is not draining. Messages claimed by another
+        process are left alone until OUTBOX_CLAIM_TIMEOUT has passed, as it may still
+        be sending them.
+        """
+        db_manager = DatabaseManager()
+        return db_manager.execute_update('''
+            UPDATE message_outbox
+            SET status = 'uncertain', last_error = 'Interrupted while sending', updated_at = CURRENT_TIMESTAMP
+            WHERE status = 'sending' AND (claimed_by IS NULL OR claimed_by = ? OR updated_at < datetime('now', ?))
+        ''', (cls.OWNER, f'-{OUTBOX_CLAIM_TIMEOUT} seconds'))
+
+    @classmethod
+    def requeue(cls, statuses=(UNCERTAIN, FAILED), ids=None):
+        """Return messages with the given statuses to pending with fresh attempts; return how many"""
+        db_manager = DatabaseManager()
+        query = "SELECT id FROM message_outbox WHERE status IN (SELECT value FROM json_each(?))"
+        params = [json.dumps(list(statuses))]
+        if ids is not None:
+            query += " AND id IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(list(ids)))
+        message_ids = [row['id'] for row in db_manager.execute_query(query, params)]
+        if message_ids:
+            db_manager.execute_query('''
+                UPDATE message_outbox SET status = 'pending', attempts = 0, updated_at = CURRENT_TIMESTAMP
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(message_ids),))
+        return len(message_ids)
+
+    @classmethod
+    def status_counts(cls, campaign=None):
+        """Return {status: message count}, optionally for one campaign"""
+        db_manager = DatabaseManager()
+        query = "SELECT status, COUNT(*) as count FROM message_outbox"
+        params = ()
+        if campaign is not None:
+            query += " WHERE campaign = ?"
+            params = (campaign,)
+        return {row['status']: row['count'] for row in db_manager.execute_query(query + " GROUP BY status", params)}
+
+    def mark_sent(self):
+        """Record a successful send"""
+        db_manager = DatabaseManager()
+        db_manager.execute_query('''
+            UPDATE message_outbox
+            SET status = 'sent', last_error = NULL, sent_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (self.id,))
+        self.status = self.SENT
+
+    def mark_failed(self, error):
+        """Record a failed send; the message is retried until OUTBOX_MAX_ATTEMPTS is reached"""
+        self.status = self.FAILED if self.attempts >= OUTBOX_MAX_ATTEMPTS else self.PENDING
+        self.last_error = error
+        db_manager = DatabaseManager()
+        db_manager.execute_query('''
+            UPDATE message_outbox SET status = ?, last_error = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (self.status, error, self.id))
+
+    def mark_uncertain(self, error):
+        """Record a send that failed after it may have reached WhatsApp; it is not retried until requeue()"""
+        self.status = self.UNCERTAIN
+        self.last_error = error
+        db_manager = DatabaseManager()
+        db_manager.execute_query('''
+            UPDATE message_outbox SET status = 'uncertain', last_error = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (error, self.id))
+
+    @classmethod
+    def _from_row(cls, row):
+        """Create OutboxMessage object from database row"""
+        return cls(**{key: row[key] for key in row.keys()})
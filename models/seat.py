@@ -2,56 +2,101 @@
 Seat model for database operations
 """
 
+from datetime import date
 from config.database import DatabaseManager
+from utils.events import publish, SeatUpdated
 
 
 class Seat:
     """Seat model class"""
     
-    def __init__(self, seat_id=None, row_number=None, gender_restriction=None):
+    # Seats with their current occupancy, as drawn by the seat maps
+    LAYOUT_QUERY = '''
+        SELECT seat.*, h.name as hall_name, h.display_order as hall_order,
+               EXISTS (
+                   SELECT 1 FROM student_subscriptions ss
+                   JOIN students s ON ss.student_id = s.id
+                   WHERE ss.seat_id = seat.id AND ss.is_active = 1 AND s.is_active = 1 AND ss.end_date >= ?
+               ) as occupied
+        FROM seats seat
+        LEFT JOIN halls h ON seat.hall_id = h.id
+    '''
+    
+    def __init__(self, seat_id=None, row_number=None, gender_restriction=None,
+                 hall_id=None, pos_x=None, pos_y=None):
         self.id = seat_id
         self.row_number = row_number
         self.gender_restriction = gender_restriction
+        self.hall_id = hall_id
+        self.pos_x = pos_x
+        self.pos_y = pos_y
         self.is_active = True
         self.db_manager = DatabaseManager()
     
     def save(self):
         """Save seat to database"""
-        if self.id:
-            return self._update()
+        # Seat ids are chosen by the user, so an id alone does not mean the seat exists yet
+        if self.id and self.db_manager.execute_query("SELECT 1 FROM seats WHERE id = ?", (self.id,)):
+            result = self._update()
         else:
-            return self._create()
+            result = self._create()
+        publish(SeatUpdated(self.id))
+        return result
     
     def _create(self):
         """Create new seat record"""
+        self._place()
         if self.id:
             # Explicit seat ID provided
             query = '''
-                INSERT INTO seats (id, row_number, gender_restriction)
-                VALUES (?, ?, ?)
+                INSERT INTO seats (id, hall_id, row_number, gender_restriction, pos_x, pos_y)
+                VALUES (?, ?, ?, ?, ?, ?)
             '''
-            params = (self.id, self.row_number, self.gender_restriction)
+            params = (self.id, self.hall_id, self.row_number, self.gender_restriction, self.pos_x, self.pos_y)
         else:
             # Auto-generate seat ID
             query = '''
-                INSERT INTO seats (row_number, gender_restriction)
-                VALUES (?, ?)
+                INSERT INTO seats (hall_id, row_number, gender_restriction, pos_x, pos_y)
+                VALUES (?, ?, ?, ?, ?)
             '''
-            params = (self.row_number, self.gender_restriction)
+            params = (self.hall_id, self.row_number, self.gender_restriction, self.pos_x, self.pos_y)
         
         result = self.db_manager.execute_query(query, params)
         if not self.id:
             self.id = result
         return self.id
     
+    def _place(self):
+        """Default to the first hall and the end of the seat's row when no position is given"""
+        if self.hall_id is None:
+            result = self.db_manager.execute_query(
+                "SELECT id FROM halls WHERE is_active = 1 ORDER BY display_order, id LIMIT 1")
+            self.hall_id = result[0]['id'] if result else None
+        if self.pos_x is not None and self.pos_y is not None:
+            return
+        
+        query = '''
+            SELECT MIN(pos_y) as row_y, MAX(pos_x) as last_x,
+                   (SELECT MAX(pos_y) FROM seats WHERE hall_id IS ?) as last_y
+            FROM seats WHERE hall_id IS ? AND row_number = ?
+        '''
+        row = self.db_manager.execute_query(query, (self.hall_id, self.hall_id, self.row_number))[0]
+        if row['row_y'] is not None:
+            self.pos_y = row['row_y']
+            self.pos_x = row['last_x'] + 1
+        else:
+            # New row below the hall's existing rows
+            self.pos_y = 0 if row['last_y'] is None else row['last_y'] + 1
+            self.pos_x = 0
+    
     def _update(self):
         """Update existing seat record"""
         query = '''
             UPDATE seats SET
-                row_number = ?, gender_restriction = ?
+                row_number = ?, gender_restriction = ?, hall_id = ?, pos_x = ?, pos_y = ?
             WHERE id = ?
         '''
-        params = (self.row_number, self.gender_restriction, self.id)
+        params = (self.row_number, self.gender_restriction, self.hall_id, self.pos_x, self.pos_y, self.id)
         self.db_manager.execute_query(query, params)
         return self.id
     
@@ -84,6 +129,7 @@ class Seat:
         # Restore the seat
         restore_query = "UPDATE seats SET is_active = 1 WHERE id = ?"
         db_manager.execute_query(restore_query, (seat_id,))
+        publish(SeatUpdated(seat_id))
         
         # Log the restoration
         import logging
@@ -136,6 +182,35 @@ class Seat:
         results = db_manager.execute_query(query, (gender,))
         return [cls._from_row(row) for row in results]
     
+    @classmethod
+    def get_layout(cls, seat_ids=None):
+        """Get seat rows with hall and occupancy in one query
+        
+        Without seat_ids all active seats are returned in drawing order; with seat_ids the
+        given seats are returned even if inactive so deactivations can be noticed.
+        """
+        db_manager = DatabaseManager()
+        query = cls.LAYOUT_QUERY
+        params = [date.today().isoformat()]
+        if seat_ids is None:
+            query += " WHERE seat.is_active = 1 ORDER BY h.display_order, seat.hall_id, seat.pos_y, seat.pos_x"
+        else:
+            query += f" WHERE seat.id IN ({', '.join('?' * len(seat_ids))})"
+            params.extend(seat_ids)
+        return db_manager.execute_query(query, params)
+    
+    @classmethod
+    def bulk_update_gender(cls, changes):
+        """Set gender restrictions for many seats at once from (seat_id, gender) pairs"""
+        if not changes:
+            return 0
+        db_manager = DatabaseManager()
+        db_manager.execute_many("UPDATE seats SET gender_restriction = ? WHERE id = ?",
+                                [(gender, seat_id) for seat_id, gender in changes])
+        for seat_id, _ in changes:
+            publish(SeatUpdated(seat_id))
+        return len(changes)
+    
     @classmethod
     def _from_row(cls, row):
         """Create Seat object from database row"""
@@ -144,6 +219,10 @@ class Seat:
         seat.row_number = row['row_number']
         seat.gender_restriction = row['gender_restriction']
         seat.is_active = bool(row['is_active'])
+        keys = row.keys()
+        seat.hall_id = row['hall_id'] if 'hall_id' in keys else None
+        seat.pos_x = row['pos_x'] if 'pos_x' in keys else None
+        seat.pos_y = row['pos_y'] if 'pos_y' in keys else None
         return seat
     
     def get_current_occupants(self):
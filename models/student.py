@@ -3,7 +3,8 @@ Student model for database operations
 """
 
 from datetime import date
-from config.database import DatabaseManager
+from config.database import DatabaseManager, KeysetPager
+from utils.events import publish, StudentSaved, StudentDeleted
 
 
 class Student:
@@ -28,9 +29,11 @@ class Student:
     def save(self):
         """Save student to database"""
         if self.id:
-            return self._update()
+            result = self._update()
         else:
-            return self._create()
+            result = self._create()
+        publish(StudentSaved(self.id))
+        return result
     
     def _create(self):
         """Create new student record"""
@@ -80,6 +83,7 @@ class Student:
         query = "UPDATE students SET is_active = 0 WHERE id = ?"
         self.db_manager.execute_query(query, (self.id,))
         self.is_active = False
+        publish(StudentDeleted(self.id))
     
     @classmethod
     def get_by_id(cls, student_id):
@@ -131,6 +135,39 @@ class Student:
             results = db_manager.execute_query(query, (search_pattern, search_pattern, search_pattern))
         return [cls._from_row(row) for row in results]
     
+    # Sources of change for the student list: (table, watermark column, affected student ids)
+    LIST_CHANGE_SOURCES = (
+        ('students', 'change_seq', "SELECT id FROM students WHERE change_seq > ?"),
+        ('student_subscriptions', 'change_seq',
+         "SELECT student_id FROM student_subscriptions WHERE change_seq > ?"),
+        ('row_deletions', 'id',
+         "SELECT CASE table_name WHEN 'students' THEN row_id ELSE ref_id END FROM row_deletions "
+         "WHERE id > ? AND table_name IN ('students', 'student_subscriptions')"),
+    )
+    
+    @classmethod
+    def list_pager(cls, search_term=None):
+        """Get a name-sorted keyset pager over active students for list views"""
+        query = '''
+            SELECT s.id, s.name, s.gender, s.mobile_number, s.registration_date,
+                   (SELECT COUNT(*) FROM student_subscriptions ss
+                    WHERE ss.student_id = s.id AND ss.is_active = 1
+                    AND ss.end_date >= date('now')) as active_subscriptions
+            FROM students s
+            WHERE s.is_active = 1
+        '''
+        params = ()
+        if search_term:
+            search_pattern = f"%{search_term}%"
+            try:
+                student_id = int(search_term)
+                query += " AND (s.id = ? OR s.name LIKE ? OR s.mobile_number LIKE ? OR s.aadhaar_number LIKE ?)"
+                params = (student_id, search_pattern, search_pattern, search_pattern)
+            except ValueError:
+                query += " AND (s.name LIKE ? OR s.mobile_number LIKE ? OR s.aadhaar_number LIKE ?)"
+                params = (search_pattern, search_pattern, search_pattern)
+        return KeysetPager(query, params, order_by=('name', 'id'), change_sources=cls.LIST_CHANGE_SOURCES)
+    
     @classmethod
     def _from_row(cls, row):
         """Create Student object from database row"""
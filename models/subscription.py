@@ -5,6 +5,7 @@ Student subscription model for database operations
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from config.database import DatabaseManager
+from utils.events import publish, SubscriptionCreated, SubscriptionUpdated, SubscriptionDeleted
 
 
 class Subscription:
@@ -53,6 +54,7 @@ class Subscription:
         )
         
         self.id = self.db_manager.execute_query(query, params)
+        publish(SubscriptionCreated(self.id, self.student_id, self.seat_id, self.timeslot_id))
         return self.id
     
     def _update(self):
@@ -71,6 +73,7 @@ class Subscription:
         )
         
         self.db_manager.execute_query(query, params)
+        publish(SubscriptionUpdated(self.id, self.student_id, self.seat_id, self.timeslot_id))
         return self.id
     
     def _generate_receipt_number(self):
@@ -99,6 +102,7 @@ class Subscription:
         query = "UPDATE student_subscriptions SET is_active = 0 WHERE id = ?"
         self.db_manager.execute_query(query, (self.id,))
         self.is_active = False
+        publish(SubscriptionDeleted(self.id, self.student_id, self.seat_id, self.timeslot_id))
     
     def hard_delete(self):
         """Permanently delete subscription from database"""
@@ -107,6 +111,7 @@ class Subscription:
         
         query = "DELETE FROM student_subscriptions WHERE id = ?"
         self.db_manager.execute_query(query, (self.id,))
+        publish(SubscriptionDeleted(self.id, self.student_id, self.seat_id, self.timeslot_id))
         self.id = None
     
     @classmethod
@@ -4,6 +4,7 @@ Timeslot model for database operations
 
 from datetime import time
 from config.database import DatabaseManager
+from utils.events import publish, TimeslotChanged
 
 
 class Timeslot:
@@ -24,9 +25,11 @@ class Timeslot:
     def save(self):
         """Save timeslot to database"""
         if self.id:
-            return self._update()
+            result = self._update()
         else:
-            return self._create()
+            result = self._create()
+        publish(TimeslotChanged(self.id))
+        return result
     
     def _create(self):
         """Create new timeslot record"""
@@ -67,6 +70,7 @@ class Timeslot:
         query = "UPDATE timeslots SET is_active = 0 WHERE id = ?"
         self.db_manager.execute_query(query, (self.id,))
         self.is_active = False
+        publish(TimeslotChanged(self.id))
     
     @classmethod
     def get_by_id(cls, timeslot_id):
@@ -46,14 +46,30 @@ def create_minimal_database():
             )
         ''')
         
+        # Halls table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS halls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                display_order INTEGER DEFAULT 0,
+                is_active BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         # Seats table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS seats (
                 id INTEGER PRIMARY KEY,
+                hall_id INTEGER REFERENCES halls (id),
                 row_number INTEGER NOT NULL,
                 gender_restriction TEXT CHECK (gender_restriction IN ('Male', 'Female', 'Any')),
+                pos_x REAL,
+                pos_y REAL,
                 is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
@@ -132,17 +148,14 @@ def create_minimal_database():
         print("Initializing seats...")
         cursor.execute('SELECT COUNT(*) FROM seats')
         if cursor.fetchone()[0] == 0:
-            # Girls seats - Row 1 (1-9) and Row 10 (72-82)
-            for seat_id in range(1, 10):
-                cursor.execute('INSERT INTO seats (id, row_number, gender_restriction) VALUES (?, 1, "Female")', (seat_id,))
-            
-            for seat_id in range(72, 83):
-                cursor.execute('INSERT INTO seats (id, row_number, gender_restriction) VALUES (?, 10, "Female")', (seat_id,))
+            from config.settings import DEFAULT_HALL_NAME, DEFAULT_SEAT_LAYOUT
+            from config.database import SEAT_INSERT_QUERY, expand_seat_layout
             
-            # Boys seats - Rows 2-9 (10-71)
-            for seat_id in range(10, 72):
-                row_number = ((seat_id - 10) // 8) + 2
-                cursor.execute('INSERT INTO seats (id, row_number, gender_restriction) VALUES (?, ?, "Male")', (seat_id, row_number))
+            # Default hall with seats laid out from the settings
+            cursor.execute('INSERT OR IGNORE INTO halls (name) VALUES (?)', (DEFAULT_HALL_NAME,))
+            cursor.execute('SELECT id FROM halls WHERE name = ?', (DEFAULT_HALL_NAME,))
+            hall_id = cursor.fetchone()[0]
+            cursor.executemany(SEAT_INSERT_QUERY, expand_seat_layout(hall_id, DEFAULT_SEAT_LAYOUT))
         
         # Add sample data
         print("Adding sample data...")
@@ -231,6 +244,10 @@ def main():
             print("Database not found. Please run setup.py first.")
             return
         
+        # Route log records to data/logs/app.jsonl before anything logs
+        from utils.logging_config import setup_logging
+        setup_logging()
+        
         # Import and start application
         from config.database import DatabaseManager
         from gui.main_window import MainWindow
@@ -20,6 +20,10 @@ def main():
             print("Database not found. Please run setup.py first.")
             return
         
+        # Route log records to data/logs/app.jsonl before anything logs
+        from utils.logging_config import setup_logging
+        setup_logging()
+        
         # Import and start application
         from config.database import DatabaseManager
         from gui.main_window import MainWindow
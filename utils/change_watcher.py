@@ -0,0 +1,108 @@
+"""
+Cross-process change detection for auto-refresh
+"""
+
+import logging
+import sqlite3
+from config.database import DatabaseManager
+from config.settings import CHANGE_POLL_INTERVAL_MS
+from utils.events import event_bus, publish, TablesChanged
+
+
+class ChangeWatcher:
+    """Polls the database for writes made by other instances sharing the same file
+
+    Each poll runs ``PRAGMA data_version`` on a persistent connection, which only
+    changes after another connection commits. Only then are the trigger-maintained
+    ``table_changes`` counters read, and a TablesChanged event is published for the
+    tables whose counters moved further than this process's own writes explain.
+    """
+
+    def __init__(self, root, interval_ms=CHANGE_POLL_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.db_path = DatabaseManager().db_path
+        self.conn = None
+        self._after_id = None
+        self._data_version = None
+        self._counters = {}
+        self._local_changes = {}
+        self._subscription = None
+
+    def start(self):
+        """Start polling on the Tk main loop"""
+        if self._after_id is not None:
+            return
+        try:
+            self._connect()
+        except sqlite3.Error as e:
+            logging.error(f"Change watcher disabled: {e}")
+            return
+        # A restore swaps the database file, so the persistent connection has to follow it
+        self._subscription = event_bus.subscribe(TablesChanged, self._on_tables_changed)
+        self._after_id = self.root.after(self.interval_ms, self.poll)
+
+    def stop(self):
+        """Stop polling and close the connection"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._subscription is not None:
+            event_bus.unsubscribe(self._subscription)
+            self._subscription = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _connect(self):
+        """Open the polling connection and take a baseline"""
+        if self.conn is not None:
+            self.conn.close()
+        self.conn = sqlite3.connect(self.db_path)
+        self._data_version = self._read_data_version()
+        self._counters = self._read_counters()
+        self._local_changes = DatabaseManager.get_local_row_changes()
+
+    def _read_data_version(self):
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _read_counters(self):
+        return dict(self.conn.execute('SELECT table_name, change_count FROM table_changes').fetchall())
+
+    def poll(self):
+        """Check once for changes and schedule the next poll"""
+        try:
+            changed = self.check()
+            if changed:
+                DatabaseManager.mark_tables_changed(*changed)
+                publish(TablesChanged(frozenset(changed)))
+        except sqlite3.Error as e:
+            logging.warning(f"Change watcher poll failed: {e}")
+        self._after_id = self.root.after(self.interval_ms, self.poll)
+
+    def check(self):
+        """Return the tables changed by other processes since the last check"""
+        data_version = self._read_data_version()
+        if data_version == self._data_version:
+            return []  # Nothing committed elsewhere: the common, near-free case
+        self._data_version = data_version
+
+        counters = self._read_counters()
+        local_changes = DatabaseManager.get_local_row_changes()
+        changed = []
+        for table, count in counters.items():
+            delta = count - self._counters.get(table, 0)
+            local_delta = local_changes.get(table, 0) - self._local_changes.get(table, 0)
+            # Our own commits also bump data_version; only report rows we did not write
+            if delta > local_delta:
+                changed.append(table)
+        self._counters = counters
+        self._local_changes = local_changes
+        return changed
+
+    def _on_tables_changed(self, events):
+        if self.conn is not None and any(event.tables is None for event in events):
+            try:
+                self._connect()
+            except sqlite3.Error as e:
+                logging.warning(f"Change watcher could not reconnect: {e}")
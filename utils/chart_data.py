@@ -0,0 +1,126 @@
+"""
+Chart data provider backed by aggregate SQL queries
+"""
+
+import threading
+from datetime import date
+from config.database import DatabaseManager
+
+
+class ChartDataProvider:
+    """Serves chart series from GROUP BY queries, memoized until source tables change"""
+
+    def __init__(self):
+        self.db_manager = DatabaseManager()
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key, tables, loader):
+        """Return cached data for key unless one of its tables was written since"""
+        versions = DatabaseManager.get_table_versions(tables)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] == versions:
+                return entry[1]
+
+        data = loader()
+        with self._lock:
+            self._cache[key] = (versions, data)
+        return data
+
+    def clear(self):
+        """Drop all memoized results"""
+        with self._lock:
+            self._cache.clear()
+
+    def get_gender_distribution(self):
+        """Get active student counts per gender as a dict"""
+        def load():
+            query = '''
+                SELECT gender, COUNT(*) as student_count
+                FROM students
+                WHERE is_active = 1
+                GROUP BY gender
+            '''
+            counts = {'Male': 0, 'Female': 0}
+            for row in self.db_manager.execute_query(query):
+                counts[row['gender']] = row['student_count']
+            return counts
+
+        return self._cached('gender', ('students',), load)
+
+    def get_book_category_counts(self):
+        """Get (category, book count) pairs for active books"""
+        def load():
+            query = '''
+                SELECT COALESCE(NULLIF(category, ''), 'Uncategorized') as category,
+                       COUNT(*) as book_count
+                FROM books
+                WHERE is_active = 1
+                GROUP BY 1
+                ORDER BY book_count DESC, category
+            '''
+            return [(row['category'], row['book_count'])
+                    for row in self.db_manager.execute_query(query)]
+
+        return self._cached('book_categories', ('books',), load)
+
+    def get_occupancy_rates(self):
+        """Get occupancy rate for every active timeslot in a single query"""
+        def load():
+            query = '''
+                SELECT t.id, t.name, COUNT(ss.id) as occupied_seats,
+                       (SELECT COUNT(*) FROM seats WHERE is_active = 1) as total_seats
+                FROM timeslots t
+                LEFT JOIN student_subscriptions ss
+                       ON ss.timeslot_id = t.id AND ss.is_active = 1
+                WHERE t.is_active = 1
+                GROUP BY t.id, t.name
+                ORDER BY t.start_time
+            '''
+            rates = []
+            for row in self.db_manager.execute_query(query):
+                total = row['total_seats']
+                rate = (row['occupied_seats'] / total * 100) if total > 0 else 0
+                rates.append({'id': row['id'], 'name': row['name'], 'rate': rate})
+            return rates
+
+        return self._cached('occupancy', ('timeslots', 'student_subscriptions', 'seats'), load)
+
+    def get_revenue_by_timeslot(self, year, month):
+        """Get revenue per timeslot for a month"""
+        def load():
+            from utils.database_manager import DatabaseOperations
+            return [dict(row) for row in DatabaseOperations().get_revenue_by_timeslot(year, month)]
+
+        return self._cached(('revenue', year, month),
+                            ('student_subscriptions', 'students', 'timeslots'), load)
+
+    def get_seat_heatmap(self):
+        """Get the OccupancyHeatmap of active seats for today's subscriptions"""
+        today = date.today().isoformat()
+
+        def load():
+            from utils.occupancy_heatmap import build_heatmap
+            seat_ids = [row['id'] for row in
+                        self.db_manager.execute_query("SELECT id FROM seats WHERE is_active = 1")]
+            timeslots = [(row['id'], row['start_time'], row['end_time']) for row in
+                         self.db_manager.execute_query(
+                             "SELECT id, start_time, end_time FROM timeslots WHERE is_active = 1")]
+            query = '''
+                SELECT ss.seat_id, ss.timeslot_id
+                FROM student_subscriptions ss
+                JOIN students s ON ss.student_id = s.id
+                WHERE ss.is_active = 1 AND s.is_active = 1
+                  AND ss.start_date <= ? AND ss.end_date >= ?
+            '''
+            bookings = [(row['seat_id'], row['timeslot_id'])
+                        for row in self.db_manager.execute_query(query, (today, today))]
+            return build_heatmap(seat_ids, timeslots, bookings)
+
+        return self._cached(('seat_heatmap', today),
+                            ('seats', 'timeslots', 'student_subscriptions', 'students'), load)
+
+
+# Shared provider so every frame benefits from the same memo
+chart_data_provider = ChartDataProvider()
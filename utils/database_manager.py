@@ -7,6 +7,7 @@ from models.student import Student
 from models.timeslot import Timeslot
 from models.seat import Seat
 from models.book import Book
+from utils.events import publish, TablesChanged
 
 
 class DatabaseOperations:
@@ -234,6 +235,8 @@ class DatabaseOperations:
         import shutil
         try:
             shutil.copy2(backup_path, self.db_manager.db_path)
+            DatabaseManager.mark_all_tables_changed()
+            publish(TablesChanged())
             return True, "Database restored successfully"
         except Exception as e:
             return False, f"Restore failed: {str(e)}"
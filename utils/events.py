@@ -0,0 +1,198 @@
+"""
+In-process domain event bus
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Event:
+    """Base class for domain events"""
+
+
+@dataclass(frozen=True)
+class StudentSaved(Event):
+    student_id: int
+
+
+@dataclass(frozen=True)
+class StudentDeleted(Event):
+    student_id: int
+
+
+@dataclass(frozen=True)
+class SubscriptionCreated(Event):
+    subscription_id: int
+    student_id: int
+    seat_id: int
+    timeslot_id: int
+
+
+@dataclass(frozen=True)
+class SubscriptionUpdated(Event):
+    subscription_id: int
+    student_id: int
+    seat_id: int
+    timeslot_id: int
+
+
+@dataclass(frozen=True)
+class SubscriptionDeleted(Event):
+    subscription_id: int
+    student_id: int
+    seat_id: int
+    timeslot_id: int
+
+
+@dataclass(frozen=True)
+class SeatUpdated(Event):
+    seat_id: int
+
+
+@dataclass(frozen=True)
+class HallChanged(Event):
+    """A hall was added or renamed, or seats were added to it in bulk"""
+    hall_id: int
+
+
+@dataclass(frozen=True)
+class TimeslotChanged(Event):
+    timeslot_id: int
+
+
+@dataclass(frozen=True)
+class BookSaved(Event):
+    book_id: int
+
+
+@dataclass(frozen=True)
+class BookDeleted(Event):
+    book_id: int
+
+
+@dataclass(frozen=True)
+class BookBorrowed(Event):
+    borrowing_id: int
+    book_id: int
+    student_id: int
+
+
+@dataclass(frozen=True)
+class BookReturned(Event):
+    borrowing_id: int
+    book_id: int
+    student_id: int
+
+
+@dataclass(frozen=True)
+class BorrowingDeleted(Event):
+    borrowing_id: int
+
+
+@dataclass(frozen=True)
+class TablesChanged(Event):
+    """Tables written outside the models (restore, another process); tables=None means all"""
+    tables: frozenset = None
+
+    def affects(self, tables):
+        """Check whether any of the given tables changed"""
+        return self.tables is None or not self.tables.isdisjoint(tables)
+
+
+SUBSCRIPTION_EVENTS = (SubscriptionCreated, SubscriptionUpdated, SubscriptionDeleted)
+BORROWING_EVENTS = (BookBorrowed, BookReturned, BorrowingDeleted)
+
+
+class EventBus:
+    """Delivers events to handlers subscribed by event type
+
+    Handlers receive a list of events. Once attached to Tk, events are queued and
+    delivered once per idle cycle with duplicates removed, so a burst of writes
+    (e.g. a renewal saving a subscription twice) costs each frame a single update.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}  # token -> (event types, tables, handler)
+        self._next_token = 0
+        self._pending = []
+        self._flush_scheduled = False
+        self._root = None
+        self._lock = threading.Lock()
+
+    def attach_tk(self, root):
+        """Coalesce events and deliver them on the Tk main loop"""
+        self._root = root
+
+    def subscribe(self, event_types, handler, tables=None):
+        """Call handler(events) for events of the given type(s); returns a token for unsubscribe
+
+        tables limits TablesChanged events to those touching one of the given tables.
+        """
+        if not isinstance(event_types, tuple):
+            event_types = (event_types,)
+        with self._lock:
+            self._next_token += 1
+            token = self._next_token
+            self._subscriptions[token] = (event_types, tables, handler)
+        return token
+
+    def unsubscribe(self, token):
+        """Stop delivering events to a subscription"""
+        with self._lock:
+            self._subscriptions.pop(token, None)
+
+    def subscribe_widget(self, widget, event_types, handler, tables=None):
+        """Subscribe for as long as a Tk widget exists"""
+        token = self.subscribe(event_types, handler, tables)
+        widget.bind('<Destroy>', lambda e: self.unsubscribe(token) if e.widget is widget else None, add='+')
+        return token
+
+    def publish(self, event):
+        """Queue an event for delivery; safe to call from worker threads"""
+        with self._lock:
+            self._pending.append(event)
+            if self._root is None or self._flush_scheduled:
+                schedule = False
+            else:
+                self._flush_scheduled = schedule = True
+
+        if self._root is None:
+            self.flush()
+        elif schedule:
+            try:
+                self._root.after_idle(self.flush)
+            except RuntimeError:
+                # Main loop is gone (application shutting down)
+                with self._lock:
+                    self._flush_scheduled = False
+
+    def flush(self):
+        """Deliver all queued events"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._flush_scheduled = False
+            subscriptions = list(self._subscriptions.values())
+        if not pending:
+            return
+
+        events = list(dict.fromkeys(pending))  # Drop duplicates, keep order
+        for event_types, tables, handler in subscriptions:
+            matching = [event for event in events if isinstance(event, event_types)
+                        and not (tables and isinstance(event, TablesChanged) and not event.affects(tables))]
+            if not matching:
+                continue
+            try:
+                handler(matching)
+            except Exception as e:
+                logging.error(f"Event handler {getattr(handler, '__qualname__', handler)} failed: {e}")
+
+
+# Shared bus for the application
+event_bus = EventBus()
+
+
+def publish(event):
+    """Publish an event on the shared bus"""
+    event_bus.publish(event)
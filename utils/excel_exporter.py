@@ -3,10 +3,132 @@ Excel export utilities
 """
 
 import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
-import pandas as pd
-from config.settings import EXPORTS_DIR
+from config.settings import EXPORTS_DIR, EXPORT_CHUNK_SIZE
 from utils.database_manager import DatabaseOperations
+from utils.export_writers import XlsxWriter, get_export_writer, write_workbook
+
+# Extra sheets of an incremental export; every other sheet is named after its table
+DELTA_INFO_SHEET = 'Export Info'
+DELETIONS_SHEET = 'Deletions'
+
+
+class QueryRows:
+    """Rows of an export query, fetched from SQLite in chunks as they are written"""
+
+    def __init__(self, db_manager, query, params=(), connection=None, chunk_size=EXPORT_CHUNK_SIZE):
+        self.db_manager = db_manager
+        self.query = query
+        self.params = params
+        self.connection = connection
+        self.chunk_size = chunk_size
+
+    def open(self):
+        """Run the query and return (column names, iterator of row tuples)"""
+        owns_connection = self.connection is None
+        conn = self.db_manager.get_connection() if owns_connection else self.connection
+        try:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # Plain tuples; sqlite3.Row objects are not needed here
+            cursor.execute(self.query, self.params)
+            columns = [column[0] for column in cursor.description]
+        except Exception:
+            if owns_connection:
+                conn.close()
+            raise
+        return columns, self._iter_chunks(cursor, conn if owns_connection else None)
+
+    def column_types(self):
+        """Return the declared SQLite type of each column ('' if computed), or None if unknown
+
+        The types are read from a temporary view of the query. Views cannot hold
+        parameters, so a query with parameters gets None.
+        """
+        if self.params:
+            return None
+        owns_connection = self.connection is None
+        conn = self.db_manager.get_connection() if owns_connection else self.connection
+        view = f"export_types_{id(self)}"
+        try:
+            conn.execute(f'CREATE TEMP VIEW "{view}" AS {self.query}')
+            try:
+                return [row[2] for row in conn.execute(f'PRAGMA table_info("{view}")')]
+            finally:
+                conn.execute(f'DROP VIEW "{view}"')
+        finally:
+            if owns_connection:
+                conn.close()
+
+    def _iter_chunks(self, cursor, owned_connection):
+        try:
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+            if owned_connection is not None:
+                owned_connection.close()
+
+    def to_dicts(self):
+        """Return all rows as a list of dicts"""
+        columns, rows = self.open()
+        return [dict(zip(columns, row)) for row in rows]
+
+
+class DictRows:
+    """Export rows that are already in memory, as a list of dicts"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def open(self):
+        """Return (column names, iterator of row tuples)"""
+        columns = list(self.rows[0].keys()) if self.rows else []
+        return columns, (tuple(row.get(column) for column in columns) for row in self.rows)
+
+    def column_types(self):
+        return None
+
+    def to_dicts(self):
+        return list(self.rows)
+
+
+class TrackedRows:
+    """Wraps a rows source to report progress while its rows are written"""
+
+    def __init__(self, source, progress, sheet_name, index, count):
+        self.source = source
+        self.progress = progress
+        self.sheet_name = sheet_name
+        self.index = index
+        self.count = count
+
+    def open(self):
+        columns, rows = self.source.open()
+        return columns, self._iter_rows(rows)
+
+    def column_types(self):
+        return self.source.column_types()
+
+    def _iter_rows(self, rows):
+        try:
+            self.progress(self.sheet_name, self.index, self.count, 0)
+            written = 0
+            for row in rows:
+                yield row
+                written += 1
+                if written % EXPORT_CHUNK_SIZE == 0:
+                    self.progress(self.sheet_name, self.index, self.count, written)
+            self.progress(self.sheet_name, self.index + 1, self.count, written)
+        finally:
+            if hasattr(rows, 'close'):
+                rows.close()  # Release the query cursor now if the export stops early
 
 
 class ExcelExporter:
@@ -21,64 +143,84 @@ class ExcelExporter:
         if not os.path.exists(EXPORTS_DIR):
             os.makedirs(EXPORTS_DIR)
     
-    def export_all_data(self):
-        """Export all database data to Excel"""
+    def _rows(self, query, params=(), connection=None):
+        """Wrap an export query so its rows are streamed rather than loaded at once"""
+        return QueryRows(self.db_ops.db_manager, query, params, connection)
+    
+    @contextmanager
+    def snapshot(self):
+        """Yield a connection to a private copy of the database, removed afterwards
+        
+        The copy is taken with SQLite's backup API in a single read transaction, so all
+        sheets of an export come from the same point in time while the live database is
+        only locked for the moments the copy takes, not for the whole export.
+        """
+        fd, path = tempfile.mkstemp(prefix='export_snapshot_', suffix='.db')
+        os.close(fd)
+        conn = sqlite3.connect(path)
+        try:
+            source = self.db_ops.db_manager.get_connection()
+            try:
+                source.backup(conn)
+            finally:
+                source.close()
+            conn.row_factory = sqlite3.Row
+            yield conn
+        finally:
+            conn.close()
+            os.remove(path)
+    
+    def _write(self, writer, base_path, sheets, progress=None):
+        """Write sheets with an export writer; partial output is removed if it fails
+        
+        progress(sheet name, sheets done, sheet count, rows written) is called as each
+        sheet starts, every EXPORT_CHUNK_SIZE rows and when it ends; it may raise to abort.
+        """
+        if progress is not None:
+            sheets = [(name, TrackedRows(source, progress, name, index, len(sheets)))
+                      for index, (name, source) in enumerate(sheets)]
+        try:
+            return writer.write(base_path, sheets)
+        except Exception:
+            for path in (base_path + writer.extension, base_path):
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.exists(path):
+                    os.remove(path)
+            raise
+    
+    def export_all_data(self, export_format='xlsx', progress=None):
+        """Export all database data (to Excel unless another EXPORT_WRITERS format is given)"""
         try:
+            writer = get_export_writer(export_format)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"library_data_export_{timestamp}.xlsx"
-            filepath = os.path.join(EXPORTS_DIR, filename)
+            base_path = os.path.join(EXPORTS_DIR, f"library_data_export_{timestamp}")
             
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                # Export students
-                students_data = self._get_students_data()
-                students_df = pd.DataFrame(students_data)
-                students_df.to_excel(writer, sheet_name='Students', index=False)
-                
-                # Export subscriptions
-                subscriptions_data = self._get_subscriptions_data()
-                subscriptions_df = pd.DataFrame(subscriptions_data)
-                subscriptions_df.to_excel(writer, sheet_name='Subscriptions', index=False)
-                
-                # Export seats
-                seats_data = self._get_seats_data()
-                seats_df = pd.DataFrame(seats_data)
-                seats_df.to_excel(writer, sheet_name='Seats', index=False)
-                
-                # Export timeslots
-                timeslots_data = self._get_timeslots_data()
-                timeslots_df = pd.DataFrame(timeslots_data)
-                timeslots_df.to_excel(writer, sheet_name='Timeslots', index=False)
-                
-                # Export books
-                books_data = self._get_books_data()
-                books_df = pd.DataFrame(books_data)
-                books_df.to_excel(writer, sheet_name='Books', index=False)
-                
-                # Export borrowings
-                borrowings_data = self._get_borrowings_data()
-                borrowings_df = pd.DataFrame(borrowings_data)
-                borrowings_df.to_excel(writer, sheet_name='Borrowings', index=False)
-                
-                # Export analytics
-                analytics_data = self._get_analytics_data()
-                analytics_df = pd.DataFrame(analytics_data)
-                analytics_df.to_excel(writer, sheet_name='Analytics', index=False)
+            with self.snapshot() as conn:
+                filepath = self._write(writer, base_path, [
+                    ('Students', self._get_students_data(conn)),
+                    ('Subscriptions', self._get_subscriptions_data(conn)),
+                    ('Seats', self._get_seats_data(conn)),
+                    ('Timeslots', self._get_timeslots_data(conn)),
+                    ('Books', self._get_books_data(conn)),
+                    ('Borrowings', self._get_borrowings_data(conn)),
+                    ('Analytics', self._get_analytics_data(conn)),
+                ], progress)
             
             return True, filepath
         
         except Exception as e:
             return False, f"Export failed: {str(e)}"
     
-    def export_students_data(self):
+    def export_students_data(self, progress=None):
         """Export only students data"""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"students_export_{timestamp}.xlsx"
-            filepath = os.path.join(EXPORTS_DIR, filename)
+            base_path = os.path.join(EXPORTS_DIR, f"students_export_{timestamp}")
             
-            students_data = self._get_students_data()
-            students_df = pd.DataFrame(students_data)
-            students_df.to_excel(filepath, index=False)
+            with self.snapshot() as conn:
+                filepath = self._write(XlsxWriter(), base_path, [('Sheet1', self._get_students_data(conn))],
+                                       progress)
             
             return True, filepath
         
@@ -96,61 +238,92 @@ class ExcelExporter:
             filename = f"financial_report_{year}_{month:02d}.xlsx"
             filepath = os.path.join(EXPORTS_DIR, filename)
             
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                # Monthly summary
-                monthly_stats = self.db_ops.get_monthly_statistics(year, month)
-                summary_df = pd.DataFrame([monthly_stats])
-                summary_df.to_excel(writer, sheet_name='Monthly Summary', index=False)
-                
-                # Detailed subscriptions for the month
-                subscriptions_data = self._get_monthly_subscriptions(year, month)
-                subscriptions_df = pd.DataFrame(subscriptions_data)
-                subscriptions_df.to_excel(writer, sheet_name='Subscriptions', index=False)
-                
-                # Revenue breakdown by timeslot
-                revenue_breakdown = self._get_revenue_breakdown(year, month)
-                revenue_df = pd.DataFrame(revenue_breakdown)
-                revenue_df.to_excel(writer, sheet_name='Revenue Breakdown', index=False)
+            write_workbook(filepath, [
+                ('Monthly Summary', DictRows([self.db_ops.get_monthly_statistics(year, month)])),
+                ('Subscriptions', self._get_monthly_subscriptions(year, month)),
+                ('Revenue Breakdown', self._get_revenue_breakdown(year, month)),
+            ])
             
             return True, filepath
         
         except Exception as e:
             return False, f"Financial report export failed: {str(e)}"
 
-    def export_comprehensive_student_report(self):
+    def export_comprehensive_student_report(self, progress=None):
         """Export comprehensive student-subscription report with all details"""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"comprehensive_student_report_{timestamp}.xlsx"
-            filepath = os.path.join(EXPORTS_DIR, filename)
+            base_path = os.path.join(EXPORTS_DIR, f"comprehensive_student_report_{timestamp}")
             
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                # Comprehensive student-subscription data
-                comprehensive_data = self._get_comprehensive_student_subscription_data()
-                comprehensive_df = pd.DataFrame(comprehensive_data)
-                comprehensive_df.to_excel(writer, sheet_name='Student Subscriptions', index=False)
-                
-                # Students summary
-                students_data = self._get_students_data()
-                students_df = pd.DataFrame(students_data)
-                students_df.to_excel(writer, sheet_name='Students Summary', index=False)
+            with self.snapshot() as conn:
+                filepath = self._write(XlsxWriter(), base_path, [
+                    ('Student Subscriptions', self._get_comprehensive_student_subscription_data(conn)),
+                    ('Students Summary', self._get_students_data(conn)),
+                    ('Active Subscriptions', self._get_active_subscriptions_data(conn)),
+                    ('Expired Subscriptions', self._get_expired_subscriptions_data(conn)),
+                ], progress)
+            
+            return True, filepath
+        
+        except Exception as e:
+            return False, f"Comprehensive report export failed: {str(e)}"
+
+    def export_changes(self, progress=None):
+        """Export rows changed since the previous incremental export to a dated delta file
+        
+        Each tracked table gets a sheet of its raw rows whose updated_at is newer than the
+        watermark saved by the last run (soft deletes show up as is_active = 0), and the
+        Deletions sheet lists hard deletes from row_deletions. The first run exports
+        everything, so merge_delta_exports() can rebuild a full snapshot from the files.
+        """
+        from config.database import CHANGE_TRACKED_TABLES
+        
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            base_path = os.path.join(EXPORTS_DIR, f"library_delta_{timestamp}")
+            
+            # Rows and new watermarks come from one snapshot, so they agree
+            with self.snapshot() as conn:
+                previous = {row['table_name']: row['watermark']
+                            for row in conn.execute('SELECT table_name, watermark FROM export_watermarks')}
+                marks = {}
+                info = []
+                sheets = []
+                for table in CHANGE_TRACKED_TABLES:
+                    since = previous.get(table)
+                    latest = conn.execute(f'SELECT MAX(updated_at) FROM {table}').fetchone()[0]
+                    marks[table] = latest if latest is not None else since
+                    if since is None:
+                        rows = self._rows(f'SELECT * FROM {table} ORDER BY id', connection=conn)
+                    else:
+                        rows = self._rows(f'SELECT * FROM {table} WHERE updated_at > ? ORDER BY id',
+                                          (since,), connection=conn)
+                    sheets.append((table, rows))
+                    info.append({'Table': table, 'Changed After': since or 'Full export',
+                                 'Changed Up To': marks[table]})
                 
-                # Active subscriptions only
-                active_subscriptions = self._get_active_subscriptions_data()
-                active_df = pd.DataFrame(active_subscriptions)
-                active_df.to_excel(writer, sheet_name='Active Subscriptions', index=False)
+                since = previous.get('row_deletions') or 0
+                marks['row_deletions'] = conn.execute('SELECT MAX(id) FROM row_deletions').fetchone()[0] or since
+                sheets.append((DELETIONS_SHEET, self._rows(
+                    'SELECT table_name, row_id, deleted_at FROM row_deletions WHERE id > ? ORDER BY id',
+                    (since,), connection=conn
+                )))
                 
-                # Expired subscriptions
-                expired_subscriptions = self._get_expired_subscriptions_data()
-                expired_df = pd.DataFrame(expired_subscriptions)
-                expired_df.to_excel(writer, sheet_name='Expired Subscriptions', index=False)
+                filepath = self._write(XlsxWriter(), base_path, [(DELTA_INFO_SHEET, DictRows(info))] + sheets,
+                                       progress)
+            
+            self.db_ops.db_manager.execute_many(
+                'INSERT OR REPLACE INTO export_watermarks (table_name, watermark, exported_at) '
+                'VALUES (?, ?, CURRENT_TIMESTAMP)',
+                list(marks.items())
+            )
             
             return True, filepath
         
         except Exception as e:
-            return False, f"Comprehensive report export failed: {str(e)}"
+            return False, f"Incremental export failed: {str(e)}"
     
-    def _get_students_data(self):
+    def _get_students_data(self, connection=None):
         """Get students data for export"""
         query = '''
             SELECT 
@@ -170,9 +343,9 @@ class ExcelExporter:
             GROUP BY s.id
             ORDER BY s.name
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(query)]
+        return self._rows(query, connection=connection)
     
-    def _get_subscriptions_data(self):
+    def _get_subscriptions_data(self, connection=None):
         """Get subscriptions data for export"""
         query = '''
             SELECT 
@@ -194,9 +367,9 @@ class ExcelExporter:
             WHERE ss.is_active = 1 AND s.is_active = 1
             ORDER BY ss.start_date DESC
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(query)]
+        return self._rows(query, connection=connection)
     
-    def _get_seats_data(self):
+    def _get_seats_data(self, connection=None):
         """Get seats data for export"""
         query = '''
             SELECT 
@@ -209,9 +382,9 @@ class ExcelExporter:
             GROUP BY s.id
             ORDER BY s.id
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(query)]
+        return self._rows(query, connection=connection)
     
-    def _get_timeslots_data(self):
+    def _get_timeslots_data(self, connection=None):
         """Get timeslots data for export"""
         query = '''
             SELECT 
@@ -224,9 +397,9 @@ class ExcelExporter:
             GROUP BY t.id
             ORDER BY t.start_time
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(query)]
+        return self._rows(query, connection=connection)
     
-    def _get_books_data(self):
+    def _get_books_data(self, connection=None):
         """Get books data for export"""
         query = '''
             SELECT 
@@ -240,9 +413,9 @@ class ExcelExporter:
             GROUP BY b.id
             ORDER BY b.title
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(query)]
+        return self._rows(query, connection=connection)
     
-    def _get_borrowings_data(self):
+    def _get_borrowings_data(self, connection=None):
         """Get book borrowings data for export"""
         query = '''
             SELECT 
@@ -255,23 +428,39 @@ class ExcelExporter:
             JOIN books b ON bb.book_id = b.id
             ORDER BY bb.borrow_date DESC
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(query)]
+        return self._rows(query, connection=connection)
     
-    def _get_analytics_data(self):
+    def _get_analytics_data(self, connection=None):
         """Get analytics data for export"""
-        analytics = self.db_ops.get_analytics_data()
-        return [
-            {'Metric': 'Total Students', 'Value': analytics['total_students']},
-            {'Metric': 'Total Seats', 'Value': analytics['total_seats']},
-            {'Metric': 'Occupied Seats', 'Value': analytics['occupied_seats']},
-            {'Metric': 'Unoccupied Seats', 'Value': analytics['unoccupied_seats']},
-            {'Metric': 'Assigned Students', 'Value': analytics['assigned_students']},
-            {'Metric': 'Unassigned Students', 'Value': analytics['unassigned_students']},
-            {'Metric': 'Total Books', 'Value': analytics['total_books']},
-            {'Metric': 'Active Borrowings', 'Value': analytics['active_borrowings']},
-        ]
+        # One statement, so the figures are read together with the rest of the snapshot
+        query = '''
+            WITH counts AS (
+                SELECT
+                    (SELECT COUNT(*) FROM students WHERE is_active = 1) as total_students,
+                    (SELECT COUNT(*) FROM seats WHERE is_active = 1) as total_seats,
+                    (SELECT COUNT(DISTINCT ss.seat_id)
+                     FROM student_subscriptions ss
+                     JOIN students s ON ss.student_id = s.id
+                     WHERE ss.is_active = 1 AND s.is_active = 1) as occupied_seats,
+                    (SELECT COUNT(DISTINCT ss.student_id)
+                     FROM student_subscriptions ss
+                     JOIN students s ON ss.student_id = s.id
+                     WHERE ss.is_active = 1 AND s.is_active = 1) as assigned_students,
+                    (SELECT COUNT(*) FROM books WHERE is_active = 1) as total_books,
+                    (SELECT COUNT(*) FROM book_borrowings WHERE is_returned = 0) as active_borrowings
+            )
+            SELECT 'Total Students' as Metric, total_students as Value FROM counts
+            UNION ALL SELECT 'Total Seats', total_seats FROM counts
+            UNION ALL SELECT 'Occupied Seats', occupied_seats FROM counts
+            UNION ALL SELECT 'Unoccupied Seats', total_seats - occupied_seats FROM counts
+            UNION ALL SELECT 'Assigned Students', assigned_students FROM counts
+            UNION ALL SELECT 'Unassigned Students', total_students - assigned_students FROM counts
+            UNION ALL SELECT 'Total Books', total_books FROM counts
+            UNION ALL SELECT 'Active Borrowings', active_borrowings FROM counts
+        '''
+        return self._rows(query, connection=connection)
     
-    def _get_monthly_subscriptions(self, year, month):
+    def _get_monthly_subscriptions(self, year, month, connection=None):
         """Get subscriptions for specific month"""
         query = '''
             SELECT 
@@ -287,11 +476,9 @@ class ExcelExporter:
             AND ss.is_active = 1 AND s.is_active = 1
             ORDER BY ss.start_date
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(
-            query, (str(year), f"{month:02d}")
-        )]
+        return self._rows(query, (str(year), f"{month:02d}"), connection=connection)
     
-    def _get_revenue_breakdown(self, year, month):
+    def _get_revenue_breakdown(self, year, month, connection=None):
         """Get revenue breakdown by timeslot for specific month"""
         query = '''
             SELECT 
@@ -306,11 +493,9 @@ class ExcelExporter:
             GROUP BY t.id, t.name, t.price
             ORDER BY total_revenue DESC
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(
-            query, (str(year), f"{month:02d}")
-        )]
+        return self._rows(query, (str(year), f"{month:02d}"), connection=connection)
 
-    def _get_comprehensive_student_subscription_data(self):
+    def _get_comprehensive_student_subscription_data(self, connection=None):
         """Get comprehensive student-subscription data with all details"""
         query = '''
             SELECT 
@@ -344,9 +529,9 @@ class ExcelExporter:
             WHERE ss.is_active = 1 AND s.is_active = 1
             ORDER BY ss.start_date DESC, s.name
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(query)]
+        return self._rows(query, connection=connection)
 
-    def _get_active_subscriptions_data(self):
+    def _get_active_subscriptions_data(self, connection=None):
         """Get only active subscriptions data"""
         query = '''
             SELECT 
@@ -362,9 +547,9 @@ class ExcelExporter:
             WHERE ss.is_active = 1 AND s.is_active = 1 AND ss.end_date >= date('now')
             ORDER BY ss.end_date ASC
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(query)]
+        return self._rows(query, connection=connection)
 
-    def _get_expired_subscriptions_data(self):
+    def _get_expired_subscriptions_data(self, connection=None):
         """Get only expired subscriptions data"""
         query = '''
             SELECT 
@@ -380,4 +565,70 @@ class ExcelExporter:
             WHERE ss.is_active = 1 AND s.is_active = 1 AND ss.end_date < date('now')
             ORDER BY ss.end_date DESC
         '''
-        return [dict(row) for row in self.db_ops.db_manager.execute_query(query)]
+        return self._rows(query, connection=connection)
+
+
+def merge_delta_exports(delta_paths, output_path):
+    """Rebuild a full snapshot workbook from incremental exports
+    
+    delta_paths must start from the first (full) export; files are applied in
+    the order of their dated names. Rows are merged by id in a temporary SQLite
+    database, so memory stays flat however many rows the deltas hold.
+    """
+    import sqlite3
+    import tempfile
+    from openpyxl import load_workbook
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        conn = sqlite3.connect(os.path.join(temp_dir, 'merge.db'))
+        try:
+            tables = {}  # table -> columns, in the order first seen
+            for path in sorted(delta_paths, key=os.path.basename):
+                workbook = load_workbook(path, read_only=True)
+                try:
+                    # Deletions first: a row deleted and re-added within one delta is kept
+                    if DELETIONS_SHEET in workbook.sheetnames:
+                        deletions = workbook[DELETIONS_SHEET].iter_rows(min_row=2, values_only=True)
+                        for table, row_id, *_ in deletions:
+                            if table in tables:
+                                conn.execute(f'DELETE FROM "{table}" WHERE id = ?', (row_id,))
+                    
+                    for table in workbook.sheetnames:
+                        if table in (DELTA_INFO_SHEET, DELETIONS_SHEET):
+                            continue
+                        rows = workbook[table].iter_rows(values_only=True)
+                        header = list(next(rows, ()))
+                        while header and header[-1] is None:
+                            header.pop()
+                        if not header:
+                            continue
+                        columns = tables.get(table)
+                        if columns is None:
+                            columns = tables[table] = []
+                            conn.execute(f'CREATE TABLE "{table}" (id INTEGER PRIMARY KEY)')
+                        for column in header:
+                            if column not in columns:
+                                if column != 'id':
+                                    conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+                                columns.append(column)
+                        
+                        column_list = ', '.join(f'"{column}"' for column in header)
+                        placeholders = ', '.join('?' * len(header))
+                        conn.executemany(
+                            f'INSERT OR REPLACE INTO "{table}" ({column_list}) VALUES ({placeholders})',
+                            ((tuple(row) + (None,) * len(header))[:len(header)]
+                             for row in rows if any(value is not None for value in row))
+                        )
+                finally:
+                    workbook.close()
+            conn.commit()
+            
+            sheets = []
+            for table, columns in tables.items():
+                column_list = ', '.join(f'"{column}"' for column in columns)
+                query = f'SELECT {column_list} FROM "{table}" ORDER BY id'
+                sheets.append((table, QueryRows(None, query, connection=conn)))
+            write_workbook(output_path, sheets)
+        finally:
+            conn.close()
+    return output_path
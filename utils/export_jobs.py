@@ -0,0 +1,69 @@
+"""
+Background export jobs with progress and cancellation
+"""
+
+import logging
+import threading
+import time
+from utils.task_executor import task_executor
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCancelled(Exception):
+    """Raised inside a running export once its job has been cancelled"""
+
+
+class ExportJob:
+    """An export running on the shared task executor
+
+    run(progress) executes on a worker thread and returns (success, result), like the
+    ExcelExporter export methods it usually wraps. progress() records which sheet is
+    being written and raises ExportCancelled after cancel(), which unwinds the export
+    and removes its partial output.
+    """
+
+    def __init__(self, name, run):
+        self.name = name
+        self.run = run
+        self.task = None
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._status = (None, 0, 0, 0)  # sheet, sheets done, sheet count, rows written
+
+    def start(self, on_done, widget=None):
+        """Run the export; on_done((success, result)) is called on the Tk main loop"""
+        self.task = task_executor.submit(
+            self._execute, on_success=on_done, widget=widget,
+            on_error=lambda e: on_done((False, f"Export failed: {str(e)}"))
+        )
+        return self.task
+
+    def _execute(self):
+        started = time.perf_counter()
+        success, result = self.run(self.progress)
+        if self._cancelled.is_set():
+            logger.info("Export %s cancelled after %.1f s", self.name, time.perf_counter() - started)
+            return False, "Export cancelled"
+        logger.info("Export %s finished in %.1f s: %s", self.name, time.perf_counter() - started, result)
+        return success, result
+
+    def progress(self, sheet, sheets_done, sheet_count, rows):
+        """Record export progress; called from the worker thread"""
+        with self._lock:
+            self._status = (sheet, sheets_done, sheet_count, rows)
+        if self._cancelled.is_set():
+            raise ExportCancelled()
+
+    @property
+    def status(self):
+        """Return (sheet, sheets done, sheet count, rows written in the sheet)"""
+        with self._lock:
+            return self._status
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
@@ -0,0 +1,243 @@
+"""
+Export file writers: Excel, CSV and Parquet
+"""
+
+import csv
+import gzip
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from functools import partial
+from itertools import islice
+from config.settings import PARQUET_ROW_GROUP_SIZE
+
+# Parquet column types picked by column name; other columns follow their values
+DATE_COLUMNS = ('date',)  # registration_date, start_date, ...
+TIMESTAMP_COLUMNS = ('created_at', 'updated_at', 'deleted_at')
+AMOUNT_COLUMNS = ('amount', 'price', 'fine', 'revenue', 'cost', 'paid')
+
+
+def write_workbook(filepath, sheets):
+    """Write [(sheet name, rows source), ...] to an xlsx file in constant memory
+
+    The workbook is opened in openpyxl's write-only mode, so each row is serialized
+    to disk as soon as it is appended and only one chunk of query results is held
+    at a time, however large the tables are.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    header_font = Font(bold=True)
+    try:
+        for sheet_name, source in sheets:
+            worksheet = workbook.create_sheet(title=sheet_name)
+            columns, rows = source.open()
+            header = []
+            for column in columns:
+                cell = WriteOnlyCell(worksheet, value=column)
+                cell.font = header_font
+                header.append(cell)
+            worksheet.append(header)
+            for row in rows:
+                worksheet.append(row)
+    except Exception:
+        # Finish the sheets' temporary files so an aborted export leaves nothing behind
+        for worksheet in workbook.worksheets:
+            worksheet.close()
+        raise
+    workbook.save(filepath)
+
+
+class ExportWriter:
+    """Writes named row sources (see QueryRows) to files of one format
+
+    write() takes a path without extension. A single sheet becomes one file;
+    formats holding one table per file write several sheets into a directory.
+    """
+
+    extension = None
+    multi_sheet = False
+
+    def write(self, base_path, sheets):
+        """Write the sheets and return the path of the file or directory created"""
+        if self.multi_sheet:
+            filepath = base_path + self.extension
+            self.write_file(filepath, sheets)
+            return filepath
+        if len(sheets) == 1:
+            filepath = base_path + self.extension
+            self._write_source(filepath, sheets[0][1])
+            return filepath
+        os.makedirs(base_path, exist_ok=True)
+        for sheet_name, source in sheets:
+            self._write_source(os.path.join(base_path, sheet_name + self.extension), source)
+        return base_path
+
+    def _write_source(self, filepath, source):
+        column_types = source.column_types()
+        self.write_table(filepath, *source.open(), column_types=column_types)
+
+    def write_file(self, filepath, sheets):
+        raise NotImplementedError
+
+    def write_table(self, filepath, columns, rows, column_types=None):
+        """Write one table; column_types are the declared SQLite types of the columns, if known"""
+        raise NotImplementedError
+
+
+class XlsxWriter(ExportWriter):
+    """Excel workbook with one sheet per table"""
+
+    extension = '.xlsx'
+    multi_sheet = True
+
+    def write_file(self, filepath, sheets):
+        write_workbook(filepath, sheets)
+
+
+class CsvWriter(ExportWriter):
+    """CSV file per table, streamed row by row and optionally gzip-compressed"""
+
+    def __init__(self, compress=False):
+        self.compress = compress
+        self.extension = '.csv.gz' if compress else '.csv'
+
+    def write_table(self, filepath, columns, rows, column_types=None):
+        if self.compress:
+            # Level 6 is several times faster than gzip's default 9 for almost the same size
+            output = gzip.open(filepath, 'wt', encoding='utf-8', newline='', compresslevel=6)
+        else:
+            output = open(filepath, 'w', encoding='utf-8', newline='')
+        with output:
+            writer = csv.writer(output)
+            writer.writerow(columns)
+            writer.writerows(rows)
+
+
+class ParquetWriter(ExportWriter):
+    """Parquet file per table with typed date, timestamp and amount columns (needs pyarrow)
+
+    Other columns take the type they are declared with in SQLite, so every export of a
+    table has the same schema; only computed columns are typed from their values.
+    """
+
+    extension = '.parquet'
+
+    def __init__(self, row_group_size=PARQUET_ROW_GROUP_SIZE):
+        self.row_group_size = row_group_size
+
+    def write_table(self, filepath, columns, rows, column_types=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        rows = iter(rows)
+        batch = list(islice(rows, self.row_group_size))
+        converters, fields = [], []
+        column_types = column_types or [''] * len(columns)
+        for index, column in enumerate(columns):
+            converter, arrow_type = self._column_type(pa, column, column_types[index],
+                                                      [row[index] for row in batch])
+            converters.append(converter)
+            fields.append(pa.field(column, arrow_type))
+        schema = pa.schema(fields)
+
+        with pq.ParquetWriter(filepath, schema, compression='snappy') as writer:
+            while True:
+                arrays = []
+                for index, converter in enumerate(converters):
+                    values = [row[index] for row in batch]
+                    if converter is not None:
+                        values = [None if value is None else converter(value) for value in values]
+                    arrays.append(pa.array(values, type=schema.field(index).type))
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                batch = list(islice(rows, self.row_group_size))
+                if not batch:
+                    break
+
+    @staticmethod
+    def _column_type(pa, column, declared, values):
+        """Return (value converter or None, arrow type) for a column"""
+        name = column.lower()
+        declared = declared.upper()
+        if name in TIMESTAMP_COLUMNS or declared in ('TIMESTAMP', 'DATETIME'):
+            return _to_timestamp, pa.timestamp('ms')
+        if name.endswith(DATE_COLUMNS) or declared == 'DATE':
+            return _to_date, pa.date32()
+        if any(part in name for part in AMOUNT_COLUMNS) or declared.startswith(('DECIMAL', 'NUMERIC')):
+            return _to_amount, pa.decimal128(12, 2)
+
+        # SQLite's type affinity rules, in their order of precedence
+        if 'INT' in declared:
+            return partial(_to_int, column), pa.int64()
+        if any(part in declared for part in ('CHAR', 'CLOB', 'TEXT', 'TIME')):
+            return _to_string, pa.string()
+        if 'BLOB' in declared:
+            return None, pa.binary()
+        if any(part in declared for part in ('REAL', 'FLOA', 'DOUB')):
+            return float, pa.float64()
+        if declared == 'BOOLEAN':
+            return bool, pa.bool_()
+
+        # Computed columns have no declared type, so a later row group may not fit the type
+        # picked here; integer columns check every value rather than silently truncating floats
+        kinds = {type(value) for value in values if value is not None}
+        if kinds == {int}:
+            return partial(_to_int, column), pa.int64()
+        if kinds and kinds <= {int, float}:
+            return float, pa.float64()
+        if kinds == {bytes}:
+            return None, pa.binary()
+        return _to_string, pa.string()
+
+
+def _to_int(column, value):
+    if value == '':
+        return None
+    if type(value) is not int:
+        raise ValueError(f"Column '{column}' was exported as integers but has the value {value!r}")
+    return value
+
+
+def _to_string(value):
+    return value if isinstance(value, str) else str(value)
+
+
+def _to_date(value):
+    if value == '':
+        return None
+    if isinstance(value, (date, datetime)):
+        return value if type(value) is date else value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def _to_timestamp(value):
+    if value == '':
+        return None
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def _to_amount(value):
+    if value == '':
+        return None
+    return Decimal(str(value)).quantize(Decimal('0.01'))
+
+
+EXPORT_WRITERS = {
+    'xlsx': XlsxWriter,
+    'csv': CsvWriter,
+    'csv.gz': lambda: CsvWriter(compress=True),
+    'parquet': ParquetWriter,
+}
+
+
+def get_export_writer(export_format):
+    """Return the writer for an EXPORT_WRITERS key"""
+    try:
+        return EXPORT_WRITERS[export_format]()
+    except KeyError:
+        raise ValueError(f"Unknown export format: {export_format}")
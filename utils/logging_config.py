@@ -0,0 +1,121 @@
+"""
+Application logging setup: queue-backed, JSON-lines file output, per-module levels
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from datetime import datetime
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener's handlers
+
+    The stock prepare() bakes the queue handler's format into the message; here only
+    the arguments are merged, so each listener handler applies its own format.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(text):
+    """Parse 'module=LEVEL,other.module=LEVEL' into a dict"""
+    levels = {}
+    for item in (text or '').split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(log_dir=None, level=None, module_levels=None, console_level=None):
+    """Route all logging through a background queue listener
+
+    Records go to a rotating JSON-lines file in log_dir and, from console_level up,
+    to stderr. Callers only pay for putting a record on a queue; records below a
+    logger's level are discarded before their message is even formatted.
+    LIBRARY_LOG_LEVEL and LIBRARY_LOG_LEVELS (module=LEVEL,...) override the settings.
+    """
+    global _listener
+    from config.settings import (
+        LOGS_DIR, LOG_LEVEL, LOG_MODULE_LEVELS, LOG_CONSOLE_LEVEL, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS
+    )
+
+    if _listener is not None:
+        return _listener
+
+    log_dir = log_dir or LOGS_DIR
+    level = os.environ.get('LIBRARY_LOG_LEVEL', level or LOG_LEVEL).upper()
+    module_levels = dict(LOG_MODULE_LEVELS if module_levels is None else module_levels)
+    module_levels.update(parse_levels(os.environ.get('LIBRARY_LOG_LEVELS')))
+
+    handlers = []
+    console = logging.StreamHandler()
+    console.setLevel((console_level or LOG_CONSOLE_LEVEL).upper())
+    console.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    handlers.append(console)
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(log_dir, 'app.jsonl'), maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUPS, encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    except OSError as e:
+        console.setLevel(logging.NOTSET)
+        logging.getLogger(__name__).warning("File logging disabled: %s", e)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level)
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(module_level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
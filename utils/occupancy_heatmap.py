@@ -0,0 +1,109 @@
+"""
+Seat occupancy heatmap computed from a seat x minute occupancy array
+"""
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_minutes(value):
+    """Convert an 'HH:MM' or 'HH:MM:SS' time string to minutes after midnight"""
+    parts = str(value).split(':')
+    return (int(parts[0]) * 60 + int(parts[1])) % MINUTES_PER_DAY
+
+
+def timeslot_ranges(start_time, end_time):
+    """Return the [start, end) minute ranges covered by a timeslot
+
+    Timeslots ending at or before their start (e.g. 23:00-06:00) run past midnight.
+    """
+    start, end = parse_minutes(start_time), parse_minutes(end_time)
+    if start < end:
+        return [(start, end)]
+    if start == end:
+        return [(0, MINUTES_PER_DAY)]
+    return [(start, MINUTES_PER_DAY), (0, end)]
+
+
+class OccupancyHeatmap:
+    """Fraction of time each seat is booked, for the whole day and within each timeslot
+
+    All views are computed up front, so switching between them is a dictionary lookup.
+    """
+
+    def __init__(self, day, by_timeslot):
+        self.day = day  # seat id -> fraction of the day booked
+        self.by_timeslot = by_timeslot  # timeslot id -> {seat id -> fraction of that timeslot booked}
+
+    def fractions(self, timeslot_id=None):
+        """Get seat id -> booked fraction for a timeslot, or for the whole day"""
+        if timeslot_id is None:
+            return self.day
+        return self.by_timeslot.get(timeslot_id, {})
+
+
+def build_heatmap(seat_ids, timeslots, bookings):
+    """Build an OccupancyHeatmap
+
+    timeslots are (id, start_time, end_time) tuples and bookings (seat_id, timeslot_id)
+    pairs of current subscriptions. Uses numpy when installed and plain integer bitsets
+    (one bit per minute) otherwise; both give the same result.
+    """
+    seat_ids = list(seat_ids)
+    slot_ids = [slot_id for slot_id, _, _ in timeslots]
+    ranges = [timeslot_ranges(start, end) for _, start, end in timeslots]
+    try:
+        import numpy
+    except ImportError:
+        return _build_with_bitsets(seat_ids, slot_ids, ranges, bookings)
+    return _build_with_numpy(numpy, seat_ids, slot_ids, ranges, bookings)
+
+
+def _build_with_numpy(np, seat_ids, slot_ids, ranges, bookings):
+    seat_index = {seat_id: i for i, seat_id in enumerate(seat_ids)}
+    slot_index = {slot_id: i for i, slot_id in enumerate(slot_ids)}
+
+    # timeslot x minute coverage
+    slot_minutes = np.zeros((len(slot_ids), MINUTES_PER_DAY), dtype=np.uint16)
+    for i, slot_ranges in enumerate(ranges):
+        for start, end in slot_ranges:
+            slot_minutes[i, start:end] = 1
+
+    # seat x timeslot bookings, then seat x minute occupancy in one product
+    booked = np.zeros((len(seat_ids), len(slot_ids)), dtype=np.uint16)
+    pairs = [(seat_index[seat_id], slot_index[slot_id]) for seat_id, slot_id in bookings
+             if seat_id in seat_index and slot_id in slot_index]
+    if pairs:
+        rows, cols = zip(*pairs)
+        booked[list(rows), list(cols)] = 1
+    occupied = (booked @ slot_minutes) > 0
+
+    day = occupied.sum(axis=1) / MINUTES_PER_DAY
+    slot_lengths = np.maximum(slot_minutes.sum(axis=1), 1)
+    per_slot = (occupied.astype(np.uint16) @ slot_minutes.T) / slot_lengths
+
+    return OccupancyHeatmap(
+        dict(zip(seat_ids, day.tolist())),
+        {slot_id: dict(zip(seat_ids, per_slot[:, i].tolist())) for i, slot_id in enumerate(slot_ids)}
+    )
+
+
+def _build_with_bitsets(seat_ids, slot_ids, ranges, bookings):
+    slot_masks = {}
+    for slot_id, slot_ranges in zip(slot_ids, ranges):
+        mask = 0
+        for start, end in slot_ranges:
+            mask |= ((1 << (end - start)) - 1) << start
+        slot_masks[slot_id] = mask
+
+    occupied = dict.fromkeys(seat_ids, 0)
+    for seat_id, slot_id in bookings:
+        if seat_id in occupied and slot_id in slot_masks:
+            occupied[seat_id] |= slot_masks[slot_id]
+
+    day = {seat_id: bin(bits).count('1') / MINUTES_PER_DAY for seat_id, bits in occupied.items()}
+    by_timeslot = {}
+    for slot_id, mask in slot_masks.items():
+        length = bin(mask).count('1') or 1
+        by_timeslot[slot_id] = {seat_id: bin(bits & mask).count('1') / length
+                                for seat_id, bits in occupied.items()}
+    return OccupancyHeatmap(day, by_timeslot)
@@ -2,27 +2,200 @@
 PDF receipt generation utilities
 """
 
+import glob
+import hashlib
+import json
+import logging
 import os
+import time
+import zipfile
 from datetime import datetime
-from fpdf import FPDF
-
-class CustomFPDF(FPDF):
-    """Custom FPDF class to include a footer"""
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
-        self.set_x(10) # Reset x position
-        self.cell(0, 10, f"Generated on: {datetime.now().strftime('%d/%m/%Y %H:%M')}", 0, 0, 'L')
-import qrcode
 from io import BytesIO
+from itertools import groupby
 from config.settings import (RECEIPTS_DIR, DEFAULT_CURRENCY, APP_NAME, 
-                           LIBRARY_NAME, LIBRARY_PHONE, LIBRARY_EMAIL, LIBRARY_ADDRESS, LIBRARY_WEBSITE)
+                           LIBRARY_NAME, LIBRARY_PHONE, LIBRARY_EMAIL, LIBRARY_ADDRESS, LIBRARY_WEBSITE,
+                           RECEIPT_BATCH_WORKERS, EXPORT_CHUNK_SIZE)
+
+logger = logging.getLogger(__name__)
+
+# Batches smaller than this are rendered in-process; starting worker processes costs more
+MIN_PARALLEL_RECEIPTS = 8
+
+# Hex digits of the version hash in cached receipt filenames
+RECEIPT_KEY_LENGTH = 16
+
+# Receipt lines on each index page of a receipt book
+RECEIPT_BOOK_INDEX_ROWS = 40
+
+_custom_fpdf_class = None
+
+
+def get_custom_fpdf_class():
+    """Build the CustomFPDF class on first use so fpdf is not imported at startup"""
+    global _custom_fpdf_class
+    if _custom_fpdf_class is None:
+        from fpdf import FPDF
+
+        class CustomFPDF(FPDF):
+            """Custom FPDF class to include a footer"""
+            def footer(self):
+                self.set_y(-15)
+                self.set_font('Arial', 'I', 8)
+                self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+                self.set_x(10) # Reset x position
+                self.cell(0, 10, f"Generated on: {datetime.now().strftime('%d/%m/%Y %H:%M')}", 0, 0, 'L')
+
+        _custom_fpdf_class = CustomFPDF
+    return _custom_fpdf_class
+
+
+def __getattr__(name):
+    # Keep "from utils.pdf_generator import CustomFPDF" working without an eager import
+    if name == 'CustomFPDF':
+        return get_custom_fpdf_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+LIBRARY_RULES_URL = "https://www.notion.so/Sangharsh-Library-rules-235ed2a2852c80fa980cf28ceeb9f5f1"
+WEBSITE_QR_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'sangharsh_library_qr.png')
+
+RECEIPT_TERMS = [
+    "1. This receipt is valid for the subscription period mentioned above.",
+    "2. No refund will be provided for early termination.",
+    "3. Library rules and regulations apply.",
+    "4. Lost receipt should be reported immediately.",
+    "5. Seat transfer is not allowed without prior approval."
+]
+
+# Static receipt images, prepared once per process: name -> PNG bytes (None if unavailable)
+_image_cache = {}
+
+
+def qr_code_png(data):
+    """Return PNG bytes of a QR code for data, encoded once per process"""
+    key = ('qr', data)
+    if key not in _image_cache:
+        try:
+            import qrcode
+            
+            qr = qrcode.QRCode(
+                version=1,
+                error_correction=qrcode.constants.ERROR_CORRECT_L,
+                box_size=10,
+                border=4,
+            )
+            qr.add_data(data)
+            qr.make(fit=True)
+            
+            buffer = BytesIO()
+            qr.make_image(fill_color="black", back_color="white").save(buffer)
+            _image_cache[key] = buffer.getvalue()
+        except Exception as e:
+            logger.error("Error generating QR code: %s", e)
+            _image_cache[key] = None
+    return _image_cache[key]
+
+
+def website_qr_png():
+    """Return the website QR image as grayscale PNG bytes, loaded once per process"""
+    key = ('file', WEBSITE_QR_PATH)
+    if key not in _image_cache:
+        _image_cache[key] = None
+        if os.path.exists(WEBSITE_QR_PATH):
+            try:
+                from PIL import Image
+                
+                # Grayscale is a third of the RGB data fpdf would otherwise compress on every receipt
+                buffer = BytesIO()
+                with Image.open(WEBSITE_QR_PATH) as image:
+                    image.convert('L').save(buffer, format='PNG')
+                _image_cache[key] = buffer.getvalue()
+            except Exception as e:
+                logger.error("Error loading website QR code: %s", e)
+    return _image_cache[key]
+
+
+def subscription_receipt_filename(subscription_data):
+    return f"receipt_{subscription_data['receipt_number']}.pdf"
+
+
+def cached_receipt_filename(receipt_number, *versions):
+    """receipt_<number>_<key>.pdf, where key hashes the receipt number and the row versions"""
+    key = hashlib.sha256('|'.join(str(part) for part in (receipt_number, *versions)).encode('utf-8'))
+    return f"receipt_{receipt_number}_{key.hexdigest()[:RECEIPT_KEY_LENGTH]}.pdf"
+
+
+def student_receipt_filename(student_data):
+    student_id = student_data.get('id', 'student')
+    student_name = student_data.get('name', 'student').replace(' ', '_')
+    return f"{student_id}_{student_name}_comprehensive_receipt.pdf"
 
 
 class PDFGenerator:
     """PDF generator for receipts and reports"""
     
+    # Receipt data for a JSON array of subscription ids, in one query
+    BATCH_SUBSCRIPTIONS_QUERY = '''
+        SELECT 
+            ss.id, ss.receipt_number, ss.start_date, ss.end_date, ss.amount_paid, ss.created_at,
+            s.name as student_name, s.father_name, s.mobile_number, s.aadhaar_number, s.locker_number,
+            ss.seat_id, t.name as timeslot_name, t.start_time, t.end_time
+        FROM student_subscriptions ss
+        JOIN students s ON ss.student_id = s.id
+        JOIN timeslots t ON ss.timeslot_id = t.id
+        WHERE ss.id IN (SELECT value FROM json_each(?))
+        ORDER BY ss.id
+    '''
+    
+    # Students and all their active subscriptions for a JSON array of student ids, in one query
+    BATCH_STUDENTS_QUERY = '''
+        SELECT 
+            s.id as student_id, s.name, s.father_name, s.mobile_number, s.email, s.aadhaar_number,
+            s.registration_date,
+            ss.id, ss.receipt_number, ss.start_date, ss.end_date, ss.amount_paid, ss.created_at,
+            ss.seat_id as seat_number,
+            t.name as timeslot_name, t.start_time, t.end_time, t.duration_months,
+            CASE 
+                WHEN DATE(ss.end_date) >= DATE('now') THEN 'Active' 
+                ELSE 'Expired' 
+            END as status
+        FROM students s
+        JOIN student_subscriptions ss ON ss.student_id = s.id AND ss.is_active = 1
+        JOIN timeslots t ON ss.timeslot_id = t.id
+        WHERE s.id IN (SELECT value FROM json_each(?))
+        ORDER BY s.id, ss.start_date DESC
+    '''
+    
+    # Row versions a cached subscription receipt is keyed on
+    RECEIPT_VERSION_QUERY = '''
+        SELECT ss.updated_at, s.updated_at as student_updated_at, t.updated_at as timeslot_updated_at
+        FROM student_subscriptions ss
+        JOIN students s ON ss.student_id = s.id
+        JOIN timeslots t ON ss.timeslot_id = t.id
+        WHERE ss.id = ?
+    '''
+    
+    # One chunk of the receipts issued in a date range, after a (created_at, id) position
+    RECEIPT_BOOK_QUERY = '''
+        SELECT 
+            ss.id, ss.receipt_number, ss.start_date, ss.end_date, ss.amount_paid, ss.created_at,
+            s.name as student_name, s.father_name, s.mobile_number, s.aadhaar_number, s.locker_number,
+            ss.seat_id, t.name as timeslot_name, t.start_time, t.end_time
+        FROM student_subscriptions ss
+        JOIN students s ON ss.student_id = s.id
+        JOIN timeslots t ON ss.timeslot_id = t.id
+        WHERE DATE(ss.created_at) BETWEEN ? AND ? AND (ss.created_at, ss.id) > (?, ?)
+        ORDER BY ss.created_at, ss.id
+        LIMIT ?
+    '''
+    
+    RECEIPT_BOOK_COUNT_QUERY = '''
+        SELECT COUNT(*) FROM student_subscriptions ss
+        JOIN students s ON ss.student_id = s.id
+        JOIN timeslots t ON ss.timeslot_id = t.id
+        WHERE DATE(ss.created_at) BETWEEN ? AND ?
+    '''
+    
     def __init__(self):
         self.pdf = None
     
@@ -32,31 +205,58 @@ class PDFGenerator:
             os.makedirs(RECEIPTS_DIR)
     
     def generate_qr_code(self, data, filename=None):
-        """Generate QR code for given data and save as temporary file"""
-        try:
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(data)
-            qr.make(fit=True)
-            
-            img = qr.make_image(fill_color="black", back_color="white")
-            
-            # Save to temporary file if filename not provided
-            if not filename:
-                temp_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'temp')
-                if not os.path.exists(temp_dir):
-                    os.makedirs(temp_dir)
-                filename = os.path.join(temp_dir, f"qr_temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-            
-            img.save(filename)
-            return filename
-        except Exception as e:
-            print(f"Error generating QR code: {e}")
+        """Generate QR code for given data: PNG in memory, or saved to filename when given"""
+        png = qr_code_png(data)
+        if png is None:
             return None
+        if not filename:
+            return BytesIO(png)
+        with open(filename, 'wb') as qr_file:
+            qr_file.write(png)
+        return filename
+    
+    def _draw_header(self, pdf, title):
+        """Draw the library letterhead and a document title"""
+        pdf.set_font('Arial', 'B', 18)
+        pdf.cell(0, 10, LIBRARY_NAME, 0, 1, 'C')
+        
+        pdf.set_font('Arial', '', 10)
+        pdf.cell(0, 6, LIBRARY_ADDRESS, 0, 1, 'C')
+        pdf.cell(0, 6, f"Phone: {LIBRARY_PHONE} | Email: {LIBRARY_EMAIL}", 0, 1, 'C')
+        
+        pdf.ln(5)
+        pdf.set_font('Arial', 'B', 14)
+        pdf.cell(0, 10, title, 0, 1, 'C')
+        pdf.ln(10)
+    
+    def _draw_quick_access(self, pdf):
+        """Draw the website and library rules QR codes and move below them"""
+        qr_y = pdf.get_y()
+        pdf.set_font('Arial', 'B', 10)
+        pdf.cell(0, 6, 'Quick Access:', 0, 1)
+        pdf.ln(2)
+        
+        website_qr = website_qr_png()
+        if website_qr:
+            try:
+                # Website QR code on the left
+                pdf.image(BytesIO(website_qr), x=30, y=pdf.get_y(), w=25, h=25)
+                pdf.set_xy(20, pdf.get_y() + 26)
+                pdf.set_font('Arial', '', 8)
+                pdf.cell(45, 3, 'Visit our website', 0, 0, 'C')
+                
+                # Library rules QR code on the right
+                rules_qr = self.generate_qr_code(LIBRARY_RULES_URL)
+                if rules_qr:
+                    pdf.image(rules_qr, x=140, y=qr_y + 8, w=25, h=25)
+                    pdf.set_xy(130, qr_y + 34)
+                    pdf.set_font('Arial', '', 8)
+                    pdf.cell(45, 3, 'Library rules & policies', 0, 0, 'C')
+            except Exception as e:
+                logger.error("Error adding QR codes: %s", e)
+        
+        # Move cursor below QR codes
+        pdf.set_y(qr_y + 45)
     
     def generate_subscription_receipt(self, subscription, student, seat, timeslot, filename=None):
         """Generate PDF receipt for subscription - Compatible interface"""
@@ -83,342 +283,559 @@ class PDFGenerator:
         except Exception as e:
             return False, f"Error generating receipt: {str(e)}"
     
-    def _generate_subscription_receipt_from_data(self, subscription_data, custom_filename=None):
-        """Generate PDF receipt for subscription from data dictionary"""
+    def get_subscription_receipt(self, subscription, student, seat, timeslot):
+        """Return (True, filepath) of a subscription's receipt, rendering it only if it changed
+        
+        Receipts are cached in RECEIPTS_DIR under cached_receipt_filename(), keyed on the
+        receipt number and the updated_at of the subscription, its student and its
+        timeslot, so an unchanged receipt is served from disk and an edit produces a new
+        file. The path is saved in receipt_path; read the file to attach or send the receipt.
+        """
         try:
-            # Create PDF
-            pdf = CustomFPDF()
-            pdf.add_page()
-            pdf.set_font('Arial', 'B', 16)
-            
-            # Header
-            pdf.set_font('Arial', 'B', 18)
-            pdf.cell(0, 10, LIBRARY_NAME, 0, 1, 'C')
-            
-            pdf.set_font('Arial', '', 10)
-            pdf.cell(0, 6, LIBRARY_ADDRESS, 0, 1, 'C')
-            pdf.cell(0, 6, f"Phone: {LIBRARY_PHONE} | Email: {LIBRARY_EMAIL}", 0, 1, 'C')
-            
-            pdf.ln(5)
-            pdf.set_font('Arial', 'B', 14)
-            pdf.cell(0, 10, 'Subscription Receipt', 0, 1, 'C')
-            pdf.ln(10)
-            
-            # Receipt details
-            pdf.set_font('Arial', '', 12)
-            
-            # Receipt number and date
-            pdf.cell(0, 8, f"Receipt No: {subscription_data['receipt_number']}", 0, 1)
-            pdf.cell(0, 8, f"Date: {datetime.now().strftime('%d/%m/%Y')}", 0, 1)
-            pdf.ln(5)
-            
-            # Student details
-            pdf.set_font('Arial', 'B', 12)
-            pdf.cell(0, 8, 'Student Details:', 0, 1)
-            pdf.set_font('Arial', '', 12)
-            
-            # Save Y position before student details
-            student_details_y = pdf.get_y()
-            
-            pdf.cell(0, 6, f"Name: {subscription_data['student_name']}", 0, 1)
-            pdf.cell(0, 6, f"Father's Name: {subscription_data['father_name']}", 0, 1)
-            pdf.cell(0, 6, f"Mobile: {subscription_data['mobile_number']}", 0, 1)
-            
-            if subscription_data.get('aadhaar_number'):
-                pdf.cell(0, 6, f"Aadhaar: {subscription_data['aadhaar_number']}", 0, 1)
-            
-            pdf.ln(3)  # Small gap after student details
-            
-            # Subscription details
-            pdf.set_font('Arial', 'B', 12)
-            pdf.cell(0, 6, 'Subscription Details:', 0, 1)
-            pdf.set_font('Arial', '', 12)
-            
-            pdf.cell(0, 6, f"Seat Number: {subscription_data['seat_id']}", 0, 1)
-            pdf.cell(0, 6, f"Timeslot: {subscription_data['timeslot_name']}", 0, 1)
-            pdf.cell(0, 6, f"Time: {subscription_data['timeslot_time']}", 0, 1)
-            if 'new_start' in subscription_data: # It's a renewal
-                pdf.cell(0, 6, f"Previous Period: {subscription_data['previous_start']} to {subscription_data['previous_end']}", 0, 1)
-                pdf.cell(0, 6, f"New Period: {subscription_data['new_start']} to {subscription_data['new_end']}", 0, 1)
-                pdf.cell(0, 6, f"Renewal Amount: {subscription_data['renewal_amount']}", 0, 1)
-            else: # It's a new subscription
-                pdf.cell(0, 6, f"Duration: {subscription_data['start_date']} to {subscription_data['end_date']}", 0, 1)
-                pdf.cell(0, 6, f"Amount Paid: {subscription_data['amount_paid']}", 0, 1)
-            if subscription_data.get('locker_number'):
-                pdf.cell(0, 6, f"Locker Number: {subscription_data['locker_number']}", 0, 1)
-            
-            pdf.ln(8)
-            
-            # Payment details
-            pdf.set_font('Arial', 'B', 12)
-            pdf.cell(0, 8, 'Payment Details:', 0, 1)
-            pdf.set_font('Arial', '', 12)
-            
-            if 'renewal_amount' in subscription_data:
-                pdf.cell(0, 8, f"Renewal Amount: {DEFAULT_CURRENCY} {subscription_data['renewal_amount']}", 0, 1)
+            from config.database import DatabaseManager
+            db_manager = DatabaseManager()
+            rows = db_manager.execute_query(self.RECEIPT_VERSION_QUERY, (subscription.id,))
+            if not rows:
+                return False, "Subscription not found"
+            
+            filename = cached_receipt_filename(
+                subscription.receipt_number, rows[0]['updated_at'], rows[0]['student_updated_at'],
+                rows[0]['timeslot_updated_at']
+            )
+            filepath = os.path.join(RECEIPTS_DIR, filename)
+            if os.path.exists(filepath):
+                logger.debug("Receipt %s served from cache", subscription.receipt_number)
             else:
-                pdf.cell(0, 8, f"Amount Paid: {DEFAULT_CURRENCY} {subscription_data['amount_paid']}", 0, 1)
-            pdf.cell(0, 8, f"Payment Date: {subscription_data['payment_date']}", 0, 1)
-            pdf.ln(10)
-            
-            # Terms and conditions
-            pdf.set_font('Arial', 'B', 10)
-            pdf.cell(0, 6, 'Terms and Conditions:', 0, 1)
-            pdf.set_font('Arial', '', 10)
-            
-            terms = [
-                "1. This receipt is valid for the subscription period mentioned above.",
-                "2. No refund will be provided for early termination.",
-                "3. Library rules and regulations apply.",
-                "4. Lost receipt should be reported immediately.",
-                "5. Seat transfer is not allowed without prior approval."
-            ]
-            
-            for term in terms:
-                pdf.cell(0, 5, term, 0, 1)
-            
-            pdf.ln(10)
-            
-            # Add QR codes at the bottom
-            qr_y = pdf.get_y()
-            pdf.set_font('Arial', 'B', 10)
-            pdf.cell(0, 6, 'Quick Access:', 0, 1)
-            pdf.ln(2)
+                success, result = self.generate_subscription_receipt(subscription, student, seat, timeslot, filename)
+                if not success:
+                    return success, result
+                self._remove_stale_receipts(subscription.receipt_number, filepath)
+            
+            if subscription.receipt_path != filepath:
+                # receipt_path is excluded from change tracking, so this keeps the cache key
+                db_manager.execute_query(
+                    "UPDATE student_subscriptions SET receipt_path = ? WHERE id = ?", (filepath, subscription.id)
+                )
+                subscription.receipt_path = filepath
+            return True, filepath
             
-            # Website QR code
-            qr_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'sangharsh_library_qr.png')
-            if os.path.exists(qr_path):
+        except Exception as e:
+            return False, f"Error generating receipt: {str(e)}"
+    
+    def _remove_stale_receipts(self, receipt_number, current_path):
+        """Delete cached receipts for earlier versions of a subscription"""
+        pattern = glob.escape(f"receipt_{receipt_number}_") + '?' * RECEIPT_KEY_LENGTH + '.pdf'
+        for path in glob.glob(os.path.join(glob.escape(RECEIPTS_DIR), pattern)):
+            if os.path.abspath(path) != os.path.abspath(current_path):
                 try:
-                    # Position website QR code on the left
-                    pdf.image(qr_path, x=30, y=pdf.get_y(), w=25, h=25)
-                    
-                    # Add text below website QR code
-                    pdf.set_xy(20, pdf.get_y() + 26)
-                    pdf.set_font('Arial', '', 8)
-                    pdf.cell(45, 3, 'Visit our website', 0, 0, 'C')
-                    
-                    # Generate and add library rules QR code on the right
-                    library_rules_url = "https://www.notion.so/Sangharsh-Library-rules-235ed2a2852c80fa980cf28ceeb9f5f1"
-                    rules_qr_path = self.generate_qr_code(library_rules_url)
-                    if rules_qr_path:
-                        # Position library rules QR code on the right
-                        pdf.image(rules_qr_path, x=140, y=qr_y + 8, w=25, h=25)
-                        
-                        # Add text below library rules QR code
-                        pdf.set_xy(130, qr_y + 34)
-                        pdf.set_font('Arial', '', 8)
-                        pdf.cell(45, 3, 'Library rules & policies', 0, 0, 'C')
-                        
-                        # Clean up temporary QR code file
-                        try:
-                            os.remove(rules_qr_path)
-                        except:
-                            pass
-                            
-                except Exception as e:
-                    print(f"Error adding QR codes: {e}")
-            
-            # Move cursor below QR codes
-            pdf.set_y(qr_y + 45)
-            
-            # Save PDF
-            filename = custom_filename or f"receipt_{subscription_data['receipt_number']}.pdf"
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning("Could not remove stale receipt %s: %s", path, e)
+    
+    def _write_pdf(self, filepath, pdf_bytes):
+        """Write a PDF atomically, so a cached receipt is never a partial file"""
+        self.ensure_receipts_directory()
+        partial_path = filepath + '.part'
+        with open(partial_path, 'wb') as pdf_file:
+            pdf_file.write(pdf_bytes)
+        os.replace(partial_path, filepath)
+    
+    def _generate_subscription_receipt_from_data(self, subscription_data, custom_filename=None):
+        """Generate PDF receipt for subscription from data dictionary"""
+        try:
+            filename = custom_filename or subscription_receipt_filename(subscription_data)
             filepath = os.path.join(RECEIPTS_DIR, filename)
-            pdf.output(filepath)
+            self._write_pdf(filepath, self.render_subscription_receipt(subscription_data))
             
             return True, filepath
             
         except Exception as e:
             return False, f"Error generating comprehensive receipt: {str(e)}"
+    
+    def render_subscription_receipt(self, subscription_data):
+        """Render a subscription receipt and return the PDF as bytes"""
+        pdf = get_custom_fpdf_class()()
+        pdf.add_page()
+        self._draw_subscription_receipt(pdf, subscription_data)
+        return bytes(pdf.output())
+    
+    def _draw_subscription_receipt(self, pdf, subscription_data):
+        """Draw a subscription receipt starting on the current page of pdf"""
+        self._draw_header(pdf, 'Subscription Receipt')
+        
+        # Receipt details
+        pdf.set_font('Arial', '', 12)
+        
+        # Receipt number and date
+        pdf.cell(0, 8, f"Receipt No: {subscription_data['receipt_number']}", 0, 1)
+        pdf.cell(0, 8, f"Date: {datetime.now().strftime('%d/%m/%Y')}", 0, 1)
+        pdf.ln(5)
+        
+        # Student details
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(0, 8, 'Student Details:', 0, 1)
+        pdf.set_font('Arial', '', 12)
+        
+        # Save Y position before student details
+        student_details_y = pdf.get_y()
+        
+        pdf.cell(0, 6, f"Name: {subscription_data['student_name']}", 0, 1)
+        pdf.cell(0, 6, f"Father's Name: {subscription_data['father_name']}", 0, 1)
+        pdf.cell(0, 6, f"Mobile: {subscription_data['mobile_number']}", 0, 1)
+        
+        if subscription_data.get('aadhaar_number'):
+            pdf.cell(0, 6, f"Aadhaar: {subscription_data['aadhaar_number']}", 0, 1)
+        
+        pdf.ln(3)  # Small gap after student details
+        
+        # Subscription details
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(0, 6, 'Subscription Details:', 0, 1)
+        pdf.set_font('Arial', '', 12)
+        
+        pdf.cell(0, 6, f"Seat Number: {subscription_data['seat_id']}", 0, 1)
+        pdf.cell(0, 6, f"Timeslot: {subscription_data['timeslot_name']}", 0, 1)
+        pdf.cell(0, 6, f"Time: {subscription_data['timeslot_time']}", 0, 1)
+        if 'new_start' in subscription_data: # It's a renewal
+            pdf.cell(0, 6, f"Previous Period: {subscription_data['previous_start']} to {subscription_data['previous_end']}", 0, 1)
+            pdf.cell(0, 6, f"New Period: {subscription_data['new_start']} to {subscription_data['new_end']}", 0, 1)
+            pdf.cell(0, 6, f"Renewal Amount: {subscription_data['renewal_amount']}", 0, 1)
+        else: # It's a new subscription
+            pdf.cell(0, 6, f"Duration: {subscription_data['start_date']} to {subscription_data['end_date']}", 0, 1)
+            pdf.cell(0, 6, f"Amount Paid: {subscription_data['amount_paid']}", 0, 1)
+        if subscription_data.get('locker_number'):
+            pdf.cell(0, 6, f"Locker Number: {subscription_data['locker_number']}", 0, 1)
+        
+        pdf.ln(8)
+        
+        # Payment details
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(0, 8, 'Payment Details:', 0, 1)
+        pdf.set_font('Arial', '', 12)
+        
+        if 'renewal_amount' in subscription_data:
+            pdf.cell(0, 8, f"Renewal Amount: {DEFAULT_CURRENCY} {subscription_data['renewal_amount']}", 0, 1)
+        else:
+            pdf.cell(0, 8, f"Amount Paid: {DEFAULT_CURRENCY} {subscription_data['amount_paid']}", 0, 1)
+        pdf.cell(0, 8, f"Payment Date: {subscription_data['payment_date']}", 0, 1)
+        pdf.ln(10)
+        
+        # Terms and conditions
+        pdf.set_font('Arial', 'B', 10)
+        pdf.cell(0, 6, 'Terms and Conditions:', 0, 1)
+        pdf.set_font('Arial', '', 10)
+        
+        for term in RECEIPT_TERMS:
+            pdf.cell(0, 5, term, 0, 1)
+        
+        pdf.ln(10)
+        
+        # Add QR codes at the bottom
+        self._draw_quick_access(pdf)
 
 
     def generate_student_comprehensive_receipt(self, student_data, subscriptions_data):
         """Generate a comprehensive PDF receipt for a student, including all their subscriptions."""
         try:
-            pdf = CustomFPDF()
-            pdf.add_page()
+            filepath = os.path.join(RECEIPTS_DIR, student_receipt_filename(student_data))
 
-            # Header
-            pdf.set_font('Arial', 'B', 18)
-            pdf.cell(0, 10, LIBRARY_NAME, border=0, ln=1, align='C')
-            pdf.set_font('Arial', '', 10)
-            pdf.cell(0, 6, LIBRARY_ADDRESS, border=0, ln=1, align='C')
-            pdf.cell(0, 6, f"Phone: {LIBRARY_PHONE} | Email: {LIBRARY_EMAIL}", border=0, ln=1, align='C')
-            pdf.ln(5)
+            self._write_pdf(filepath, self.render_student_receipt(student_data, subscriptions_data))
+            return True, filepath
+        except Exception as e:
+            logger.error("Error generating comprehensive receipt: %s", e)
+            return False, str(e)
 
-            # Title
-            pdf.set_font('Arial', 'B', 14)
-            pdf.cell(0, 10, 'Comprehensive Student Receipt', border=0, ln=1, align='C')
-            pdf.ln(10)
-
-            # Student Details
-            pdf.set_font('Arial', 'B', 12)
-            pdf.cell(0, 8, 'Student Details:', border=0, ln=1, align='L')
-            pdf.set_font('Arial', '', 12)
-            pdf.cell(0, 6, f"Name: {student_data.get('name', 'N/A')}", border=0, ln=1, align='L')
-            pdf.cell(0, 6, f"Father's Name: {student_data.get('father_name', 'N/A')}", border=0, ln=1, align='L')
-            pdf.cell(0, 6, f"Mobile: {student_data.get('phone', 'N/A')}", border=0, ln=1, align='L')
-            reg_date = student_data.get('registration_date', 'N/A')
-            if hasattr(reg_date, 'strftime'):
-                reg_date = reg_date.strftime('%d/%m/%Y')
-            pdf.cell(0, 6, f"Registration Date: {reg_date}", border=0, ln=1, align='L')
-            pdf.ln(8)
-
-            # Subscriptions Table Header
-            pdf.set_font('Arial', 'B', 10)
-            pdf.cell(15, 10, 'Stu ID', border=1, ln=0, align='C')
-            pdf.cell(25, 10, 'Start Date', border=1, ln=0, align='C')
-            pdf.cell(25, 10, 'End Date', border=1, ln=0, align='C')
-            pdf.cell(20, 10, 'Amount', border=1, ln=0, align='C')
-            pdf.cell(20, 10, 'Duration', border=1, ln=0, align='C')
-            pdf.cell(20, 10, 'Seat No', border=1, ln=0, align='C')
-            pdf.cell(35, 10, 'Timeslot', border=1, ln=0, align='C')
-            pdf.cell(25, 10, 'Status', border=1, ln=1, align='C')
-
-            # Subscriptions Table Rows
-            pdf.set_font('Arial', '', 9)
-            for sub in subscriptions_data:
-                start_date = sub.get('start_date', 'N/A')
-                if isinstance(start_date, datetime):
-                    start_date = start_date.strftime('%d/%m/%Y')
-                end_date = sub.get('end_date', 'N/A')
-                if isinstance(end_date, datetime):
-                    end_date = end_date.strftime('%d/%m/%Y')
-                
-                # Use duration_months from subscription data
-                duration_months = sub.get('duration_months', 'N/A')
-                if duration_months == 'N/A' or duration_months is None:
-                    # Fallback to calculating from dates if duration_months is not available
-                    try:
-                        # Parse dates if they are strings, otherwise use as-is
-                        if isinstance(start_date, str) and start_date != 'N/A':
-                            start_dt = datetime.strptime(start_date, '%d/%m/%Y')
-                        elif hasattr(start_date, 'strftime'):
-                            # Already a datetime object
-                            start_dt = start_date
-                        else:
-                            # Fallback to today if we can't parse
-                            start_dt = datetime.now()
-                            
-                        if isinstance(end_date, str) and end_date != 'N/A':
-                            end_dt = datetime.strptime(end_date, '%d/%m/%Y')
-                        elif hasattr(end_date, 'strftime'):
-                            # Already a datetime object
-                            end_dt = end_date
-                        else:
-                            # Fallback to today if we can't parse
-                            end_dt = datetime.now()
-                            
-                        duration_days = (end_dt - start_dt).days + 1
-                        duration_months = round(duration_days / 30.0, 1)
-                    except Exception as e:
-                        print(f"Duration calculation error: {e}")
-                        duration_months = 'N/A'
-                
-                # Use student ID instead of subscription ID
-                student_id = student_data.get('id', 'N/A')
-                pdf.cell(15, 10, str(student_id), border=1, ln=0, align='C')
-                pdf.cell(25, 10, str(start_date), border=1, ln=0, align='C')
-                pdf.cell(25, 10, str(end_date), border=1, ln=0, align='C')
-                pdf.cell(20, 10, f"{DEFAULT_CURRENCY} {sub.get('amount_paid', 'N/A')}", border=1, ln=0, align='C')
-                pdf.cell(20, 10, f"{duration_months} months", border=1, ln=0, align='C')
-                pdf.cell(20, 10, str(sub.get('seat_number', 'N/A')), border=1, ln=0, align='C')
-                pdf.cell(35, 10, str(sub.get('timeslot', 'N/A')), border=1, ln=0, align='C')
-                pdf.cell(25, 10, str(sub.get('status', 'N/A')), border=1, ln=1, align='C')
-
-            pdf.ln(10)
-
-            # Summary Section
-            pdf.set_font('Arial', 'B', 12)
-            pdf.cell(0, 8, 'Subscription Summary:', border=0, ln=1, align='L')
-            pdf.ln(2)
-            
-            # Calculate summary data
-            total_subscriptions = len(subscriptions_data)
-            active_subscriptions = len([sub for sub in subscriptions_data if sub.get('status', '').lower() == 'active'])
-            expired_subscriptions = len([sub for sub in subscriptions_data if sub.get('status', '').lower() == 'expired'])
-            
-            # Calculate total amount paid
-            total_amount_paid = 0
-            for sub in subscriptions_data:
-                amount = sub.get('amount_paid', 0)
-                if isinstance(amount, (int, float)):
-                    total_amount_paid += amount
-                elif isinstance(amount, str) and amount.replace('.', '', 1).isdigit():
-                    total_amount_paid += float(amount)
-            
-            # Display summary data
-            pdf.set_font('Arial', '', 11)
-            pdf.cell(0, 6, f"Total Subscriptions: {total_subscriptions}", border=0, ln=1, align='L')
-            pdf.cell(0, 6, f"Active Subscriptions: {active_subscriptions}", border=0, ln=1, align='L')
-            pdf.cell(0, 6, f"Expired Subscriptions: {expired_subscriptions}", border=0, ln=1, align='L')
-            pdf.cell(0, 6, f"Total Amount Paid: {DEFAULT_CURRENCY} {total_amount_paid:.2f}", border=0, ln=1, align='L')
-            pdf.ln(8)
-
-            # Terms and conditions
-            pdf.set_font('Arial', 'B', 10)
-            pdf.cell(0, 6, 'Terms and Conditions:', border=0, ln=1, align='L')
-            pdf.set_font('Arial', '', 10)
-            terms = [
-                "1. This receipt is valid for the subscription period mentioned above.",
-                "2. No refund will be provided for early termination.",
-                "3. Library rules and regulations apply.",
-                "4. Lost receipt should be reported immediately.",
-                "5. Seat transfer is not allowed without prior approval."
-            ]
-            for term in terms:
-                pdf.multi_cell(0, 5, term, border=0, align='L', ln=1)
-
-            # Add QR codes at the bottom
-            qr_y = pdf.get_y()
-            if qr_y > 220: # Check if there is enough space for QR codes
-                pdf.add_page()
-                qr_y = pdf.get_y()
+    def render_student_receipt(self, student_data, subscriptions_data):
+        """Render a comprehensive student receipt and return the PDF as bytes"""
+        pdf = get_custom_fpdf_class()()
+        self._draw_student_receipt(pdf, student_data, subscriptions_data)
+        return bytes(pdf.output())
 
-            pdf.set_font('Arial', 'B', 10)
-            pdf.cell(0, 6, 'Quick Access:', border=0, ln=1, align='L')
-            pdf.ln(2)
+    def _draw_student_receipt(self, pdf, student_data, subscriptions_data):
+        """Draw a comprehensive student receipt starting on a new page of pdf"""
+        pdf.add_page()
+        self._draw_header(pdf, 'Comprehensive Student Receipt')
 
-            # Website QR code
-            qr_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'sangharsh_library_qr.png')
-            if os.path.exists(qr_path):
+        # Student Details
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(0, 8, 'Student Details:', border=0, ln=1, align='L')
+        pdf.set_font('Arial', '', 12)
+        pdf.cell(0, 6, f"Name: {student_data.get('name', 'N/A')}", border=0, ln=1, align='L')
+        pdf.cell(0, 6, f"Father's Name: {student_data.get('father_name', 'N/A')}", border=0, ln=1, align='L')
+        pdf.cell(0, 6, f"Mobile: {student_data.get('phone', 'N/A')}", border=0, ln=1, align='L')
+        reg_date = student_data.get('registration_date', 'N/A')
+        if hasattr(reg_date, 'strftime'):
+            reg_date = reg_date.strftime('%d/%m/%Y')
+        pdf.cell(0, 6, f"Registration Date: {reg_date}", border=0, ln=1, align='L')
+        pdf.ln(8)
+
+        # Subscriptions Table Header
+        pdf.set_font('Arial', 'B', 10)
+        pdf.cell(15, 10, 'Stu ID', border=1, ln=0, align='C')
+        pdf.cell(25, 10, 'Start Date', border=1, ln=0, align='C')
+        pdf.cell(25, 10, 'End Date', border=1, ln=0, align='C')
+        pdf.cell(20, 10, 'Amount', border=1, ln=0, align='C')
+        pdf.cell(20, 10, 'Duration', border=1, ln=0, align='C')
+        pdf.cell(20, 10, 'Seat No', border=1, ln=0, align='C')
+        pdf.cell(35, 10, 'Timeslot', border=1, ln=0, align='C')
+        pdf.cell(25, 10, 'Status', border=1, ln=1, align='C')
+
+        # Subscriptions Table Rows
+        pdf.set_font('Arial', '', 9)
+        for sub in subscriptions_data:
+            start_date = sub.get('start_date', 'N/A')
+            if isinstance(start_date, datetime):
+                start_date = start_date.strftime('%d/%m/%Y')
+            end_date = sub.get('end_date', 'N/A')
+            if isinstance(end_date, datetime):
+                end_date = end_date.strftime('%d/%m/%Y')
+            
+            # Use duration_months from subscription data
+            duration_months = sub.get('duration_months', 'N/A')
+            if duration_months == 'N/A' or duration_months is None:
+                # Fallback to calculating from dates if duration_months is not available
                 try:
-                    pdf.image(qr_path, x=30, y=pdf.get_y(), w=25, h=25)
-                    pdf.set_xy(20, pdf.get_y() + 26)
-                    pdf.set_font('Arial', '', 8)
-                    pdf.cell(45, 3, 'Visit our website', border=0, ln=0, align='C')
-
-                    # Library rules QR code
-                    library_rules_url = "https://www.notion.so/Sangharsh-Library-rules-235ed2a2852c80fa980cf28ceeb9f5f1"
-                    rules_qr_path = self.generate_qr_code(library_rules_url)
-                    if rules_qr_path:
-                        pdf.image(rules_qr_path, x=140, y=qr_y + 8, w=25, h=25)
-                        pdf.set_xy(130, qr_y + 34)
-                        pdf.set_font('Arial', '', 8)
-                        pdf.cell(45, 3, 'Library rules & policies', border=0, ln=0, align='C')
-                        try:
-                            os.remove(rules_qr_path)
-                        except: pass
+                    # Parse dates if they are strings, otherwise use as-is
+                    if isinstance(start_date, str) and start_date != 'N/A':
+                        start_dt = datetime.strptime(start_date, '%d/%m/%Y')
+                    elif hasattr(start_date, 'strftime'):
+                        # Already a datetime object
+                        start_dt = start_date
+                    else:
+                        # Fallback to today if we can't parse
+                        start_dt = datetime.now()
+                        
+                    if isinstance(end_date, str) and end_date != 'N/A':
+                        end_dt = datetime.strptime(end_date, '%d/%m/%Y')
+                    elif hasattr(end_date, 'strftime'):
+                        # Already a datetime object
+                        end_dt = end_date
+                    else:
+                        # Fallback to today if we can't parse
+                        end_dt = datetime.now()
+                        
+                    duration_days = (end_dt - start_dt).days + 1
+                    duration_months = round(duration_days / 30.0, 1)
                 except Exception as e:
-                    print(f"Error adding QR codes: {e}")
+                    logger.warning("Duration calculation error: %s", e)
+                    duration_months = 'N/A'
+            
+            # Use student ID instead of subscription ID
+            student_id = student_data.get('id', 'N/A')
+            pdf.cell(15, 10, str(student_id), border=1, ln=0, align='C')
+            pdf.cell(25, 10, str(start_date), border=1, ln=0, align='C')
+            pdf.cell(25, 10, str(end_date), border=1, ln=0, align='C')
+            pdf.cell(20, 10, f"{DEFAULT_CURRENCY} {sub.get('amount_paid', 'N/A')}", border=1, ln=0, align='C')
+            pdf.cell(20, 10, f"{duration_months} months", border=1, ln=0, align='C')
+            pdf.cell(20, 10, str(sub.get('seat_number', 'N/A')), border=1, ln=0, align='C')
+            pdf.cell(35, 10, str(sub.get('timeslot', 'N/A')), border=1, ln=0, align='C')
+            pdf.cell(25, 10, str(sub.get('status', 'N/A')), border=1, ln=1, align='C')
 
-            # Move cursor below QR codes
-            pdf.set_y(qr_y + 45)
+        pdf.ln(10)
 
-            # Generate filename with student ID and name
-            student_id = student_data.get('id', 'student')
-            student_name = student_data.get('name', 'student').replace(' ', '_')
-            filename = f"{student_id}_{student_name}_comprehensive_receipt.pdf"
-            filepath = os.path.join(RECEIPTS_DIR, filename)
+        # Summary Section
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(0, 8, 'Subscription Summary:', border=0, ln=1, align='L')
+        pdf.ln(2)
+        
+        # Calculate summary data
+        total_subscriptions = len(subscriptions_data)
+        active_subscriptions = len([sub for sub in subscriptions_data if sub.get('status', '').lower() == 'active'])
+        expired_subscriptions = len([sub for sub in subscriptions_data if sub.get('status', '').lower() == 'expired'])
+        
+        # Calculate total amount paid
+        total_amount_paid = 0
+        for sub in subscriptions_data:
+            amount = sub.get('amount_paid', 0)
+            if isinstance(amount, (int, float)):
+                total_amount_paid += amount
+            elif isinstance(amount, str) and amount.replace('.', '', 1).isdigit():
+                total_amount_paid += float(amount)
+        
+        # Display summary data
+        pdf.set_font('Arial', '', 11)
+        pdf.cell(0, 6, f"Total Subscriptions: {total_subscriptions}", border=0, ln=1, align='L')
+        pdf.cell(0, 6, f"Active Subscriptions: {active_subscriptions}", border=0, ln=1, align='L')
+        pdf.cell(0, 6, f"Expired Subscriptions: {expired_subscriptions}", border=0, ln=1, align='L')
+        pdf.cell(0, 6, f"Total Amount Paid: {DEFAULT_CURRENCY} {total_amount_paid:.2f}", border=0, ln=1, align='L')
+        pdf.ln(8)
 
-            # Ensure directory exists
-            self.ensure_receipts_directory()
-            pdf.output(filepath, 'F')
-            return True, filepath
+        # Terms and conditions
+        pdf.set_font('Arial', 'B', 10)
+        pdf.cell(0, 6, 'Terms and Conditions:', border=0, ln=1, align='L')
+        pdf.set_font('Arial', '', 10)
+        for term in RECEIPT_TERMS:
+            pdf.multi_cell(0, 5, term, border=0, align='L', ln=1)
+
+        # Add QR codes at the bottom
+        if pdf.get_y() > 220: # Check if there is enough space for QR codes
+            pdf.add_page()
+        self._draw_quick_access(pdf)
+
+    def _subscription_data(self, row):
+        """Receipt data for a BATCH_SUBSCRIPTIONS_QUERY or RECEIPT_BOOK_QUERY row"""
+        return {
+            'receipt_number': row['receipt_number'],
+            'student_name': row['student_name'],
+            'father_name': row['father_name'],
+            'mobile_number': row['mobile_number'],
+            'aadhaar_number': row['aadhaar_number'],
+            'seat_id': row['seat_id'],
+            'timeslot_name': row['timeslot_name'],
+            'timeslot_time': f"{row['start_time']} - {row['end_time']}",
+            'start_date': row['start_date'],
+            'end_date': row['end_date'],
+            'locker_number': row['locker_number'],
+            'amount_paid': row['amount_paid'],
+            'payment_date': (row['created_at'] or '').split()[0] or datetime.now().strftime('%Y-%m-%d')
+        }
+    
+    def generate_receipt_book(self, start_date, end_date, filepath=None):
+        """Write every receipt issued from start_date to end_date into one PDF after an index
+        
+        Receipts are drawn chunk by chunk as they are read, from the same data that
+        _generate_subscription_receipt_from_data renders, so neither the receipt data nor
+        per-receipt PDFs are kept; the QR images are embedded once and shared by all pages.
+        The index lists each receipt with a link to its page.
+        Returns (True, {path, count, pages, total, seconds}).
+        """
+        try:
+            from config.database import DatabaseManager
+            started = time.perf_counter()
+            start_date, end_date = str(start_date), str(end_date)
+            filepath = filepath or os.path.join(RECEIPTS_DIR, f"receipt_book_{start_date}_{end_date}.pdf")
+            db_manager = DatabaseManager()
+            
+            count = db_manager.execute_query(self.RECEIPT_BOOK_COUNT_QUERY, (start_date, end_date))[0][0]
+            if not count:
+                return False, f"No receipts were issued between {start_date} and {end_date}"
+            
+            pdf = get_custom_fpdf_class()()
+            pdf.add_page()
+            # The index is drawn last, once page numbers are known; its pages are reserved now
+            entries = []  # (receipt number, payment date, student, amount, page, link)
+            index_pages = -(-(count + 1) // RECEIPT_BOOK_INDEX_ROWS)  # +1 for the totals line
+            pdf.insert_toc_placeholder(
+                lambda pdf, outline: self._draw_receipt_book_index(pdf, entries, start_date, end_date, index_pages),
+                pages=index_pages, reset_page_indices=False
+            )
+            
+            # Fetched in chunks so no read lock is held while pages are drawn; stopping at
+            # count keeps the book within the reserved index if receipts are added meanwhile
+            position = ('', 0)
+            while len(entries) < count:
+                rows = db_manager.execute_query(
+                    self.RECEIPT_BOOK_QUERY,
+                    (start_date, end_date, *position, min(EXPORT_CHUNK_SIZE, count - len(entries)))
+                )
+                if not rows:
+                    break
+                for row in rows:
+                    if entries:
+                        pdf.add_page()
+                    subscription_data = self._subscription_data(row)
+                    entries.append((
+                        subscription_data['receipt_number'], subscription_data['payment_date'],
+                        subscription_data['student_name'], subscription_data['amount_paid'] or 0,
+                        pdf.page_no(), pdf.add_link(page=pdf.page_no())
+                    ))
+                    self._draw_subscription_receipt(pdf, subscription_data)
+                position = (rows[-1]['created_at'], rows[-1]['id'])
+            
+            os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+            partial_path = filepath + '.part'
+            pdf.output(partial_path)
+            os.replace(partial_path, filepath)
+            
+            seconds = time.perf_counter() - started
+            logger.info("Receipt book %s to %s: %d receipts, %d pages in %.1f s",
+                        start_date, end_date, len(entries), pdf.page_no(), seconds)
+            return True, {
+                'path': filepath,
+                'count': len(entries),
+                'pages': pdf.page_no(),
+                'total': sum(entry[3] for entry in entries),
+                'seconds': seconds,
+            }
+        
         except Exception as e:
-            # Using a logger is better, but for now, print to console
-            print(f"Error generating comprehensive receipt: {e}")
-            return False, str(e)
+            logger.exception("Receipt book %s to %s failed", start_date, end_date)
+            return False, f"Error generating receipt book: {str(e)}"
+    
+    def _draw_receipt_book_index(self, pdf, entries, start_date, end_date, index_pages):
+        """Draw the receipt book index on its reserved pages"""
+        widths = (40, 28, 82, 25, 15)
+        last_page = pdf.page_no() + index_pages - 1
+        auto_page_break = pdf.auto_page_break
+        pdf.set_auto_page_break(False)
+        
+        lines = entries + [None]  # None marks the totals line
+        for start in range(0, len(lines), RECEIPT_BOOK_INDEX_ROWS):
+            if start:
+                pdf.add_page()
+            pdf.set_font('Arial', 'B', 14)
+            pdf.cell(0, 8, f"{LIBRARY_NAME} - Receipt Book", 0, 1, 'C')
+            pdf.set_font('Arial', '', 10)
+            pdf.cell(0, 6, f"Receipts issued from {start_date} to {end_date}", 0, 1, 'C')
+            pdf.ln(3)
+            
+            pdf.set_font('Arial', 'B', 9)
+            for width, title in zip(widths, ('Receipt No', 'Date', 'Student', 'Amount', 'Page')):
+                pdf.cell(width, 6, title, border=1, ln=0, align='C')
+            pdf.ln()
+            
+            pdf.set_font('Arial', '', 9)
+            for line in lines[start:start + RECEIPT_BOOK_INDEX_ROWS]:
+                if line is None:
+                    pdf.set_font('Arial', 'B', 9)
+                    pdf.cell(sum(widths[:3]), 6, f"Total: {len(entries)} receipts", border=1, ln=0)
+                    pdf.cell(widths[3], 6, f"{sum(entry[3] for entry in entries):.2f}", border=1, ln=0, align='R')
+                    pdf.cell(widths[4], 6, '', border=1, ln=1)
+                    continue
+                receipt_number, payment_date, student_name, amount, page, link = line
+                pdf.cell(widths[0], 5.5, str(receipt_number), border=1, ln=0, link=link)
+                pdf.cell(widths[1], 5.5, str(payment_date), border=1, ln=0, align='C')
+                pdf.cell(widths[2], 5.5, str(student_name)[:40], border=1, ln=0)
+                pdf.cell(widths[3], 5.5, f"{amount:.2f}", border=1, ln=0, align='R')
+                pdf.cell(widths[4], 5.5, str(page), border=1, ln=1, align='C', link=link)
+        
+        # Fewer receipts than counted (some were deleted meanwhile) leave index pages blank
+        while pdf.page_no() < last_page:
+            pdf.add_page()
+        pdf.set_auto_page_break(auto_page_break, pdf.b_margin)
+    
+    def _batch_items(self, subscription_ids, student_ids):
+        """Fetch receipt data for a batch: [(kind, filename, render args), ...]"""
+        from config.database import DatabaseManager
+        db_manager = DatabaseManager()
+        items = []
+        
+        if subscription_ids:
+            rows = db_manager.execute_query(self.BATCH_SUBSCRIPTIONS_QUERY, (json.dumps(list(subscription_ids)),))
+            for row in rows:
+                subscription_data = self._subscription_data(row)
+                items.append(('subscription', subscription_receipt_filename(subscription_data), (subscription_data,)))
+        
+        if student_ids:
+            rows = db_manager.execute_query(self.BATCH_STUDENTS_QUERY, (json.dumps(list(student_ids)),))
+            for _, student_rows in groupby(rows, key=lambda row: row['student_id']):
+                student_rows = list(student_rows)
+                first = student_rows[0]
+                student_data = {
+                    'id': first['student_id'],
+                    'name': first['name'],
+                    'father_name': first['father_name'],
+                    'phone': first['mobile_number'],
+                    'mobile_number': first['mobile_number'],
+                    'email': first['email'] or '',
+                    'aadhaar_number': first['aadhaar_number'] or '',
+                    'registration_date': first['registration_date']
+                }
+                subscriptions_data = [{
+                    'id': row['id'],
+                    'receipt_number': row['receipt_number'],
+                    'start_date': row['start_date'],
+                    'end_date': row['end_date'],
+                    'amount_paid': row['amount_paid'],
+                    'created_at': row['created_at'],
+                    'seat_number': row['seat_number'],
+                    'timeslot_name': row['timeslot_name'],
+                    'start_time': row['start_time'],
+                    'end_time': row['end_time'],
+                    'duration_months': row['duration_months'],
+                    'plan_name': 'Standard Plan',
+                    'timeslot': f"{row['timeslot_name']} ({row['start_time']} - {row['end_time']})",
+                    'status': row['status']
+                } for row in student_rows]
+                items.append(('student', student_receipt_filename(student_data), (student_data, subscriptions_data)))
+        
+        return items
+    
+    def generate_receipts_batch(self, subscription_ids=(), student_ids=(), zip_path=None,
+                                max_workers=RECEIPT_BATCH_WORKERS):
+        """Render receipts for many subscriptions and/or students across worker processes
+        
+        Subscription receipts and comprehensive student receipts are written to
+        RECEIPTS_DIR as they arrive, or into a single zip file when zip_path is given.
+        Returns (True, summary) with the output path, receipt and failure counts,
+        elapsed seconds and receipts per second.
+        """
+        try:
+            started = time.perf_counter()
+            items = self._batch_items(subscription_ids, student_ids)
+            workers = min(max_workers or os.cpu_count() or 1, len(items))
+            
+            if zip_path:
+                archive = zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED)  # PDF streams are already compressed
+                output_path = zip_path
+            else:
+                archive = None
+                output_path = RECEIPTS_DIR
+                self.ensure_receipts_directory()
+            
+            count = 0
+            failures = []
+            pool = None
+            try:
+                if workers > 1 and len(items) >= MIN_PARALLEL_RECEIPTS:
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+                    
+                    # spawn: forking a process that runs Tk and worker threads is not safe
+                    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                    results = pool.map(_render_batch_receipt, items, chunksize=max(1, len(items) // (workers * 4)))
+                else:
+                    results = map(_render_batch_receipt, items)
+                
+                for filename, pdf_bytes, error in results:
+                    if error is not None:
+                        failures.append((filename, error))
+                    elif archive is not None:
+                        archive.writestr(filename, pdf_bytes)
+                        count += 1
+                    else:
+                        with open(os.path.join(RECEIPTS_DIR, filename), 'wb') as receipt_file:
+                            receipt_file.write(pdf_bytes)
+                        count += 1
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+                if archive is not None:
+                    archive.close()
+            
+            elapsed = time.perf_counter() - started
+            summary = {
+                'path': output_path,
+                'count': count,
+                'failed': failures,
+                'seconds': elapsed,
+                'per_second': count / elapsed if elapsed else 0.0,
+                'workers': workers if pool is not None else 1,
+            }
+            logger.info("Rendered %d receipts (%d failed) in %.1f s with %d processes: %.1f receipts/s",
+                        count, len(failures), elapsed, summary['workers'], summary['per_second'])
+            return True, summary
+        
+        except Exception as e:
+            logger.error("Batch receipt generation failed: %s", e)
+            return False, f"Error generating receipts: {str(e)}"
+
+
+_worker_generator = None
+
+
+def _render_batch_receipt(item):
+    """Render one batch receipt (in a worker process); returns (filename, PDF bytes, error)"""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = PDFGenerator()
+    kind, filename, args = item
+    try:
+        if kind == 'subscription':
+            return filename, _worker_generator.render_subscription_receipt(*args), None
+        return filename, _worker_generator.render_student_receipt(*args), None
+    except Exception as e:
+        return filename, None, str(e)
 
 
 # Alias for backward compatibility
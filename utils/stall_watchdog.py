@@ -0,0 +1,155 @@
+"""
+Tk main-loop stall watchdog
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from config.settings import STALL_THRESHOLD_MS, STALL_HEARTBEAT_MS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _is_tkinter(frame):
+    return os.path.join('tkinter', '__init__.py') in frame.filename
+
+
+def _describe(frame):
+    path = os.path.relpath(frame.filename, PROJECT_ROOT) if frame.filename.startswith(PROJECT_ROOT) else frame.filename
+    return f"{path}:{frame.name}"
+
+
+def attribute_stack(frames):
+    """Return (handler, location) for a main thread stack, outermost frame first
+
+    handler is the Tk callback that was running: the first frame after mainloop
+    hands control back to Python. location is the innermost frame in our own code.
+    """
+    handler = None
+    in_mainloop = False
+    for frame in frames:
+        if _is_tkinter(frame):
+            in_mainloop = in_mainloop or frame.name == 'mainloop'
+        elif in_mainloop:
+            handler = frame
+            break
+
+    project_frames = [frame for frame in frames if frame.filename.startswith(PROJECT_ROOT)
+                      and frame.filename != os.path.abspath(__file__)]
+    location = project_frames[-1] if project_frames else (frames[-1] if frames else None)
+    if handler is None:
+        handler = project_frames[0] if project_frames else location
+    return (_describe(handler) if handler else "<unknown>",
+            f"{_describe(location)}:{location.lineno}" if location else "<unknown>")
+
+
+class StallWatchdog:
+    """Detects handlers that block the Tk main loop and records where they were
+
+    The main loop bumps a heartbeat with after(). A watchdog thread samples the main
+    thread's stack with sys._current_frames() whenever the heartbeat is more than
+    threshold_ms late; once the loop responds again the stall is logged with its
+    duration and added to a per-handler report.
+    """
+
+    def __init__(self, root, threshold_ms=STALL_THRESHOLD_MS, interval_ms=STALL_HEARTBEAT_MS):
+        self.root = root
+        self.threshold = threshold_ms / 1000
+        self.interval_ms = interval_ms
+        self._main_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._samples = []  # stacks sampled during the current stall
+        self._stats = {}  # (handler, location) -> [stalls, total ms, worst ms, worst stack]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._after_id = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        """Start the heartbeat and the watchdog thread (call from the Tk thread)"""
+        if self.running:
+            return
+        self._main_thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._last_beat = time.perf_counter()
+        self._after_id = self.root.after(self.interval_ms, self._beat)
+        self._thread = threading.Thread(target=self._watch, args=(self._stop,), name="stall-watchdog",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching; the collected report is kept"""
+        if not self.running:
+            return
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._thread = None
+
+    def _beat(self):
+        now = time.perf_counter()
+        with self._lock:
+            late = now - self._last_beat - self.interval_ms / 1000
+            self._last_beat = now
+            samples, self._samples = self._samples, []
+        if late >= self.threshold and samples:
+            self._record(late * 1000, samples)
+        if not self._stop.is_set():
+            self._after_id = self.root.after(self.interval_ms, self._beat)
+
+    def _watch(self, stop):
+        """Sample the main thread's stack while the heartbeat is overdue"""
+        poll = max(self.threshold / 4, 0.01)
+        while not stop.wait(poll):
+            with self._lock:
+                overdue = time.perf_counter() - self._last_beat - self.interval_ms / 1000
+            if overdue < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            del frame
+            with self._lock:
+                self._samples.append(stack)
+
+    def _record(self, duration_ms, samples):
+        """Attribute a finished stall to the handler seen in most of its samples"""
+        attributions = [attribute_stack(stack) for stack in samples]
+        key = Counter(attributions).most_common(1)[0][0]
+        stack = samples[attributions.index(key)]
+        with self._lock:
+            stats = self._stats.setdefault(key, [0, 0.0, 0.0, None])
+            stats[0] += 1
+            stats[1] += duration_ms
+            if duration_ms >= stats[2]:
+                stats[2] = duration_ms
+                stats[3] = ''.join(traceback.format_list(stack))
+        logging.warning(f"UI stalled for {duration_ms:.0f} ms in {key[0]} (at {key[1]})")
+
+    def get_report(self):
+        """Return stalls per handler, worst total first, as a list of dicts"""
+        with self._lock:
+            rows = [
+                {'handler': handler, 'location': location, 'stalls': stalls,
+                 'total_ms': total, 'worst_ms': worst, 'stack': stack}
+                for (handler, location), (stalls, total, worst, stack) in self._stats.items()
+            ]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def reset(self):
+        """Clear the collected report"""
+        with self._lock:
+            self._stats.clear()
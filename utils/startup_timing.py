@@ -0,0 +1,130 @@
+"""
+Startup timing utilities (import-time table and window-visible budget)
+"""
+
+import builtins
+import logging
+import os
+import sys
+import threading
+import time
+
+# Reference point for every startup mark; import this module first in main.py
+PROCESS_START = time.perf_counter()
+
+
+class ImportTimer:
+    """Records per-module import cost, in the spirit of ``python -X importtime``"""
+
+    def __init__(self):
+        self.records = []  # (depth, name, self_us, cumulative_us) in completion order
+        self._stack = []
+        self._original_import = None
+        self._main_thread = threading.get_ident()
+
+    def install(self):
+        """Start timing imports made on the main thread"""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        """Restore the original import hook"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        # Fast path: already loaded or imported from a worker thread
+        if (level == 0 and name in sys.modules) or threading.get_ident() != self._main_thread:
+            return original(name, globals, locals, fromlist, level)
+
+        loaded_before = len(sys.modules)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            if len(sys.modules) > loaded_before:
+                label = ('.' * level) + name if level else name
+                self.records.append((len(self._stack), label,
+                                     int((cumulative - children) * 1e6), int(cumulative * 1e6)))
+
+    def format_table(self):
+        """Format records like the -X importtime output"""
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for depth, name, self_us, cumulative_us in self.records:
+            lines.append(f"import time: {self_us:>9} | {cumulative_us:>10} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+    def slowest(self, limit=10):
+        """Return the top-level imports with the highest cumulative cost"""
+        top_level = [r for r in self.records if r[0] == 0]
+        return sorted(top_level, key=lambda r: r[3], reverse=True)[:limit]
+
+
+class StartupTimer:
+    """Collects named startup marks and checks them against a time budget"""
+
+    def __init__(self, budget_seconds=2.0, report_imports=False):
+        self.budget_seconds = budget_seconds
+        self.marks = []
+        self.import_timer = ImportTimer() if report_imports else None
+        if self.import_timer:
+            self.import_timer.install()
+
+    def mark(self, label):
+        """Record the elapsed time since process start under label"""
+        elapsed = time.perf_counter() - PROCESS_START
+        self.marks.append((label, elapsed))
+        return elapsed
+
+    def elapsed(self, label):
+        """Return the elapsed time recorded for label, or None"""
+        for name, value in self.marks:
+            if name == label:
+                return value
+        return None
+
+    def watch_window(self, root, label="window visible"):
+        """Mark when the root window is first mapped, then emit the report"""
+        def on_map(event):
+            if event.widget is root and self.elapsed(label) is None:
+                self.mark(label)
+                root.after_idle(self.report)
+        root.bind('<Map>', on_map, add='+')
+
+    def report(self):
+        """Log the startup marks and warn when the visible-window budget is exceeded"""
+        if self.import_timer:
+            self.import_timer.uninstall()
+            print(self.import_timer.format_table(), file=sys.stderr)
+            for _, name, _, cumulative_us in self.import_timer.slowest():
+                logging.info(f"Startup import {name}: {cumulative_us / 1000:.1f} ms")
+
+        previous = 0.0
+        for label, elapsed in self.marks:
+            logging.info(f"Startup {label}: {elapsed * 1000:.0f} ms (+{(elapsed - previous) * 1000:.0f} ms)")
+            previous = elapsed
+
+        visible = self.elapsed("window visible")
+        if visible is not None and visible > self.budget_seconds:
+            logging.warning(f"Startup budget exceeded: window visible after {visible:.2f}s "
+                            f"(budget {self.budget_seconds:.2f}s)")
+        return visible
+
+
+def create_startup_timer(argv=None):
+    """Create a StartupTimer, enabling the import table via --startup-report or LIBRARY_STARTUP_REPORT"""
+    from config.settings import STARTUP_BUDGET_SECONDS
+
+    argv = sys.argv if argv is None else argv
+    report_imports = "--startup-report" in argv or os.environ.get("LIBRARY_STARTUP_REPORT") == "1"
+    if report_imports:
+        logging.basicConfig(level=logging.INFO)
+    return StartupTimer(STARTUP_BUDGET_SECONDS, report_imports=report_imports)
@@ -0,0 +1,252 @@
+"""
+Shared background task executor for GUI work
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from config.settings import TASK_WORKERS, TASK_PUMP_INTERVAL_MS, SLOW_TASK_MS
+
+# Lower numbers run first
+PRIORITY_HIGH = 0  # Loads the user is waiting for (e.g. clicking a seat)
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20  # Background sends and maintenance
+
+_local = threading.local()
+
+
+def current_task():
+    """Return the task running on this worker thread, or None"""
+    return getattr(_local, 'task', None)
+
+
+class Task:
+    """A unit of background work and its timing"""
+
+    def __init__(self, fn, args, kwargs, key, priority, on_success, on_error, widget):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.priority = priority
+        self.on_success = on_success
+        self.on_error = on_error
+        self.widget = widget
+        self.name = key or getattr(fn, '__qualname__', repr(fn))
+        self.result = None
+        self.error = None
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    def cancel(self):
+        """Cancel the task; if it already started, its result is discarded"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the task has finished running"""
+        return self._done.wait(timeout)
+
+    @property
+    def wait_ms(self):
+        return ((self.started_at or self.queued_at) - self.queued_at) * 1000
+
+    @property
+    def run_ms(self):
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return (self.finished_at - self.started_at) * 1000
+
+
+class TaskExecutor:
+    """Bounded worker pool with keyed tasks, priorities and a Tk result pump
+
+    Tasks with the same key never pile up: by default a new submission cancels the
+    superseded one, or with replace=False it joins the task already in flight.
+    Workers never touch Tk; finished tasks are queued and one pump on the main
+    loop applies their callbacks in batches.
+    """
+
+    def __init__(self, max_workers=TASK_WORKERS):
+        self.max_workers = max_workers
+        self._queue = queue.PriorityQueue()
+        self._results = queue.SimpleQueue()
+        self._counter = itertools.count()
+        self._workers = []
+        self._active = {}  # key -> latest task for that key
+        self._outstanding = 0
+        self._stats = {}  # task name -> [count, cancelled, failed, total run ms, max run ms]
+        self._lock = threading.Lock()
+        self._root = None
+        self._pump_interval = TASK_PUMP_INTERVAL_MS
+        self._pump_scheduled = False
+        self._shutdown = False
+
+    def attach_tk(self, root, interval_ms=TASK_PUMP_INTERVAL_MS):
+        """Deliver task callbacks on the Tk main loop"""
+        self._root = root
+        self._pump_interval = interval_ms
+
+    def submit(self, fn, *args, key=None, priority=PRIORITY_NORMAL, on_success=None,
+               on_error=None, widget=None, replace=True, **kwargs):
+        """Run fn(*args, **kwargs) on a worker thread and return its Task
+
+        on_success(result) and on_error(exception) run on the Tk main loop, and are
+        skipped if the task was cancelled or widget has been destroyed meanwhile.
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Task executor has been shut down")
+            existing = self._active.get(key) if key is not None else None
+            if existing is not None and not existing.done() and not existing.cancelled:
+                if not replace:
+                    return existing
+                existing.cancel()
+
+            task = Task(fn, args, kwargs, key, priority, on_success, on_error, widget)
+            if key is not None:
+                self._active[key] = task
+            self._outstanding += 1
+            self._queue.put((priority, next(self._counter), task))
+            if len(self._workers) < min(self.max_workers, self._outstanding):
+                worker = threading.Thread(target=self._worker, name=f"task-worker-{len(self._workers) + 1}",
+                                          daemon=True)
+                self._workers.append(worker)
+                worker.start()
+        self._schedule_pump()
+        return task
+
+    def cancel(self, key):
+        """Cancel the task currently registered under key"""
+        with self._lock:
+            task = self._active.get(key)
+        if task is not None:
+            task.cancel()
+
+    def _worker(self):
+        while True:
+            _, _, task = self._queue.get()
+            if task is None:
+                return
+            if not task.cancelled:
+                _local.task = task
+                task.started_at = time.perf_counter()
+                try:
+                    task.result = task.fn(*task.args, **task.kwargs)
+                except Exception as e:
+                    task.error = e
+                finally:
+                    task.finished_at = time.perf_counter()
+                    _local.task = None
+            task._done.set()
+            self._results.put(task)
+            if self._root is None:
+                self._apply_results()
+
+    def _schedule_pump(self):
+        if self._root is None:
+            return
+        with self._lock:
+            if self._pump_scheduled:
+                return
+            self._pump_scheduled = True
+        try:
+            self._root.after(self._pump_interval, self._pump)
+        except RuntimeError:
+            # Main loop is gone (application shutting down)
+            with self._lock:
+                self._pump_scheduled = False
+
+    def _pump(self):
+        """Apply finished tasks, then keep polling while work is outstanding"""
+        with self._lock:
+            self._pump_scheduled = False
+        self._apply_results()
+        with self._lock:
+            busy = self._outstanding > 0
+        if busy:
+            self._schedule_pump()
+
+    def _apply_results(self):
+        """Run the callbacks of every finished task in one batch"""
+        while True:
+            try:
+                task = self._results.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self._outstanding -= 1
+                if task.key is not None and self._active.get(task.key) is task:
+                    del self._active[task.key]
+            self._record(task)
+            if task.cancelled or not self._widget_alive(task.widget):
+                continue
+            try:
+                if task.error is not None:
+                    if task.on_error:
+                        task.on_error(task.error)
+                    else:
+                        logging.error(f"Background task {task.name} failed: {task.error}")
+                elif task.on_success:
+                    task.on_success(task.result)
+            except Exception as e:
+                logging.error(f"Callback for background task {task.name} failed: {e}")
+
+    @staticmethod
+    def _widget_alive(widget):
+        if widget is None:
+            return True
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    def _record(self, task):
+        run_ms = task.run_ms
+        with self._lock:
+            stats = self._stats.setdefault(task.name, [0, 0, 0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += task.cancelled
+            stats[2] += task.error is not None
+            stats[3] += run_ms
+            stats[4] = max(stats[4], run_ms)
+        if run_ms >= SLOW_TASK_MS:
+            logging.warning(f"Slow background task {task.name}: {run_ms:.0f} ms (waited {task.wait_ms:.0f} ms)")
+        else:
+            logging.debug(f"Background task {task.name}: {run_ms:.1f} ms (waited {task.wait_ms:.1f} ms)")
+
+    def get_stats(self):
+        """Return per-task timing: name -> dict of count, cancelled, failed, avg_ms, max_ms"""
+        with self._lock:
+            return {
+                name: {
+                    'count': count, 'cancelled': cancelled, 'failed': failed,
+                    'avg_ms': total / count if count else 0.0, 'max_ms': max_ms
+                }
+                for name, (count, cancelled, failed, total, max_ms) in self._stats.items()
+            }
+
+    def shutdown(self):
+        """Cancel queued work and stop the workers"""
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+            for task in self._active.values():
+                task.cancel()
+        for _ in workers:
+            self._queue.put((float('inf'), next(self._counter), None))
+
+
+# Shared executor for the application
+task_executor = TaskExecutor()
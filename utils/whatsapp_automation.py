@@ -2,22 +2,147 @@
 WhatsApp automation utilities
 """
 
+import logging
 import time
 import re
 import os
 import platform
 import subprocess
+import threading
 import unicodedata
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
 from config.settings import (WHATSAPP_WEB_URL, WHATSAPP_DELAY, LIBRARY_NAME, 
-                           LIBRARY_PHONE, LIBRARY_EMAIL, LIBRARY_ADDRESS)
+                           LIBRARY_PHONE, LIBRARY_EMAIL, LIBRARY_ADDRESS,
+                           WHATSAPP_CHAT_TIMEOUT, WHATSAPP_SENT_TIMEOUT, WHATSAPP_MESSAGE_INTERVAL)
+
+logger = logging.getLogger(__name__)
+
+# One outbox drain at a time, so a message in 'sending' always belongs to the running drain
+_outbox_lock = threading.Lock()
+
+# Emojis outside the Basic Multilingual Plane that ChromeDriver cannot type, mapped to field names
+EMOJI_REPLACEMENTS = str.maketrans({
+    '📍': 'LOCATION',
+    '📞': 'PHONE',
+    '📧': 'EMAIL',
+    '📱': 'MOBILE',
+    '💬': 'MESSAGE',
+    '🔍': 'SEARCH',
+    '🧪': 'TEST',
+    '🔔': 'NOTIFICATION',
+    '🎉': 'CELEBRATION',
+    '📋': 'DETAILS',
+    '📚': 'BOOKS',
+    '🏢': 'BUILDING',
+    '🙏': 'THANKS',
+    '👋': 'GREETING',
+    '✨': 'SPARKLE',
+    '📅': 'CALENDAR',
+    '🔄': 'RENEWAL',
+    '⏰': 'TIME',
+    '💰': 'MONEY',
+    '📖': 'BOOK',
+    # Variation selectors (e.g. in ⚠️) are dropped, keeping the base character
+    '\uFE0E': None,
+    '\uFE0F': None,
+    # ✅ and ❌ are in the BMP range and work well, so they are kept
+})
+NON_BMP_RE = re.compile('[\U00010000-\U0010FFFF]')
+
+# Chat message box, most reliable first; the search bar is excluded where it could match
+MESSAGE_INPUT_SELECTORS = [
+    '//div[@data-testid="conversation-compose-box-input" and not(contains(@class, "search"))]',
+    '//div[@data-testid="conversation-compose-box-input"]',
+    '//div[@contenteditable="true"][@data-tab="10" and not(contains(@class, "search"))]',
+    '//div[@role="textbox" and @data-tab="10"]',
+    '//div[@contenteditable="true"][contains(@class, "compose") and not(contains(@class, "search"))]',
+    '//div[@contenteditable="true"][contains(@data-testid, "compose")]',
+    '//div[@contenteditable="true"][@data-tab="10"]',
+]
+INVALID_NUMBER_SELECTORS = [
+    '//*[contains(text(), "Phone number shared via url is invalid")]',
+    '//*[contains(text(), "invalid")]',
+    '//*[contains(text(), "not found")]',
+]
+OUTGOING_MESSAGE_XPATH = '//div[contains(@class, "message-out")]'
+# Single or double tick on an outgoing message; a clock icon means it has not left yet
+SENT_TICK_XPATH = ('.//span[@data-icon="msg-check" or @data-icon="msg-dblcheck" or @data-icon="msg-dblcheck-ack"'
+                   ' or @data-testid="msg-check" or @data-testid="msg-dblcheck"]')
+SEND_STEPS = ('chat_open', 'input_found', 'typed', 'sent_tick')
+
+# Selenium names are bound by _import_selenium() when a driver is first needed
+webdriver = By = Keys = WebDriverWait = EC = Options = TimeoutException = ChromeDriverManager = None
+StaleElementReferenceException = None
+
+
+class SendTimer:
+    """Seconds spent in each step of one send_message call (see SEND_STEPS)"""
+
+    def __init__(self, phone_number):
+        self.phone_number = phone_number
+        self.started = self._last = time.perf_counter()
+        self.steps = {}
+        self.outcome = None
+
+    def mark(self, step):
+        """Record the time since the previous step as the duration of step"""
+        now = time.perf_counter()
+        self.steps[step] = now - self._last
+        self._last = now
+
+    @property
+    def total(self):
+        return self._last - self.started
+
+    def __str__(self):
+        steps = ', '.join(f"{step} {self.steps[step]:.2f}s" for step in SEND_STEPS if step in self.steps)
+        return f"{self.phone_number}: {self.outcome} in {self.total:.2f}s ({steps})"
+
+
+def format_send_timings(timers, paced_seconds=0):
+    """Summarize a run's SendTimers: median, 90th percentile and max of each step"""
+    if not timers:
+        return "No messages were attempted"
+
+    def stats(values):
+        values = sorted(values)
+        return (f"median {values[len(values) // 2]:.2f}s, p90 {values[int(len(values) * 0.9)]:.2f}s, "
+                f"max {values[-1]:.2f}s")
+
+    outcomes = {}
+    for timer in timers:
+        outcomes[timer.outcome] = outcomes.get(timer.outcome, 0) + 1
+    lines = [f"{len(timers)} messages ({', '.join(f'{count} {outcome}' for outcome, count in outcomes.items())}), "
+             f"{sum(timer.total for timer in timers):.1f}s sending + {paced_seconds:.1f}s spacing"]
+    for step in SEND_STEPS:
+        values = [timer.steps[step] for timer in timers if step in timer.steps]
+        if values:
+            lines.append(f"  {step}: {stats(values)} ({len(values)} messages)")
+    lines.append(f"  per message: {stats([timer.total for timer in timers])}")
+    return '\n'.join(lines)
+
+
+def _import_selenium():
+    """Import selenium and webdriver_manager on first use"""
+    global webdriver, By, Keys, WebDriverWait, EC, Options, TimeoutException, ChromeDriverManager
+    global StaleElementReferenceException
+    if webdriver is not None:
+        return
+    
+    from selenium import webdriver as _webdriver
+    from selenium.webdriver.common.by import By as _By
+    from selenium.webdriver.common.keys import Keys as _Keys
+    from selenium.webdriver.support.ui import WebDriverWait as _WebDriverWait
+    from selenium.webdriver.support import expected_conditions as _EC
+    from selenium.webdriver.chrome.options import Options as _Options
+    from selenium.common.exceptions import TimeoutException as _TimeoutException
+    from selenium.common.exceptions import StaleElementReferenceException as _StaleElementReferenceException
+    from webdriver_manager.chrome import ChromeDriverManager as _ChromeDriverManager
+    import selenium.webdriver.chrome.service  # noqa: F401 - used as webdriver.chrome.service
+    
+    By, Keys, WebDriverWait, EC = _By, _Keys, _WebDriverWait, _EC
+    Options, TimeoutException, ChromeDriverManager = _Options, _TimeoutException, _ChromeDriverManager
+    StaleElementReferenceException = _StaleElementReferenceException
+    webdriver = _webdriver
 
 
 class WhatsAppAutomation:
@@ -27,6 +152,8 @@ class WhatsAppAutomation:
         self.driver = None
         self.is_logged_in = False
         self._status_check_lock = False  # Simple lock to prevent concurrent status checks
+        self.send_timers = []  # SendTimer of every send_message call in the current run
+        self.last_run_summary = None  # format_send_timings() of the last outbox drain
     
     def get_session_directory(self):
         """Get appropriate session directory for the platform"""
@@ -50,7 +177,7 @@ class WhatsAppAutomation:
                 f.write("test")
             os.remove(test_file)
         except Exception as e:
-            print(f"⚠️ Warning: Session directory issue: {e}")
+            logger.warning("⚠️ Warning: Session directory issue: %s", e)
             # Fallback to temp directory
             session_dir = os.path.join(tempfile.gettempdir(), f"whatsapp_session_{os.getpid()}")
             os.makedirs(session_dir, exist_ok=True)
@@ -162,31 +289,32 @@ class WhatsAppAutomation:
     def initialize_driver(self, headless=False):
         """Initialize Chrome WebDriver"""
         try:
-            print("=== WhatsApp Driver Initialization ===")
+            _import_selenium()
+            logger.info("=== WhatsApp Driver Initialization ===")
             
             # Find Chrome executable
-            print("Looking for Chrome browser...")
+            logger.info("Looking for Chrome browser...")
             chrome_binary = self.find_chrome_executable()
             
             if not chrome_binary:
                 install_instructions = self.get_chrome_install_instructions()
                 error_msg = f"Chrome browser not found.\n\n{install_instructions}"
-                print(f"ERROR: {error_msg}")
+                logger.error("ERROR: %s", error_msg)
                 return False, error_msg
             
-            print(f"✅ Found Chrome at: {chrome_binary}")
+            logger.info("✅ Found Chrome at: %s", chrome_binary)
             
             chrome_options = Options()
             # For Flatpak Chrome, we need to set the binary path correctly
             if chrome_binary.startswith('/var/lib/flatpak/'):
                 chrome_options.binary_location = chrome_binary
-                print("📦 Using Flatpak Chrome")
+                logger.info("📦 Using Flatpak Chrome")
             
             # User data directory for persistent session
             import tempfile
             session_dir = self.get_session_directory()
             chrome_options.add_argument(f"--user-data-dir={session_dir}")
-            print(f"📁 Session directory: {session_dir}")
+            logger.info("📁 Session directory: %s", session_dir)
             
             # Windows-specific fixes
             if platform.system() == "Windows":
@@ -259,29 +387,29 @@ class WhatsAppAutomation:
             
             if headless:
                 chrome_options.add_argument("--headless")
-                print("🔧 Running in headless mode")
+                logger.info("🔧 Running in headless mode")
             else:
                 # Ensure window is visible when not headless
                 chrome_options.add_argument("--disable-background-mode")
                 chrome_options.add_argument("--no-first-run")
                 chrome_options.add_argument("--no-default-browser-check")
-                print("🔧 Running with visible window")
+                logger.info("🔧 Running with visible window")
             
             # Use webdriver-manager to handle ChromeDriver
             try:
-                print("🔄 Setting up ChromeDriver using WebDriver Manager...")
+                logger.info("🔄 Setting up ChromeDriver using WebDriver Manager...")
                 service = webdriver.chrome.service.Service(ChromeDriverManager().install())
-                print("🚀 Creating Chrome browser instance...")
+                logger.info("🚀 Creating Chrome browser instance...")
                 self.driver = webdriver.Chrome(service=service, options=chrome_options)
                 
                 # Execute script to avoid detection
                 self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                print("✅ ChromeDriver initialized successfully!")
+                logger.info("✅ ChromeDriver initialized successfully!")
                 
                 return True, f"Driver initialized successfully using Chrome at: {chrome_binary}"
                 
             except Exception as e:
-                print(f"❌ WebDriver Manager failed: {str(e)}")
+                logger.error("❌ WebDriver Manager failed: %s", str(e))
                 
                 # For Flatpak Chrome, don't try system ChromeDriver as it's incompatible
                 if chrome_binary.startswith('/var/lib/flatpak/'):
@@ -292,11 +420,11 @@ class WhatsAppAutomation:
                                  f"2. Or try: pip install --upgrade webdriver-manager selenium\n"
                                  f"3. Install system ChromeDriver: sudo dnf install chromedriver\n"
                                  f"   (may require non-Flatpak Chrome)")
-                    print(f"ERROR: {error_msg}")
+                    logger.error("ERROR: %s", error_msg)
                     return False, error_msg
                 
                 # Fallback: try system chromedriver for non-Flatpak Chrome
-                print("🔄 Trying system ChromeDriver as fallback...")
+                logger.info("🔄 Trying system ChromeDriver as fallback...")
                 
                 # Try to find system chromedriver
                 system_drivers = [
@@ -308,17 +436,17 @@ class WhatsAppAutomation:
                 for driver_path in system_drivers:
                     if os.path.exists(driver_path):
                         try:
-                            print(f"🔄 Trying system ChromeDriver at: {driver_path}")
+                            logger.info("🔄 Trying system ChromeDriver at: %s", driver_path)
                             service = webdriver.chrome.service.Service(driver_path)
                             self.driver = webdriver.Chrome(service=service, options=chrome_options)
                             
                             # Execute script to avoid detection
                             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                            print("✅ System ChromeDriver initialized successfully!")
+                            logger.info("✅ System ChromeDriver initialized successfully!")
                             
                             return True, f"Driver initialized using system ChromeDriver at: {driver_path}"
                         except Exception as sys_e:
-                            print(f"❌ System ChromeDriver failed: {sys_e}")
+                            logger.error("❌ System ChromeDriver failed: %s", sys_e)
                             continue
                 
                 # If all fails, provide comprehensive error message
@@ -329,29 +457,29 @@ class WhatsAppAutomation:
                              f"2. Install system ChromeDriver: sudo dnf install chromedriver\n"
                              f"3. Or try: pip install --upgrade webdriver-manager selenium\n"
                              f"4. Manual download from: https://chromedriver.chromium.org/")
-                print(f"ERROR: {error_msg}")
+                logger.error("ERROR: %s", error_msg)
                 return False, error_msg
         
         except Exception as e:
             error_msg = f"Failed to initialize driver: {str(e)}\n\n{self.get_chrome_install_instructions()}"
-            print(f"ERROR: {error_msg}")
+            logger.error("ERROR: %s", error_msg)
             return False, error_msg
 
     def login_to_whatsapp(self):
         """Login to WhatsApp Web"""
         try:
             if not self.driver:
-                print("❌ Driver not initialized. Initializing...")
+                logger.info("❌ Driver not initialized. Initializing...")
                 success, message = self.initialize_driver()
                 if not success:
                     return False, message
             
-            print("🌐 Opening WhatsApp Web...")
+            logger.info("🌐 Opening WhatsApp Web...")
             self.driver.get(WHATSAPP_WEB_URL)
-            print(f"✅ Navigated to: {WHATSAPP_WEB_URL}")
+            logger.info("✅ Navigated to: %s", WHATSAPP_WEB_URL)
             
             # Wait for page to load
-            print("⏳ Waiting for WhatsApp Web to load...")
+            logger.info("⏳ Waiting for WhatsApp Web to load...")
             wait = WebDriverWait(self.driver, 60)
             
             # Wait for the page to fully load first
@@ -359,30 +487,30 @@ class WhatsAppAutomation:
             time.sleep(3)
             
             try:
-                print("🔍 Checking if already logged in...")
+                logger.debug("🔍 Checking if already logged in...")
                 
                 # Use the comprehensive login status check method
                 is_logged_in, status_message = self.check_login_status()
                 
                 if is_logged_in:
                     self.is_logged_in = True
-                    print(f"✅ Already logged in! Status: {status_message}")
+                    logger.info("✅ Already logged in! Status: %s", status_message)
                     
                     # Additional wait for page stability if just logged in
                     if "may be loading" in status_message.lower() or "interface loading" in status_message.lower():
-                        print("⏳ Waiting for interface to fully load...")
+                        logger.info("⏳ Waiting for interface to fully load...")
                         stable, stability_msg = self.wait_for_page_stability(timeout=15)
                         if stable:
-                            print("✅ Interface fully loaded!")
+                            logger.info("✅ Interface fully loaded!")
                         else:
-                            print(f"⚠️ Interface may still be loading: {stability_msg}")
+                            logger.warning("⚠️ Interface may still be loading: %s", stability_msg)
                     
                     return True, "Already logged in to WhatsApp Web"
                 
-                print("📱 Not logged in yet, checking for QR code or login elements...")
+                logger.info("📱 Not logged in yet, checking for QR code or login elements...")
                 
             except Exception as e:
-                print(f"⚠️ Error checking login status: {e}")
+                logger.warning("⚠️ Error checking login status: %s", e)
             
             try:
                 # Check for QR code or login screen elements
@@ -402,55 +530,55 @@ class WhatsAppAutomation:
                         wait_short = WebDriverWait(self.driver, 5)
                         qr_element = wait_short.until(EC.presence_of_element_located((By.XPATH, selector)))
                         if qr_element and qr_element.is_displayed():
-                            print(f"✅ QR code found! (Selector: {selector})")
+                            logger.info("✅ QR code found! (Selector: %s)", selector)
                             return False, "Please scan the QR code to login to WhatsApp Web"
                     except TimeoutException:
                         continue
                 
                 # If no QR code found, check what's on the page
-                print("❓ No QR code found, checking page content...")
+                logger.info("❓ No QR code found, checking page content...")
                 try:
                     page_title = self.driver.title
                     current_url = self.driver.current_url
-                    print(f"📄 Page title: {page_title}")
-                    print(f"🔗 Current URL: {current_url}")
+                    logger.info("📄 Page title: %s", page_title)
+                    logger.debug("🔗 Current URL: %s", current_url)
                     
                     # Check for any WhatsApp-related content
                     whatsapp_elements = self.driver.find_elements(By.XPATH, '//*[contains(text(), "WhatsApp")]')
-                    print(f"🔍 Found {len(whatsapp_elements)} WhatsApp elements")
+                    logger.debug("🔍 Found %s WhatsApp elements", len(whatsapp_elements))
                     
                     # Check for loading states
                     loading_elements = self.driver.find_elements(By.XPATH, '//*[contains(@class, "loading") or contains(text(), "Loading") or contains(text(), "loading")]')
                     if loading_elements:
-                        print("⏳ Page appears to be loading...")
+                        logger.info("⏳ Page appears to be loading...")
                         return False, "WhatsApp Web is loading. Please wait and try again."
                     
                 except Exception as e:
-                    print(f"⚠️ Error checking page content: {e}")
+                    logger.warning("⚠️ Error checking page content: %s", e)
                 
-                print("❌ Could not find QR code or determine page state")
+                logger.error("❌ Could not find QR code or determine page state")
                 # Take a screenshot for debugging
                 try:
                     screenshot_path = "whatsapp_debug.png"
                     self.driver.save_screenshot(screenshot_path)
-                    print(f"📸 Debug screenshot saved as {screenshot_path}")
+                    logger.info("📸 Debug screenshot saved as %s", screenshot_path)
                 except Exception as screenshot_error:
-                    print(f"❌ Failed to save screenshot: {screenshot_error}")
+                    logger.error("❌ Failed to save screenshot: %s", screenshot_error)
                 
                 return False, "Could not find QR code. Please check the browser window and ensure WhatsApp Web loaded properly."
                 
             except Exception as e:
-                print(f"❌ Error looking for QR code: {e}")
+                logger.error("❌ Error looking for QR code: %s", e)
                 return False, f"Failed to load WhatsApp Web page properly: {str(e)}"
         
         except Exception as e:
-            print(f"❌ Login error: {str(e)}")
+            logger.error("❌ Login error: %s", str(e))
             return False, f"Login failed: {str(e)}"
     
     def wait_for_login(self, timeout=120):
         """Wait for user to complete QR code scan"""
         try:
-            print(f"⏳ Waiting for login completion (timeout: {timeout} seconds)...")
+            logger.info("⏳ Waiting for login completion (timeout: %s seconds)...", timeout)
             
             import time
             start_time = time.time()
@@ -475,21 +603,21 @@ class WhatsAppAutomation:
                             wait_short = WebDriverWait(self.driver, 2)
                             element = wait_short.until(EC.presence_of_element_located((By.XPATH, selector)))
                             if element and element.is_displayed():
-                                print(f"✅ Login detected! (Found: {selector})")
+                                logger.info("✅ Login detected! (Found: %s)", selector)
                                 
                                 # Wait for page to fully stabilize after login
-                                print("⏳ Waiting for WhatsApp Web to fully load...")
+                                logger.info("⏳ Waiting for WhatsApp Web to fully load...")
                                 time.sleep(3)  # Initial wait
                                 
                                 # Use the new stability check method
                                 stable, stability_msg = self.wait_for_page_stability(timeout=30)
                                 
                                 if stable:
-                                    print("✅ WhatsApp Web is stable and ready!")
+                                    logger.info("✅ WhatsApp Web is stable and ready!")
                                     self.is_logged_in = True
                                     return True, "Successfully logged in to WhatsApp Web"
                                 else:
-                                    print(f"⚠️ Page may not be fully stable: {stability_msg}")
+                                    logger.warning("⚠️ Page may not be fully stable: %s", stability_msg)
                                     # Still consider login successful even if stability check failed
                                     self.is_logged_in = True
                                     return True, "Login detected - WhatsApp Web may still be loading"
@@ -500,27 +628,27 @@ class WhatsAppAutomation:
                     # Still waiting, show progress
                     remaining = int(timeout - (time.time() - start_time))
                     if remaining > 0 and remaining % 10 == 0:  # Every 10 seconds
-                        print(f"⏳ Still waiting for QR code scan... ({remaining} seconds remaining)")
+                        logger.debug("⏳ Still waiting for QR code scan... (%s seconds remaining)", remaining)
                     
                     time.sleep(2)  # Wait 2 seconds before next check
                     
                 except Exception as e:
-                    print(f"⚠️ Error during login wait: {e}")
+                    logger.warning("⚠️ Error during login wait: %s", e)
                     time.sleep(2)
                     continue
             
             # Final timeout
-            print("⌛ Login timeout reached")
+            logger.warning("⌛ Login timeout reached")
             return False, "Login timeout. Please try again."
             
         except Exception as e:
-            print(f"❌ Login error: {str(e)}")
+            logger.error("❌ Login error: %s", str(e))
             return False, f"Login error: {str(e)}"
     
     def wait_for_page_stability(self, timeout=30, required_checks=3):
         """Wait for WhatsApp Web page to be stable after login"""
         try:
-            print(f"⏳ Waiting for page stability (timeout: {timeout}s, checks: {required_checks})...")
+            logger.info("⏳ Waiting for page stability (timeout: %ss, checks: %s)...", timeout, required_checks)
             
             import time
             stable_count = 0
@@ -548,10 +676,10 @@ class WhatsAppAutomation:
                     
                     if elements_found >= 2:  # At least 2 key elements found
                         stable_count += 1
-                        print(f"✓ Stability check {stable_count}/{required_checks} passed")
+                        logger.debug("✓ Stability check %s/%s passed", stable_count, required_checks)
                         
                         if stable_count >= required_checks:
-                            print("✅ Page is stable!")
+                            logger.debug("✅ Page is stable!")
                             return True, "Page is stable and ready"
                     else:
                         stable_count = 0  # Reset if not stable
@@ -559,16 +687,16 @@ class WhatsAppAutomation:
                     time.sleep(1)  # Wait 1 second between checks
                     
                 except Exception as e:
-                    print(f"⚠️ Stability check error: {e}")
+                    logger.warning("⚠️ Stability check error: %s", e)
                     stable_count = 0
                     time.sleep(1)
                     continue
             
-            print("⚠️ Stability timeout reached")
+            logger.warning("⚠️ Stability timeout reached")
             return False, "Page stability timeout"
             
         except Exception as e:
-            print(f"❌ Stability check failed: {e}")
+            logger.error("❌ Stability check failed: %s", e)
             return False, f"Stability check error: {str(e)}"
     
     def is_driver_valid(self):
@@ -783,7 +911,7 @@ class WhatsAppAutomation:
     def wait_for_page_stability(self, timeout=30):
         """Wait for WhatsApp Web page to become stable after login"""
         try:
-            print("⏳ Waiting for page to stabilize...")
+            logger.debug("⏳ Waiting for page to stabilize...")
             
             from selenium.webdriver.common.by import By
             import time
@@ -812,34 +940,34 @@ class WhatsAppAutomation:
                     
                     if stable_count >= 2:  # At least 2 stable elements found
                         consecutive_stable_checks += 1
-                        print(f"🔍 Stability check {consecutive_stable_checks}/{required_stable_checks} passed")
+                        logger.debug("🔍 Stability check %s/%s passed", consecutive_stable_checks, required_stable_checks)
                         
                         if consecutive_stable_checks >= required_stable_checks:
-                            print("✅ Page is stable!")
+                            logger.debug("✅ Page is stable!")
                             return True, "Page is stable and ready"
                     else:
                         consecutive_stable_checks = 0  # Reset counter
-                        print("⏳ Page still stabilizing...")
+                        logger.debug("⏳ Page still stabilizing...")
                     
                     time.sleep(2)  # Wait between checks
                     
                 except Exception as e:
                     consecutive_stable_checks = 0  # Reset on error
-                    print(f"⚠️ Stability check error: {e}")
+                    logger.warning("⚠️ Stability check error: %s", e)
                     time.sleep(2)
             
             # Timeout reached
-            print("⌛ Stability timeout reached")
+            logger.warning("⌛ Stability timeout reached")
             return False, "Page stabilization timeout"
             
         except Exception as e:
-            print(f"❌ Error waiting for stability: {e}")
+            logger.error("❌ Error waiting for stability: %s", e)
             return False, f"Stability check failed: {str(e)}"
 
     def ensure_connection(self):
         """Ensure WhatsApp Web connection is stable"""
         try:
-            print("🔍 Checking WhatsApp Web connection...")
+            logger.debug("🔍 Checking WhatsApp Web connection...")
             
             # First, basic driver check
             if not self.driver:
@@ -849,11 +977,11 @@ class WhatsAppAutomation:
             try:
                 current_url = self.driver.current_url
                 if "web.whatsapp.com" not in current_url:
-                    print(f"⚠️ Not on WhatsApp Web. Current URL: {current_url}")
+                    logger.warning("⚠️ Not on WhatsApp Web. Current URL: %s", current_url)
                     try:
                         self.driver.get(WHATSAPP_WEB_URL)
                         time.sleep(3)
-                        print("🔄 Navigated back to WhatsApp Web")
+                        logger.info("🔄 Navigated back to WhatsApp Web")
                     except Exception as nav_error:
                         return False, f"Cannot navigate to WhatsApp Web: {nav_error}"
             except Exception as url_error:
@@ -871,35 +999,35 @@ class WhatsAppAutomation:
                     is_logged_in, status_msg = self.check_login_status()
                     
                     if is_logged_in:
-                        print(f"✅ Connection stable: {status_msg}")
+                        logger.debug("✅ Connection stable: %s", status_msg)
                         return True, status_msg
                     
                     # If not logged in, check if it's a temporary loading state
                     if "loading" in status_msg.lower():
-                        print(f"⏳ Page loading (attempt {attempt + 1}/{max_retries}), waiting...")
+                        logger.debug("⏳ Page loading (attempt %s/%s), waiting...", attempt + 1, max_retries)
                         time.sleep(5)
                         continue
                     elif "QR code" in status_msg:
-                        print(f"📱 QR code detected: {status_msg}")
+                        logger.info("📱 QR code detected: %s", status_msg)
                         return False, status_msg
                     else:
                         # Connection issue, try to refresh if not last attempt
                         if attempt < max_retries - 1:
-                            print(f"🔄 Connection issue (attempt {attempt + 1}/{max_retries}), trying refresh...")
+                            logger.info("🔄 Connection issue (attempt %s/%s), trying refresh...", attempt + 1, max_retries)
                             try:
                                 self.driver.refresh()
                                 time.sleep(5)
                                 continue
                             except Exception as refresh_error:
-                                print(f"❌ Refresh failed: {refresh_error}")
+                                logger.error("❌ Refresh failed: %s", refresh_error)
                                 continue
                         else:
-                            print(f"❌ Connection check failed: {status_msg}")
+                            logger.error("❌ Connection check failed: %s", status_msg)
                             return False, status_msg
                             
                 except Exception as check_error:
                     if attempt < max_retries - 1:
-                        print(f"⚠️ Status check error (attempt {attempt + 1}/{max_retries}): {check_error}")
+                        logger.warning("⚠️ Status check error (attempt %s/%s): %s", attempt + 1, max_retries, check_error)
                         time.sleep(3)
                         continue
                     else:
@@ -908,74 +1036,18 @@ class WhatsAppAutomation:
             return False, "Connection verification failed after retries"
             
         except Exception as e:
-            print(f"❌ Error checking connection: {e}")
+            logger.error("❌ Error checking connection: %s", e)
             return False, f"Connection check failed: {str(e)}"
 
     def sanitize_message_for_chrome(self, message):
         """Sanitize message to be compatible with ChromeDriver while preserving important emojis"""
         try:
-            # Define replacements for common emojis with descriptive field names
-            # Replace emoji placeholders with actual field names as requested
-            emoji_replacements = {
-                '📍': 'LOCATION',
-                '📞': 'PHONE', 
-                '📧': 'EMAIL',
-                '📱': 'MOBILE',
-                '💬': 'MESSAGE',
-                '🔍': 'SEARCH',
-                '🧪': 'TEST',
-                '🔔': 'NOTIFICATION',
-                '🎉': 'CELEBRATION',
-                '📋': 'DETAILS',
-                '📚': 'BOOKS',
-                '🏢': 'BUILDING',
-                '🙏': 'THANKS',
-                '👋': 'GREETING',
-                '✨': 'SPARKLE',
-                '📅': 'CALENDAR',
-                '🔄': 'RENEWAL',
-                '⏰': 'TIME',
-                '💰': 'MONEY',
-                '📖': 'BOOK',
-                # Keep these as they're in BMP range and work well
-                # '✅': '✅',  # U+2705 (BMP)
-                # '❌': '❌',  # U+274C (BMP)
-            }
-            
-            # First, replace problematic emojis with text alternatives
-            sanitized = message
-            for emoji, replacement in emoji_replacements.items():
-                sanitized = sanitized.replace(emoji, replacement)
-            
-            # Handle variation selectors (like ⚠️ which is warning + variation selector)
-            # These cause issues with ord() but often work fine in browsers
-            variation_selectors = [
-                '\uFE0E',  # Text variation selector
-                '\uFE0F',  # Emoji variation selector
-            ]
-            
-            # Remove variation selectors but keep the base character
-            for vs in variation_selectors:
-                sanitized = sanitized.replace(vs, '')
-            
-            # Now check for any remaining non-BMP characters
-            final_sanitized = ""
-            for char in sanitized:
-                try:
-                    if ord(char) <= 0xFFFF:
-                        # Character is in BMP, keep it
-                        final_sanitized += char
-                    else:
-                        # Non-BMP character, replace with generic placeholder
-                        final_sanitized += '[emoji]'
-                except TypeError:
-                    # This shouldn't happen now, but just in case
-                    final_sanitized += '[char]'
-            
-            return final_sanitized.strip()
+            # Replace problematic emojis with field names, then any other non-BMP character
+            sanitized = message.translate(EMOJI_REPLACEMENTS)
+            return NON_BMP_RE.sub('[emoji]', sanitized).strip()
             
         except Exception as e:
-            print(f"❌ Error sanitizing message: {e}")
+            logger.error("❌ Error sanitizing message: %s", e)
             # If sanitization fails completely, try basic replacement
             try:
                 # Basic fallback - replace known problematic emojis
@@ -986,26 +1058,31 @@ class WhatsAppAutomation:
 
     def send_message(self, phone_number, message):
         """
-        Send message to a phone number with optimized performance
+        Send message to a phone number, waiting on the page itself rather than fixed delays
         
-        Optimizations applied:
-        - Reduced WebDriverWait timeouts from 30s to 10s for chat loading
-        - Reduced invalid number check timeout from 5s to 2s  
-        - Optimized selector search with 5s per selector instead of 10s
-        - Reduced delays: click delay 1s→0.5s, pre-send delay 1s→0.3s
-        - Minimized post-send delay from 3s to 1s while maintaining bot detection avoidance
-        - Faster delivery verification with 2s timeout instead of 5s
-        - Bulk message delay reduced from 6s to 2s between contacts
+        - One wait covers every message box selector and the invalid number notice,
+          so a valid chat is used as soon as it renders
+        - Typing starts once the box has focus; Enter is pressed once the text is in the box
+        - The send is confirmed by the tick on the new outgoing message
+        
+        Returns (True, message) once sent, (False, error) if it was not sent, and
+        (None, error) if something failed after Enter was pressed, when the message
+        may have gone out. Each call appends a SendTimer with the duration of every
+        step to send_timers.
         """
+        timer = SendTimer(phone_number)
+        timer.outcome = 'error'
+        self.send_timers.append(timer)
+        submitted = False
         try:
             # Sanitize message to handle Unicode characters
             original_message = message
             sanitized_message = self.sanitize_message_for_chrome(message)
             
-            if sanitized_message != original_message:
-                print(f"ℹ️ Message sanitized for Chrome compatibility")
-                print(f"Original: {original_message[:50]}{'...' if len(original_message) > 50 else ''}")
-                print(f"Sanitized: {sanitized_message[:50]}{'...' if len(sanitized_message) > 50 else ''}")
+            if sanitized_message != original_message and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("ℹ️ Message sanitized for Chrome compatibility")
+                logger.debug("Original: %.50s%s", original_message, '...' if len(original_message) > 50 else '')
+                logger.debug("Sanitized: %.50s%s", sanitized_message, '...' if len(sanitized_message) > 50 else '')
             
             # Use sanitized message
             message = sanitized_message
@@ -1013,103 +1090,60 @@ class WhatsAppAutomation:
             # Ensure connection is stable before sending
             connection_ok, connection_msg = self.ensure_connection()
             if not connection_ok:
-                print(f"❌ Connection not stable: {connection_msg}")
+                logger.error("❌ Connection not stable: %s", connection_msg)
                 return False, f"Connection error: {connection_msg}"
             
-            print(f"📱 Sending message to {phone_number}...")
+            logger.info("📱 Sending message to %s...", phone_number)
             
             # Clean phone number (remove +, spaces, etc.)
             clean_number = re.sub(r'[^\d]', '', phone_number)
             
             # Open chat using WhatsApp Web URL
             chat_url = f"https://web.whatsapp.com/send?phone={clean_number}"
-            print(f"🔗 Opening chat: {chat_url}")
+            logger.debug("🔗 Opening chat: %s", chat_url)
             
             try:
                 self.driver.get(chat_url)
-                print("✅ Navigated to chat URL")
+                logger.debug("✅ Navigated to chat URL")
             except Exception as e:
-                print(f"❌ Failed to navigate to chat URL: {e}")
+                logger.error("❌ Failed to navigate to chat URL: %s", e)
                 return False, f"Failed to open chat for {phone_number}: {str(e)}"
             
-            # Wait for chat to load with optimized timeout
-            wait = WebDriverWait(self.driver, 10)  # Reduced from 30 to 10 seconds
+            timer.mark('chat_open')
             
-            # Quick check for invalid number
+            # Wait for whichever comes first: a usable message box or an invalid number notice
             try:
-                print("🔍 Checking if phone number is valid...")
-                invalid_elements = [
-                    '//*[contains(text(), "Phone number shared via url is invalid")]',
-                    '//*[contains(text(), "invalid")]',
-                    '//*[contains(text(), "not found")]',
-                ]
-                
-                # Quick check with reduced timeout
-                for invalid_selector in invalid_elements:
-                    try:
-                        invalid_element = WebDriverWait(self.driver, 2).until(  # Reduced from 5 to 2 seconds
-                            EC.presence_of_element_located((By.XPATH, invalid_selector))
-                        )
-                        if invalid_element.is_displayed():
-                            print(f"❌ Invalid phone number detected: {phone_number}")
-                            return False, f"Invalid phone number: {phone_number}"
-                    except TimeoutException:
-                        continue
-                        
-            except Exception as e:
-                print(f"⚠️ Error checking number validity: {e}")
-            
-            # Find message input with optimized approach - try most reliable selectors first
-            # Updated selectors to specifically target chat input box instead of search bar
-            message_input_selectors = [
-                '//div[@data-testid="conversation-compose-box-input" and not(contains(@class, "search"))]',  # Primary selector (most reliable, exclude search)
-                '//div[@data-testid="conversation-compose-box-input"]',  # Fallback primary selector
-                '//div[@contenteditable="true"][@data-tab="10" and not(contains(@class, "search"))]',  # Alternative (exclude search)
-                '//div[@role="textbox" and @data-tab="10"]',  # Role-based with tab (more specific)
-                '//div[@contenteditable="true"][contains(@class, "compose") and not(contains(@class, "search"))]',  # Class-based (exclude search)
-                '//div[@contenteditable="true"][contains(@data-testid, "compose")]',  # Data-testid based
-                '//div[@contenteditable="true"][@data-tab="10"]',  # Contenteditable with tab
-            ]
-            
-            message_box = None
-            # Use shorter timeout per selector for faster overall speed
-            quick_wait = WebDriverWait(self.driver, 5)  # 5 seconds per selector instead of 10
-            
-            for attempt, selector in enumerate(message_input_selectors, 1):
-                try:
-                    print(f"🔍 Trying to find message input (attempt {attempt}): {selector}")
-                    message_box = quick_wait.until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    if message_box.is_displayed():
-                        print(f"✅ Found message input with selector: {selector}")
-                        break
-                except TimeoutException:
-                    print(f"⏰ Timeout for selector {attempt}: {selector}")
-                    continue
-                except Exception as e:
-                    print(f"❌ Error with selector {attempt}: {e}")
-                    continue
+                found, message_box = WebDriverWait(
+                    self.driver, WHATSAPP_CHAT_TIMEOUT, poll_frequency=0.2,
+                    ignored_exceptions=(StaleElementReferenceException,)
+                ).until(self._chat_ready)
+            except TimeoutException:
+                found = message_box = None
+            timer.mark('input_found')
+            
+            if found == 'invalid':
+                logger.error("❌ Invalid phone number detected: %s", phone_number)
+                timer.outcome = 'invalid'
+                return False, f"Invalid phone number: {phone_number}"
             
             if not message_box:
-                print("❌ Could not find message input box")
+                logger.error("❌ Could not find message input box")
+                timer.outcome = 'no input'
                 # Take a screenshot for debugging
                 try:
                     screenshot_path = f"whatsapp_error_{clean_number}.png"
                     self.driver.save_screenshot(screenshot_path)
-                    print(f"📸 Debug screenshot saved as {screenshot_path}")
+                    logger.info("📸 Debug screenshot saved as %s", screenshot_path)
                 except:
                     pass
                 return False, f"Could not find message input for {phone_number}"
             
             try:
-                print("📝 Sending message...")
+                logger.debug("📝 Sending message...")
                 
-                # Click on message box
+                # Click on message box and wait until it has focus
                 message_box.click()
-                time.sleep(0.5)  # Reduced delay after click (was 1 second)
-                # Add a small additional delay to ensure focus
-                time.sleep(0.2)
+                self._wait_quietly(lambda driver: driver.switch_to.active_element == message_box, 2)
                 
                 # Clear any existing text first
                 message_box.clear()
@@ -1120,20 +1154,20 @@ class WhatsAppAutomation:
                 try:
                     # Direct send_keys (preferred for most text)
                     message_box.send_keys(clean_message)
-                    print(f"✅ Message typed successfully: {len(clean_message)} characters")
+                    logger.debug("✅ Message typed successfully: %s characters", len(clean_message))
                 except Exception as send_error:
-                    print(f"⚠️ Direct send_keys failed: {send_error}")
+                    logger.warning("⚠️ Direct send_keys failed: %s", send_error)
                     
                     # Fallback: Try using JavaScript to set the value
-                    print("🔄 Trying JavaScript input method...")
+                    logger.debug("🔄 Trying JavaScript input method...")
                     try:
                         self.driver.execute_script("arguments[0].innerText = arguments[1];", message_box, clean_message)
-                        print("✅ JavaScript input completed")
+                        logger.debug("✅ JavaScript input completed")
                     except Exception as js_error:
-                        print(f"⚠️ JavaScript method failed: {js_error}")
+                        logger.warning("⚠️ JavaScript method failed: %s", js_error)
                         
                         # Last resort: character-by-character but keep Unicode
-                        print("🔄 Trying careful character-by-character input...")
+                        logger.debug("🔄 Trying careful character-by-character input...")
                         message_box.clear()
                         for char in clean_message:
                             try:
@@ -1162,94 +1196,193 @@ class WhatsAppAutomation:
                                         continue
                                 else:
                                     message_box.send_keys(char)
-                        print("✅ Character-by-character input completed")
+                        logger.debug("✅ Character-by-character input completed")
                 
-                # Minimal wait before sending (reduced from 1 second)
-                time.sleep(0.3)
+                # Send once the typed text has reached the box
+                self._wait_quietly(lambda driver: message_box.text.strip(), 2)
+                timer.mark('typed')
+                sent_before = len(self.driver.find_elements(By.XPATH, OUTGOING_MESSAGE_XPATH))
                 
                 # Send the message with Enter key
                 try:
                     message_box.send_keys(Keys.ENTER)
-                    print("✅ Enter key sent")
+                    submitted = True
+                    logger.debug("✅ Enter key sent")
                 except Exception as enter_error:
-                    print(f"⚠️ Enter key failed: {enter_error}")
+                    logger.warning("⚠️ Enter key failed: %s", enter_error)
                     # Try alternative send button
                     try:
                         send_button = self.driver.find_element(By.XPATH, '//span[@data-testid="send"]')
                         send_button.click()
-                        print("✅ Send button clicked")
+                        submitted = True
+                        logger.debug("✅ Send button clicked")
                     except Exception as button_error:
-                        print(f"❌ Send button also failed: {button_error}")
+                        logger.error("❌ Send button also failed: %s", button_error)
+                        timer.outcome = 'not sent'
                         return False, f"Could not send message: {str(button_error)}"
                 
-                print("✅ Message sent successfully!")
-                
-                # Reduced delay to avoid bot detection (still necessary but shorter)
-                time.sleep(1)  # Reduced from WHATSAPP_DELAY (3 seconds) to 1 second
-                
-                # Quick verification of message delivery (optional with reduced timeout)
-                try:
-                    # Look for sent message indicators with shorter timeout
-                    sent_indicators = [
-                        '//span[@data-testid="msg-time"]',  # Message timestamp
-                        '//span[contains(@class, "check")]',  # Check marks
-                        '//div[contains(@class, "message-out")]',  # Outgoing message
-                    ]
-                    
-                    for indicator in sent_indicators:
-                        try:
-                            element = WebDriverWait(self.driver, 2).until(  # Reduced from 5 to 2 seconds
-                                EC.presence_of_element_located((By.XPATH, indicator))
-                            )
-                            if element.is_displayed():
-                                print(f"✅ Message delivery confirmed: {indicator}")
-                                break
-                        except:
-                            continue
-                            
-                except Exception as e:
-                    print(f"⚠️ Could not verify message delivery: {e}")
+                # The new outgoing message shows a tick once WhatsApp has accepted it
+                if self._wait_quietly(lambda driver: self._sent_tick(driver, sent_before), WHATSAPP_SENT_TIMEOUT):
+                    timer.mark('sent_tick')
+                    timer.outcome = 'sent'
+                    logger.info("✅ Message sent successfully!")
+                else:
+                    timer.outcome = 'sent, no tick'
+                    logger.warning("⚠️ Could not verify message delivery within %ss", WHATSAPP_SENT_TIMEOUT)
                 
                 return True, "Message sent successfully"
                 
             except Exception as e:
-                print(f"❌ Error sending message: {e}")
+                logger.error("❌ Error sending message: %s", e)
+                if submitted:
+                    timer.outcome = 'unknown'
+                    return None, f"Message may have been sent: {str(e)}"
                 return False, f"Failed to send message: {str(e)}"
         
         except Exception as e:
-            print(f"❌ Error in send_message: {str(e)}")
+            logger.error("❌ Error in send_message: %s", str(e))
+            if submitted:
+                timer.outcome = 'unknown'
+                return None, f"Message may have been sent: {str(e)}"
             return False, f"Error sending message: {str(e)}"
     
-    def send_bulk_messages(self, contacts_messages):
-        """Send messages to multiple contacts with optimized speed"""
-        results = []
-        total_contacts = len(contacts_messages)
+    def _chat_ready(self, driver):
+        """Wait condition: ('input', box) once the message box is usable, ('invalid', notice) for a bad number"""
+        for selector in MESSAGE_INPUT_SELECTORS:
+            for element in driver.find_elements(By.XPATH, selector):
+                if element.is_displayed() and element.is_enabled():
+                    return 'input', element
+        for selector in INVALID_NUMBER_SELECTORS:
+            for element in driver.find_elements(By.XPATH, selector):
+                if element.is_displayed():
+                    return 'invalid', element
+        return False
+    
+    def _sent_tick(self, driver, sent_before):
+        """Wait condition: a new outgoing message has appeared and shows a sent tick"""
+        outgoing = driver.find_elements(By.XPATH, OUTGOING_MESSAGE_XPATH)
+        return len(outgoing) > sent_before and bool(outgoing[-1].find_elements(By.XPATH, SENT_TICK_XPATH))
+    
+    def _wait_quietly(self, condition, timeout):
+        """Poll condition until it holds; return False instead of raising on timeout"""
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.05,
+                                 ignored_exceptions=(StaleElementReferenceException,)).until(condition)
+        except TimeoutException:
+            return False
+    
+    def send_bulk_messages(self, contacts_messages, campaign=None, progress=None):
+        """Send messages to multiple contacts through the persistent outbox
         
-        print(f"📤 Starting bulk message sending to {total_contacts} contacts...")
+        Each contact is {'phone', 'message', 'name', 'student_id', 'campaign'}; the last two
+        are optional and campaign defaults to the one given here (a one-off campaign if
+        None). Contacts already messaged in their campaign are not sent to again.
+        """
+        from models.message_outbox import OutboxMessage
         
-        for index, contact in enumerate(contacts_messages, 1):
-            phone_number = contact['phone']
-            message = contact['message']
-            name = contact.get('name', phone_number)
-            
-            print(f"📱 Sending message {index}/{total_contacts} to {name} ({phone_number})")
-            
-            success, result_message = self.send_message(phone_number, message)
-            
+        campaign = campaign or f"bulk:{time.strftime('%Y%m%d%H%M%S')}"
+        ids = OutboxMessage.enqueue([{
+            'campaign': contact.get('campaign', campaign),
+            'student_id': contact.get('student_id'),
+            'name': contact.get('name', contact['phone']),
+            'phone': contact['phone'],
+            'message': contact['message'],
+        } for contact in contacts_messages])
+        already_sent = {message.id for message in OutboxMessage.get_by_ids(ids) if message.status == OutboxMessage.SENT}
+        if already_sent:
+            logger.info("⏭️ Skipping %s contacts already messaged in this campaign", len(already_sent))
+        
+        self.drain_outbox(ids=ids, progress=progress)
+        
+        results = []
+        for message in OutboxMessage.get_by_ids(ids):
+            if message.id in already_sent:
+                result_message = f"Already sent on {message.sent_at}"
+            elif message.status == OutboxMessage.SENT:
+                result_message = "Message sent successfully"
+            else:
+                result_message = message.last_error or f"Not sent ({message.status})"
             results.append({
-                'name': name,
-                'phone': phone_number,
-                'success': success,
+                'name': message.recipient_name,
+                'phone': message.phone,
+                'success': message.status == OutboxMessage.SENT,
                 'message': result_message
             })
-            
-            # Add spacing between messages for better delivery and readability
-            if index < total_contacts:  # Don't wait after the last message
-                time.sleep(2)  # 2 seconds between messages for better spacing
-        
-        print(f"✅ Bulk message sending completed. {sum(1 for r in results if r['success'])}/{total_contacts} messages sent successfully.")
         return results
     
+    def outbox_status(self):
+        """Return outbox {status: count} after marking interrupted messages uncertain
+        
+        Returns None while a drain is running, since its message in 'sending' is live.
+        """
+        from models.message_outbox import OutboxMessage
+        
+        if not _outbox_lock.acquire(blocking=False):
+            return None
+        try:
+            OutboxMessage.recover_interrupted()
+            return OutboxMessage.status_counts()
+        finally:
+            _outbox_lock.release()
+    
+    def drain_outbox(self, ids=None, progress=None):
+        """Send pending outbox messages in order, optionally only those in ids; return (sent, failed)
+        
+        Every message is marked sending before it is typed and sent afterwards, so after
+        a crash the next drain resumes with the first message not yet attempted.
+        progress(index, total, message) is called before each send. Consecutive sends
+        start at least WHATSAPP_MESSAGE_INTERVAL seconds apart; the per-step timing
+        summary of the run is logged at the end and kept in last_run_summary.
+        """
+        from models.message_outbox import OutboxMessage
+        
+        with _outbox_lock:
+            interrupted = OutboxMessage.recover_interrupted()
+            if interrupted:
+                logger.warning("⚠️ %s outbox messages were interrupted while sending and are marked uncertain", interrupted)
+            
+            pending = OutboxMessage.pending_ids(ids)
+            total = len(pending)
+            sent = failed = 0
+            self.send_timers = []
+            paced = 0.0
+            last_start = None
+            logger.info("📤 Starting bulk message sending to %s contacts...", total)
+            
+            for index, message_id in enumerate(pending, 1):
+                message = OutboxMessage.claim(message_id)
+                if message is None:
+                    continue
+                # Space messages out for delivery; time already spent sending counts towards it
+                if last_start is not None:
+                    remaining = WHATSAPP_MESSAGE_INTERVAL - (time.perf_counter() - last_start)
+                    if remaining > 0:
+                        time.sleep(remaining)
+                        paced += remaining
+                last_start = time.perf_counter()
+                if progress:
+                    progress(index, total, message)
+                logger.info("📱 Sending message %s/%s to %s (%s)", index, total, message.recipient_name, message.phone)
+                
+                success, result_message = self.send_message(message.phone, message.message)
+                if success:
+                    message.mark_sent()
+                    sent += 1
+                elif success is None:
+                    # Enter was pressed, so sending it again could duplicate it
+                    message.mark_uncertain(result_message)
+                    failed += 1
+                else:
+                    message.mark_failed(result_message)
+                    failed += 1
+                if self.send_timers:
+                    logger.debug("⏱️ %s", self.send_timers[-1])
+            
+            self.last_run_summary = format_send_timings(self.send_timers, paced)
+            logger.info("✅ Bulk message sending completed. %s/%s messages sent successfully.", sent, total)
+            logger.info("⏱️ Send timings:\n%s", self.last_run_summary)
+            return sent, failed
+    
     def _format_time(self, t):
         """Convert a time/datetime/str into a readable 'H:MM AM/PM' string"""
         import datetime
@@ -1270,7 +1403,7 @@ class WhatsAppAutomation:
             return t  # fallback
         return str(t)
 
-    def send_subscription_reminders(self, expiring_subscriptions):
+    def send_subscription_reminders(self, expiring_subscriptions, progress=None):
         """Send subscription expiry reminders with timeslot duration and optimized speed"""
         messages = []
         
@@ -1322,12 +1455,15 @@ class WhatsAppAutomation:
             messages.append({
                 'name': subscription['student_name'],
                 'phone': subscription['mobile_number'],
-                'message': message
+                'message': message,
+                'student_id': subscription['student_id'],
+                # One reminder per subscription term; a renewal starts a new campaign
+                'campaign': f"subscription_reminder:{subscription['id']}:{subscription['end_date']}"
             })
         
-        return self.send_bulk_messages(messages)
+        return self.send_bulk_messages(messages, progress=progress)
     
-    def send_subscription_cancellations(self, expired_subscriptions):
+    def send_subscription_cancellations(self, expired_subscriptions, progress=None):
         """Send subscription cancellation messages to expired students with timeslot duration"""
         messages = []
         
@@ -1362,12 +1498,14 @@ class WhatsAppAutomation:
             messages.append({
                 'name': subscription['student_name'],
                 'phone': subscription['mobile_number'],
-                'message': message
+                'message': message,
+                'student_id': subscription['student_id'],
+                'campaign': f"subscription_cancellation:{subscription['id']}:{subscription['end_date']}"
             })
         
-        return self.send_bulk_messages(messages)
+        return self.send_bulk_messages(messages, progress=progress)
     
-    def send_overdue_book_reminders(self, overdue_borrowings):
+    def send_overdue_book_reminders(self, overdue_borrowings, progress=None):
         """Send overdue book return reminders with optimized speed"""
         messages = []
         
@@ -1397,10 +1535,11 @@ class WhatsAppAutomation:
             messages.append({
                 'name': borrowing['student_name'],
                 'phone': borrowing['mobile_number'],
-                'message': message
+                'message': message,
+                'campaign': f"overdue_book_reminder:{borrowing['id']}:{borrowing['due_date']}"
             })
         
-        return self.send_bulk_messages(messages)
+        return self.send_bulk_messages(messages, progress=progress)
         """Send subscription expiry reminders as consolidated messages per student"""
         # Group subscriptions by student
         student_groups = {}
@@ -1500,14 +1639,14 @@ Thank you for testing {LIBRARY_NAME}!
         """Close the WebDriver"""
         try:
             if self.driver:
-                print("🔄 Closing WebDriver...")
+                logger.info("🔄 Closing WebDriver...")
                 self.driver.quit()
                 self.driver = None
                 self.is_logged_in = False
-                print("✅ Driver closed successfully")
+                logger.info("✅ Driver closed successfully")
             return True, "Driver closed successfully"
         except Exception as e:
-            print(f"❌ Error closing driver: {str(e)}")
+            logger.error("❌ Error closing driver: %s", str(e))
             return False, f"Error closing driver: {str(e)}"
     
     def test_chrome_installation(self):